@@ -0,0 +1,109 @@
+"""
+Bytes read from the database and sent to the client by the car and rental
+lists, with the full car (description included) against the list projection
+(``summary``, description deferred). Runs against a throwaway test database
+filled with cars carrying 2 KB descriptions.
+
+    python -m benchmarks.bench_car_listing
+"""
+import datetime
+import random
+from decimal import Decimal
+
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from car_app.managers import defer_car_details  # noqa: E402
+from car_app.models import Car, Customer, Rental, User  # noqa: E402
+from car_app.serializers import CarListSerializer, CarSerializer, CustomerSerializer, RentalSerializer  # noqa: E402
+
+CARS = 200
+RENTALS = 1000
+PAGE = 20
+WORDS = "comfortable spacious efficient reliable modern hybrid sporty quiet premium compact".split()
+
+
+class FullCarRentalSerializer(RentalSerializer):
+    """
+    Rentals as they were rendered before the list projection.
+    """
+    customer = CustomerSerializer(read_only=True)
+    car = CarSerializer(read_only=True)
+
+
+def populate():
+    rng = random.Random(7)
+    Car.objects.bulk_create([
+        Car(brand=rng.choice(["Toyota", "Skoda", "Ford"]), model=f"Model {i}",
+            description=" ".join(rng.choice(WORDS) for _ in range(260))[:2048],
+            production_year=2020, mileage=10_000, vin=f"BENCH{i:012d}", daily_rate=Decimal("50.00"))
+        for i in range(CARS)
+    ])
+    # bulk_create() skips save(), which fills in the summary.
+    for car in Car.objects.all():
+        car.save(update_fields=["description"])
+    user = User.objects.create_user(email="bench@example.com", password="password")
+    customer = Customer.objects.create(
+        user=user, date_of_birth=datetime.date(1990, 1, 1), licence_expiry_date=datetime.date(2030, 1, 1),
+        licence_since=datetime.date(2010, 1, 1), address="Street 1", city="City", country="PL",
+        citizenship="PL", phone_number="+48123456789",
+    )
+    car_ids = list(Car.objects.values_list("pk", flat=True))
+    start = datetime.date(2024, 1, 1)
+    Rental.objects.bulk_create([
+        Rental(customer=customer, car_id=rng.choice(car_ids), start_date=start + datetime.timedelta(days=i),
+               end_date=start + datetime.timedelta(days=i + 2), total_cost=Decimal("150.00"), status="confirmed")
+        for i in range(RENTALS)
+    ])
+
+
+def bytes_read(queryset):
+    """
+    Size of every value the database returns for ``queryset``, counted as text.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(len(str(value)) for row in cursor.fetchall() for value in row if value is not None)
+
+
+def bytes_sent(serializer_class, queryset):
+    return len(JSONRenderer().render(serializer_class(queryset, many=True).data))
+
+
+def measure(name, serializer_class, queryset):
+    return [
+        name,
+        bytes_read(queryset),
+        bytes_sent(serializer_class, queryset),
+        "%.2f" % (timeit(lambda: bytes_sent(serializer_class, queryset), number=5) / 1000),
+    ]
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        populate()
+        cars = Car.objects.order_by("pk")[:PAGE]
+        rentals = Rental.objects.select_related("car", "customer").order_by("pk")[:PAGE]
+        rows = [
+            measure("cars, full", CarSerializer, cars),
+            measure("cars, list projection", CarListSerializer, defer_car_details(cars)),
+            measure("rentals, full car", FullCarRentalSerializer, rentals),
+            measure("rentals, list projection", RentalSerializer, defer_car_details(rentals, "car")),
+        ]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"One page of {PAGE} rows, 2 KB car descriptions")
+    print_table(["list", "bytes read", "bytes sent", "render ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
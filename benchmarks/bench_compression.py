@@ -0,0 +1,48 @@
+"""
+Compressed size and compression time of list pages per encoding. The time is
+what every request pays without the catalog cache's precompressed variants.
+
+    python -m benchmarks.bench_compression
+"""
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from benchmarks import payloads  # noqa: E402
+from car_app import compression  # noqa: E402
+from car_app.renderers import FastJSONRenderer  # noqa: E402
+
+
+PAYLOADS = {
+    "cars x20": payloads.car_page(20),
+    "rentals x20": payloads.rental_page(20),
+    "rentals x100": payloads.rental_page(100),
+    "payments x100": payloads.payment_page(100),
+}
+
+
+def main():
+    encodings = compression.available_encodings()
+    missing = sorted(set(compression.compression_settings()["ENCODINGS"]) - set(encodings))
+    if missing:
+        print("Not installed: %s" % ", ".join(missing))
+
+    rows = []
+    for name, data in PAYLOADS.items():
+        body = FastJSONRenderer().render(data)
+        for encoding in encodings:
+            compressed = compression.compress(body, encoding)
+            rows.append([
+                name,
+                encoding,
+                len(body),
+                len(compressed),
+                "%.1f%%" % (100 * len(compressed) / len(body)),
+                "%.0f" % timeit(lambda: compression.compress(body, encoding)),
+            ])
+
+    print_table(["payload", "encoding", "bytes", "compressed", "ratio", "compress us"], rows)
+
+
+if __name__ == "__main__":
+    main()
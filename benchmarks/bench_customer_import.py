@@ -0,0 +1,76 @@
+"""
+Bulk customer import: one ``create_user`` and ``Customer.objects.create`` per
+row, each preceded by e-mail and phone lookups, as a registration loop would
+do, against ``car_app.onboarding.import_customers`` (set based checks, hashing
+in a process pool, chunked ``bulk_create``). Runs against a throwaway test
+database.
+
+    python -m benchmarks.bench_customer_import --rows 1000
+"""
+import argparse
+import os
+import time
+
+from benchmarks.utils import print_table, setup_django
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from car_app.models import Customer, User  # noqa: E402
+from car_app.onboarding import import_customers  # noqa: E402
+
+
+def make_rows(rows, prefix):
+    return [
+        {
+            "email": f"{prefix}{i}@example.com", "first_name": "Jan", "last_name": "Nowak",
+            "password": f"Secret{i}!", "date_of_birth": "1990-01-01", "licence_since": "2010-01-01",
+            "licence_expiry_date": "2030-01-01", "address": "Street 1", "city": "Warsaw", "country": "Poland",
+            "citizenship": "polish", "phone_number": f"+48 6{prefix}0 {i:06d}",
+        }
+        for i in range(rows)
+    ]
+
+
+def row_by_row(rows):
+    for row in rows:
+        row = dict(row)
+        assert not User.objects.filter(email=row["email"]).exists()
+        assert not Customer.objects.filter(phone_number=row["phone_number"]).exists()
+        user = User.objects.create_user(email=row.pop("email"), password=row.pop("password"),
+                                        first_name=row.pop("first_name"), last_name=row.pop("last_name"))
+        Customer.objects.create(user=user, **row)
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        baseline = timed(row_by_row, make_rows(options.rows, 1))
+        serial = timed(import_customers, make_rows(options.rows, 2), processes=1)
+        pooled = timed(import_customers, make_rows(options.rows, 3))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"{options.rows} customers on {connection.vendor}, {os.cpu_count()} CPUs")
+    print_table(["method", "seconds", "rows/s", "speed-up"], [
+        [name, "%.2f" % seconds, "%.0f" % (options.rows / seconds), "%.1fx" % (baseline / seconds)]
+        for name, seconds in [("row by row", baseline), ("bulk, serial hashing", serial),
+                              ("bulk, process pool", pooled)]
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Customer search at scale: DRF's ``icontains`` search over the users join
+against the indexed search columns (FTS5 on SQLite, trigram GIN on
+PostgreSQL). Runs against a throwaway test database filled with ``--rows``
+customers and times the count and the first page of each search, as
+``CustomerListView`` runs them.
+
+    python -m benchmarks.bench_customer_search --rows 500000
+"""
+import argparse
+import datetime
+import functools
+import random
+import time
+from operator import or_
+
+from benchmarks.utils import print_table, setup_django
+
+setup_django()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from car_app.models import Customer, User  # noqa: E402
+from car_app.search import search_columns, search_customers  # noqa: E402
+
+FIRST_NAMES = ["Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Małgorzata", "Paweł", "Agnieszka", "John", "Emma"]
+LAST_NAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński",
+              "Szymański", "Woźniak", "Smith", "Jones", "Brown", "Taylor", "Dąbrowski"]
+TERMS = ["kowalczyk", "wisniewski", "jan nowak", "user12345@", "+48 600 01", "zzz"]
+LEGACY_FIELDS = ["user__first_name", "user__last_name", "user__email", "phone_number"]
+PAGE = 20
+
+
+def populate(rows, batch=10_000):
+    rng = random.Random(3)
+    password = make_password("password")
+    for start in range(0, rows, batch):
+        users = User.objects.bulk_create([
+            User(email=f"user{i}@example.com", password=password,
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES) + str(i % 97 or ""))
+            for i in range(start, min(start + batch, rows))
+        ])
+        Customer.objects.bulk_create([
+            Customer(
+                user=user, date_of_birth=datetime.date(1990, 1, 1), licence_since=datetime.date(2010, 1, 1),
+                licence_expiry_date=datetime.date(2030, 1, 1), address="Street 1", city="Warsaw",
+                country="Poland", citizenship="polish", phone_number=f"+48 600 {i:06d}",
+                **search_columns(user.first_name, user.last_name, user.email, f"+48 600 {i:06d}"),
+            )
+            for i, user in enumerate(users, start)
+        ])
+
+
+def legacy_search(queryset, terms):
+    """
+    What DRF's SearchFilter did with ``CustomerListView.search_fields``.
+    """
+    for term in terms:
+        queryset = queryset.filter(functools.reduce(or_, (Q(**{f"{field}__icontains": term})
+                                                          for field in LEGACY_FIELDS)))
+    return queryset.distinct()
+
+
+def run(queryset):
+    started = time.perf_counter()
+    count = queryset.count()
+    list(queryset.order_by("pk")[:PAGE])
+    return count, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        populate(options.rows)
+        print(f"{options.rows} customers on {connection.vendor}, loaded in {time.perf_counter() - started:.0f} s")
+
+        rows = []
+        base = Customer.objects.select_related("user")
+        for term in TERMS:
+            terms = term.split()
+            legacy_count, legacy_ms = run(legacy_search(base, terms))
+            count, ms = run(search_customers(base, terms))
+            rows.append([term, legacy_count, "%.1f" % legacy_ms, count, "%.1f" % ms, "%.0fx" % (legacy_ms / ms)])
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print_table(["search", "icontains rows", "icontains ms", "indexed rows", "indexed ms", "speed-up"], rows)
+
+
+if __name__ == "__main__":
+    main()
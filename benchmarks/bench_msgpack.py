@@ -0,0 +1,61 @@
+"""
+Payload size and encode/decode time of MessagePack against JSON on large list pages.
+
+Compares the orjson backed JSON renderer with the MessagePack renderer, using the
+``msgpack`` extension when installed and the pure Python codec either way.
+
+    python -m benchmarks.bench_msgpack
+"""
+import io
+import zlib
+
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from benchmarks import payloads  # noqa: E402
+from car_app import msgpack_codec  # noqa: E402
+from car_app.parsers import FastJSONParser, MessagePackParser  # noqa: E402
+from car_app.renderers import FastJSONRenderer, MessagePackRenderer  # noqa: E402
+
+
+PAYLOADS = {
+    "cars x500": payloads.car_page(500),
+    "rentals x100": payloads.rental_page(100),
+    "rentals x500": payloads.rental_page(500),
+    "payments x100": payloads.payment_page(100),
+    "native rows x1000": payloads.native_rows(1000),
+}
+
+
+def measure(renderer, parser, data):
+    body = renderer.render(data)
+    return [
+        len(body),
+        len(zlib.compress(body, 6)),
+        "%.0f" % timeit(lambda: renderer.render(data), number=20),
+        "%.0f" % timeit(lambda: parser.parse(io.BytesIO(body)), number=20),
+    ]
+
+
+def main():
+    c_codec = msgpack_codec.msgpack
+    if c_codec is None:
+        print("msgpack is not installed, only the pure Python codec is measured.")
+
+    rows = []
+    for name, data in PAYLOADS.items():
+        rows.append([name, "json"] + measure(FastJSONRenderer(), FastJSONParser(), data))
+        if c_codec is not None:
+            rows.append([name, "msgpack"] + measure(MessagePackRenderer(), MessagePackParser(), data))
+        msgpack_codec.msgpack = None
+        try:
+            rows.append([name, "msgpack, pure"] + measure(MessagePackRenderer(), MessagePackParser(), data))
+        finally:
+            msgpack_codec.msgpack = c_codec
+
+    print_table(["payload", "format", "bytes", "gzip bytes", "encode us", "decode us"], rows)
+
+
+if __name__ == "__main__":
+    main()
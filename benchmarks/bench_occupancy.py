@@ -0,0 +1,61 @@
+"""
+Builds the fleet occupancy matrix for 10k cars over 90 days and compares the
+NumPy difference array with the pure Python bitmap fallback, and the size of
+the run-length and bitmap encodings.
+
+    python -m benchmarks.bench_occupancy
+"""
+import json
+import random
+
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from car_app.occupancy import build_matrix, encode_bitmap, encode_runs, numpy  # noqa: E402
+
+CARS = 10_000
+DAYS = 90
+
+
+def intervals(cars, days, per_car=6, seed=42):
+    """
+    Random, possibly overlapping rentals of 1 to 14 days, clipped to the period.
+    """
+    rng = random.Random(seed)
+    result = []
+    for car_id in range(1, cars + 1):
+        for _ in range(rng.randint(0, per_car)):
+            start = rng.randrange(days)
+            result.append((car_id, start, min(start + rng.randint(0, 13), days - 1)))
+    return result
+
+
+def main():
+    car_ids = list(range(1, CARS + 1))
+    data = intervals(CARS, DAYS)
+    print(f"{CARS} cars, {DAYS} days, {len(data)} rentals")
+
+    backends = [("python", False)]
+    if numpy is not None:
+        backends.append(("numpy", True))
+    else:
+        print("numpy is not installed, only the pure Python fallback is measured.")
+
+    rows = []
+    for name, use_numpy in backends:
+        rows.append([name, "%.1f" % (timeit(lambda: build_matrix(car_ids, data, DAYS, use_numpy), number=5) / 1000)])
+    print_table(["matrix", "ms"], rows)
+    print()
+
+    matrix = build_matrix(car_ids, data, DAYS, use_numpy=False)
+    runs = json.dumps(encode_runs(car_ids, matrix), separators=(",", ":"))
+    _, bitmap = encode_bitmap(matrix, DAYS)
+    print_table(["encoding", "ms", "bytes"], [
+        ["rle", "%.1f" % (timeit(lambda: encode_runs(car_ids, matrix), number=5) / 1000), len(runs)],
+        ["bitmap", "%.1f" % (timeit(lambda: encode_bitmap(matrix, DAYS), number=5) / 1000), len(bitmap)],
+    ])
+
+
+if __name__ == "__main__":
+    main()
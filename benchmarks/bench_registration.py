@@ -0,0 +1,63 @@
+"""
+Duplicate registrations: what a taken e-mail costs when it is found by the
+unique constraint (hash, INSERT, rollback) against the checks of
+``car_app.registration``, with and without the Bloom filter prefilter, and
+what checking a free e-mail costs. Runs against a throwaway test database
+filled with ``--users`` users.
+
+    python -m benchmarks.bench_registration --users 100000
+"""
+import argparse
+
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import IntegrityError, connection, transaction  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from car_app import registration  # noqa: E402
+from car_app.models import User  # noqa: E402
+
+
+def constraint_check(email):
+    try:
+        with transaction.atomic():
+            User.objects.create_user(email=email, password="Secret123!")
+    except IntegrityError:
+        return True
+    raise AssertionError("the e-mail was free")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    options = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        password = make_password(None)
+        for start in range(0, options.users, 10_000):
+            User.objects.bulk_create([User(email=f"user{i}@example.com", password=password)
+                                      for i in range(start, min(start + 10_000, options.users))])
+
+        rows = [["taken, unique constraint", "%.0f" % timeit(lambda: constraint_check("user7@example.com"),
+                                                             number=3, repeat=3)]]
+        for prefilter in (False, True):
+            with override_settings(REGISTRATION={"PREFILTER": prefilter}):
+                registration.EMAILS.get()
+                rows.append([f"taken, check (prefilter {'on' if prefilter else 'off'})",
+                             "%.0f" % timeit(lambda: registration.email_taken("user7@example.com"))])
+                rows.append([f"free, check (prefilter {'on' if prefilter else 'off'})",
+                             "%.0f" % timeit(lambda: registration.email_taken("nobody@example.com"))])
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"{options.users} users on {connection.vendor}")
+    print_table(["case", "µs per check"], rows)
+
+
+if __name__ == "__main__":
+    main()
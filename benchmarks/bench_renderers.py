@@ -0,0 +1,59 @@
+"""
+Compares DRF's stdlib JSON renderer/parser with the orjson backed pair.
+
+    python -m benchmarks.bench_renderers
+"""
+import io
+
+from benchmarks.utils import print_table, setup_django, timeit
+
+setup_django()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks import payloads  # noqa: E402
+from car_app.parsers import FastJSONParser  # noqa: E402
+from car_app.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+
+PAYLOADS = {
+    "cars x20": payloads.car_page(20),
+    "rentals x20": payloads.rental_page(20),
+    "rentals x100": payloads.rental_page(100),
+    "payments x100": payloads.payment_page(100),
+    "native rows x1000": payloads.native_rows(1000),
+}
+
+
+def main():
+    if orjson is None:
+        print("orjson is not installed, FastJSONRenderer falls back to the stdlib renderer.")
+
+    rows = []
+    for name, data in PAYLOADS.items():
+        body = JSONRenderer().render(data)
+        render_std = timeit(lambda: JSONRenderer().render(data))
+        render_fast = timeit(lambda: FastJSONRenderer().render(data))
+        parse_std = timeit(lambda: JSONParser().parse(io.BytesIO(body)))
+        parse_fast = timeit(lambda: FastJSONParser().parse(io.BytesIO(body)))
+        rows.append([
+            name,
+            len(body),
+            "%.1f" % render_std,
+            "%.1f" % render_fast,
+            "%.1fx" % (render_std / render_fast),
+            "%.1f" % parse_std,
+            "%.1f" % parse_fast,
+            "%.1fx" % (parse_std / parse_fast),
+        ])
+
+    print_table(
+        ["payload", "bytes", "render std us", "render fast us", "speed-up",
+         "parse std us", "parse fast us", "speed-up"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the cold start of a worker: the import time of the URL configuration
+(which imports every view) as reported by ``python -X importtime``, and the
+latency of the first schema request with and without the precompiled schema.
+Every sample runs in a fresh interpreter.
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.utils import print_table
+
+RUNS = 5
+
+IMPORT_URLS = "import django; django.setup(); import car_rental.urls"
+
+FIRST_REQUEST = """
+import time
+started = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+client = Client()
+ready = time.perf_counter()
+response = client.get("/api/schema")
+assert response.status_code == 200, response.status_code
+print(ready - started, time.perf_counter() - ready)
+"""
+
+LAZY_MODULES = ("google.oauth2", "google.auth.transport.requests", "drf_spectacular.generators")
+
+
+def python(code, *flags, **env):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True, text=True, check=True, env={**os.environ, **env},
+    )
+
+
+def import_times(code):
+    """
+    Cumulative import time in microseconds of every module imported by ``code``.
+
+    :rtype: dict[str, int]
+    """
+    times = {}
+    for line in python(code, "-X", "importtime").stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)", line)
+        if match:
+            times[match.group(2).strip()] = int(match.group(1))
+    return times
+
+
+def main():
+    times = [import_times(IMPORT_URLS) for _ in range(RUNS)]
+    print_table(["module", "cumulative ms"], [
+        [module, "%.1f" % (statistics.median(run.get(module, 0) for run in times) / 1000)]
+        for module in ("car_rental.urls", "car_app.views.user_views", *LAZY_MODULES)
+    ])
+    print("(0.0 means the module is not imported at startup)")
+    print()
+
+    with tempfile.TemporaryDirectory() as built, tempfile.TemporaryDirectory() as empty:
+        python("import django; django.setup(); from car_app.schema import build_schema; build_schema()",
+               OPENAPI_SCHEMA_DIR=built)
+        rows = []
+        for name, directory in (("generated", empty), ("precompiled", built)):
+            samples = [
+                [float(value) for value in python(FIRST_REQUEST, OPENAPI_SCHEMA_DIR=directory).stdout.split()]
+                for _ in range(RUNS)
+            ]
+            rows.append([
+                name,
+                "%.1f" % (statistics.median(s[0] for s in samples) * 1000),
+                "%.1f" % (statistics.median(s[1] for s in samples) * 1000),
+            ])
+    print_table(["schema", "setup ms", "first request ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
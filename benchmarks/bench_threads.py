@@ -0,0 +1,120 @@
+"""
+Throughput of a single gunicorn worker in sync mode and with threads.
+
+Starts ``gunicorn -c gunicorn.conf.py`` with one worker per mode and drives it
+with the :mod:`benchmarks.loadtest` scenario mix. Against a local SQLite
+database every query is delayed by ``--db-latency-ms`` (see
+:mod:`benchmarks.latency_wsgi`) to stand in for the round trip to Postgres,
+which is the I/O wait threads are meant to absorb; pass 0 to measure against
+a real database configured in the environment.
+
+    python -m benchmarks.bench_threads --threads 1 4 8 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from decimal import Decimal
+
+from benchmarks.loadtest import run
+from benchmarks.utils import print_table, setup_django
+
+CARS = 50
+
+
+def seed():
+    """
+    Makes sure the database is migrated and has enough cars to browse.
+    """
+    setup_django()
+    from django.core.management import call_command
+    from car_app.models import Car
+
+    call_command('migrate', verbosity=0)
+    brands = ['Toyota', 'Skoda', 'Ford', 'BMW']
+    Car.objects.bulk_create([
+        Car(brand=brands[i % len(brands)], model=f"Bench {i}", description="Benchmark car",
+            production_year=2020, mileage=10_000, vin=f"BENCH{i:012d}", daily_rate=Decimal('50.00'))
+        for i in range(Car.objects.count(), CARS)
+    ])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"gunicorn did not start on port {port}")
+
+
+def measure(threads, options):
+    port = free_port()
+    app = 'benchmarks.latency_wsgi:application' if options.db_latency_ms else 'car_rental.wsgi:application'
+    env = {
+        **os.environ,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'WEB_CONCURRENCY': '1',
+        'GUNICORN_THREADS': str(threads),
+        'GUNICORN_MAX_REQUESTS': '0',
+        'DB_LATENCY_MS': str(options.db_latency_ms),
+        'THROTTLE_RATE_ANON': '1000000/min',
+        'THROTTLE_RATE_USER': '1000000/min',
+        'THROTTLE_RATE_CATALOG': '1000000/min',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+        load = argparse.Namespace(
+            host='127.0.0.1', port=port, duration=options.duration,
+            concurrency=options.concurrency, token='', seed=1,
+        )
+        results, elapsed = asyncio.run(run(load))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    latencies = sorted(latency for samples in results.values() for latency, _ in samples)
+    errors = sum(1 for samples in results.values() for _, status in samples if not 200 <= status < 300)
+    return [
+        'sync' if threads == 1 else f'gthread x{threads}',
+        len(latencies),
+        '%.1f' % (len(latencies) / elapsed),
+        '%.1f' % (latencies[len(latencies) // 2] * 1000),
+        '%.1f' % (latencies[int(len(latencies) * 0.95)] * 1000),
+        errors,
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--db-latency-ms', type=float, default=2)
+    options = parser.parse_args()
+
+    seed()
+    rows = [measure(threads, options) for threads in options.threads]
+    print(f"1 worker, {options.concurrency} clients, {options.duration:.0f} s per mode, "
+          f"{options.db_latency_ms} ms added per query")
+    print_table(['mode', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'errors'], rows)
+
+
+if __name__ == '__main__':
+    main()
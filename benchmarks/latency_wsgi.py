@@ -0,0 +1,32 @@
+"""
+The WSGI application with a fixed delay added to every database query.
+
+Used by :mod:`benchmarks.bench_threads` to stand in for the network round trip
+to Postgres when benchmarking against a local SQLite database. The delay in
+milliseconds comes from ``DB_LATENCY_MS``.
+"""
+import os
+import time
+
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'car_rental.settings')
+
+DELAY = float(os.getenv('DB_LATENCY_MS', '2')) / 1000
+
+
+def delayed(execute, sql, params, many, context):
+    time.sleep(DELAY)
+    return execute(sql, params, many, context)
+
+
+def add_delay(sender, connection, **kwargs):
+    # The wrapper object outlives its database connections, add the delay once.
+    if delayed not in connection.execute_wrappers:
+        connection.execute_wrappers.append(delayed)
+
+
+connection_created.connect(add_delay)
+
+application = get_wsgi_application()
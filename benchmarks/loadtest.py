@@ -0,0 +1,199 @@
+"""
+Closed-loop HTTP load test against a running server.
+
+Each of ``--concurrency`` virtual clients keeps one keep-alive connection and
+sends requests back to back, picking the next one from a weighted scenario
+mix. The default mix follows how the API is used: browsing dominates (the
+catalog is polled every few seconds, then car details, calendars and price
+quotes), and signed-in customers check their rentals. Only the standard
+library is used, so the harness runs anywhere the project does.
+
+    gunicorn car_rental.wsgi:application &
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --duration 30 --concurrency 32
+
+Pass ``--token`` (a JWT access token of a customer) to include the signed-in
+endpoints. Raise the ``THROTTLE_RATE_*`` limits on the server first, or most
+requests will be answered 429. Set ``GUNICORN_STATS_DIR`` on the server to
+compare the per-worker figures written by ``gunicorn.conf.py``.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.utils import print_table
+
+#: ``(name, weight, needs_token, build)``; ``build(rng, car_ids)`` returns ``(method, path, body)``.
+SCENARIOS = [
+    ("car list", 40, False, lambda rng, cars: (
+        "GET", "/api/cars/?ordering=%s" % rng.choice(["-production_year", "daily_rate"]), None)),
+    ("car search", 10, False, lambda rng, cars: (
+        "GET", "/api/cars/?search=%s" % rng.choice(["Toyota", "Skoda", "BMW", "Ford"]), None)),
+    ("car detail", 20, False, lambda rng, cars: ("GET", "/api/cars/car/%d/" % rng.choice(cars), None)),
+    ("calendar", 10, False, lambda rng, cars: (
+        "GET", "/api/cars/calendar/?cars=%s" % ",".join(map(str, rng.sample(cars, min(5, len(cars))))), None)),
+    ("quote", 10, False, lambda rng, cars: ("POST", "/api/cars/quote/", quote_body(rng, cars))),
+    ("my rentals", 7, True, lambda rng, cars: ("GET", "/api/rentals/my-rentals/", None)),
+    ("profile", 3, True, lambda rng, cars: ("GET", "/api/users/profile/", None)),
+]
+
+
+def quote_body(rng, cars):
+    start = datetime.date.today() + datetime.timedelta(days=rng.randint(1, 60))
+    return {
+        "cars": rng.sample(cars, min(10, len(cars))),
+        "start_date": start.isoformat(),
+        "end_date": (start + datetime.timedelta(days=rng.randint(1, 14))).isoformat(),
+    }
+
+
+class Connection:
+    """
+    A minimal HTTP/1.1 keep-alive client connection.
+    """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers, body=None):
+        """
+        Sends one request and reads the whole response.
+
+        :return: ``(status, body)``
+        :rtype: tuple[int, bytes]
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(payload)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        try:
+            return await self.read_response()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            raise
+
+    async def read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") == "chunked":
+            body = b""
+            while size := int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                body += (await self.reader.readexactly(size + 2))[:-2]
+            await self.reader.readuntil(b"\r\n")
+        else:
+            body = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def client(number, options, scenarios, car_ids, deadline, results):
+    rng = random.Random(options.seed + number)
+    connection = Connection(options.host, options.port)
+    headers = {"Accept": "application/json"}
+    if options.token:
+        headers["Authorization"] = f"Bearer {options.token}"
+    names, weights = zip(*[(name, weight) for name, weight, _, _ in scenarios])
+    builders = {name: build for name, _, _, build in scenarios}
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path, body = builders[name](rng, car_ids)
+        started = time.perf_counter()
+        try:
+            status, _ = await connection.request(method, path, headers, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status = 0
+        results[name].append((time.perf_counter() - started, status))
+    connection.close()
+
+
+async def fetch_car_ids(options):
+    connection = Connection(options.host, options.port)
+    status, body = await connection.request("GET", "/api/cars/?fields=id", {"Accept": "application/json"})
+    connection.close()
+    if status != 200:
+        raise SystemExit(f"Could not list cars: HTTP {status}")
+    data = json.loads(body)
+    car_ids = [car["id"] for car in (data["results"] if isinstance(data, dict) else data)]
+    if not car_ids:
+        raise SystemExit("The server has no cars; load some data first.")
+    return car_ids
+
+
+async def run(options):
+    scenarios = [scenario for scenario in SCENARIOS if options.token or not scenario[2]]
+    car_ids = await fetch_car_ids(options)
+    results = defaultdict(list)
+    started = time.perf_counter()
+    deadline = started + options.duration
+    await asyncio.gather(*(
+        client(number, options, scenarios, car_ids, deadline, results) for number in range(options.concurrency)
+    ))
+    return results, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(results, elapsed):
+    rows = []
+    everything = []
+    for name, samples in sorted(results.items()):
+        latencies = sorted(latency for latency, _ in samples)
+        everything.extend(samples)
+        rows.append(row(name, samples, latencies, elapsed))
+    rows.append(row("total", everything, sorted(latency for latency, _ in everything), elapsed))
+    print_table(["scenario", "requests", "req/s", "p50 ms", "p95 ms", "p99 ms", "non-2xx"], rows)
+
+
+def row(name, samples, latencies, elapsed):
+    return [
+        name,
+        len(samples),
+        "%.1f" % (len(samples) / elapsed),
+        "%.1f" % (statistics.median(latencies) * 1000),
+        "%.1f" % (percentile(latencies, 0.95) * 1000),
+        "%.1f" % (percentile(latencies, 0.99) * 1000),
+        sum(1 for _, status in samples if not 200 <= status < 300),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--token", default="")
+    parser.add_argument("--seed", type=int, default=1)
+    options = parser.parse_args()
+    url = urlsplit(options.url)
+    options.host, options.port = url.hostname, url.port or 80
+
+    results, elapsed = asyncio.run(run(options))
+    print(f"{options.concurrency} clients for {elapsed:.1f} s against {options.url}")
+    report(results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
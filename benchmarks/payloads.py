@@ -0,0 +1,93 @@
+"""
+Realistic response payloads built from unsaved model instances.
+"""
+import datetime
+from decimal import Decimal
+
+from car_app.models import Car, Customer, Payment, Rental, User
+from car_app.serializers import CarSerializer, PaymentSerializer, RentalSerializer
+
+DESCRIPTION = (
+    "Well maintained compact sedan with automatic gearbox, air conditioning, "
+    "cruise control, parking sensors and a spacious boot. Non-smoking vehicle. "
+) * 4
+
+
+def make_car(i):
+    return Car(
+        id=i,
+        brand=["Toyota", "Skoda", "BMW", "Kia"][i % 4],
+        model="Model %d" % i,
+        description=DESCRIPTION,
+        production_year=2015 + i % 10,
+        mileage=10_000 + i * 137,
+        vin="VIN%014d" % i,
+        daily_rate=Decimal("89.99") + i,
+        availability=bool(i % 3),
+    )
+
+
+def make_rental(i):
+    user = User(id=i, first_name="Jan", last_name="Kowalski %d" % i, email="jan%d@example.com" % i)
+    customer = Customer(
+        id=i,
+        user=user,
+        date_of_birth=datetime.date(1985, 1, 1) + datetime.timedelta(days=i),
+        licence_expiry_date=datetime.date(2031, 6, 30),
+        licence_since=datetime.date(2005, 3, 1),
+        address="Złota %d" % i,
+        city="Warszawa",
+        country="Poland",
+        citizenship="polish",
+        phone_number="+48600%06d" % i,
+    )
+    start = datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 300)
+    return Rental(
+        id=i,
+        customer=customer,
+        car=make_car(i),
+        start_date=start,
+        end_date=start + datetime.timedelta(days=3),
+        total_cost=Decimal("359.96"),
+        status="confirmed",
+    )
+
+
+def make_payment(i):
+    return Payment(
+        id=i,
+        rental=make_rental(i),
+        amount=Decimal("359.96"),
+        payment_date=datetime.datetime(2025, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        status="completed",
+    )
+
+
+def car_page(size=20):
+    return {"count": 5000, "next": None, "previous": None,
+            "results": CarSerializer([make_car(i) for i in range(size)], many=True).data}
+
+
+def rental_page(size=20):
+    return {"count": 5000, "next": None, "previous": None,
+            "results": RentalSerializer([make_rental(i) for i in range(size)], many=True).data}
+
+
+def payment_page(size=20):
+    return PaymentSerializer([make_payment(i) for i in range(size)], many=True).data
+
+
+def native_rows(size=1000):
+    """
+    Rows holding native ``Decimal``/``date``/``datetime`` values, as produced by
+    ``values()`` querysets in reporting endpoints.
+    """
+    return [
+        {
+            "car": i,
+            "day": datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+            "revenue": Decimal("120.50") * (i % 7),
+            "updated": datetime.datetime(2025, 1, 1, 8, 0, tzinfo=datetime.timezone.utc),
+        }
+        for i in range(size)
+    ]
@@ -0,0 +1,52 @@
+"""
+Shared helpers for the micro-benchmarks.
+
+Run a benchmark from the project root, e.g. ``python -m benchmarks.bench_renderers``.
+The usual ``.env`` variables must be available, ``USE_SQLITE=true`` is enough for
+benchmarks that need a database.
+"""
+import os
+import statistics
+import time
+
+
+def setup_django():
+    """
+    Configures Django for a standalone benchmark script.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'car_rental.settings')
+    import django
+    django.setup()
+
+
+def timeit(func, number=100, repeat=5):
+    """
+    Times ``func`` and returns the median duration of a single call in microseconds.
+
+    :param func: Zero-argument callable to time.
+    :type func: callable
+    :param number: Calls per measurement.
+    :type number: int
+    :param repeat: Number of measurements.
+    :type repeat: int
+    :rtype: float
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples) * 1e6
+
+
+def print_table(headers, rows):
+    """
+    Prints rows as a plain aligned table.
+    """
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
@@ -6,5 +6,13 @@ admin.site.register([
     Customer,
     Car,
     Rental,
-    Payment
+    Payment,
+    ArchivedRental,
+    SeasonalRate,
+    CarDailyRollup,
+    PaymentDailyRollup,
+    Watermark,
+    ChangeLogEntry,
+    Task,
+    IdempotencyKey,
 ])
@@ -0,0 +1,287 @@
+"""
+Fleet utilization and revenue analytics.
+
+Everything is aggregated by the database: rental days are clipped to the
+reporting period (or to each month of it) inside ``SUM`` expressions, and
+revenue and payments are summed per month with ``TruncMonth``. The month series
+itself is generated here and sent along as per-period conditional aggregates,
+so each figure costs a single query regardless of how many rentals exist.
+
+Periods reaching back past the archive horizon (see
+:meth:`car_app.managers.RentalQuerySet.history`) run the same aggregates on
+``ArchivedRental`` as well and add the results up, so archiving never changes
+a report.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncMonth
+
+from car_app.models import ArchivedRental, Car, Payment, Rental
+
+BOOKED_STATUSES = ('pending', 'confirmed')
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def month_series(date_from, date_to):
+    """
+    Splits a date range into calendar months clipped to the range.
+
+    :return: ``(month_start, first_day, last_day)`` for every month touched.
+    :rtype: list[tuple[date, date, date]]
+    """
+    months = []
+    month_start = date_from.replace(day=1)
+    while month_start <= date_to:
+        next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        months.append((month_start, max(month_start, date_from), min(next_month - ONE_DAY, date_to)))
+        month_start = next_month
+    return months
+
+
+def clipped_days(date_from, date_to):
+    """
+    Expression for the number of days of a rental inside ``[date_from, date_to]``.
+
+    Only meaningful for rentals that overlap the range, see :func:`overlap_q`.
+    """
+    return ExpressionWrapper(
+        Least(F('end_date'), Value(date_to)) - Greatest(F('start_date'), Value(date_from)) + Value(ONE_DAY),
+        output_field=DurationField(),
+    )
+
+
+def rental_length():
+    """
+    Expression for the length of a rental in days, both ends included.
+    """
+    return ExpressionWrapper(F('end_date') - F('start_date') + Value(ONE_DAY), output_field=DurationField())
+
+
+def overlap_q(date_from, date_to):
+    """
+    Filter for rentals with at least one day inside ``[date_from, date_to]``.
+    """
+    return Q(start_date__lte=date_to, end_date__gte=date_from)
+
+
+def _days(duration):
+    return duration.days if duration else 0
+
+
+def booked_rentals():
+    """
+    Rentals that count towards utilization.
+    """
+    return Rental.objects.filter(status__in=BOOKED_STATUSES).order_by()
+
+
+def booked_history(date_from, date_to):
+    """
+    Rentals that count towards utilization in a period, live and archived.
+
+    The archived queryset is empty, and costs no query, unless the period
+    reaches the archive.
+
+    :return: The live and the archived rentals, with the same columns.
+    :rtype: tuple[QuerySet, QuerySet]
+    """
+    return (
+        booked_rentals(),
+        Rental.objects.archived(date_from, date_to, status__in=BOOKED_STATUSES).order_by(),
+    )
+
+
+def _add(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return first + second
+
+
+def car_utilization(date_from, date_to):
+    """
+    Rented days, utilization percentage and booked revenue per car.
+
+    :rtype: list[dict]
+    """
+    period_days = (date_to - date_from).days + 1
+    by_car = {}
+    for rentals in booked_history(date_from, date_to):
+        rows = (rentals
+                .filter(overlap_q(date_from, date_to))
+                .values('car')
+                .annotate(
+                    rented=Sum(clipped_days(date_from, date_to)),
+                    revenue=Sum('total_cost', filter=Q(start_date__range=(date_from, date_to))),
+                ))
+        for row in rows:
+            total = by_car.setdefault(row['car'], {})
+            total['rented'] = _add(total.get('rented'), row['rented'])
+            total['revenue'] = _add(total.get('revenue'), row['revenue'])
+
+    result = []
+    for car in Car.objects.order_by('pk').values('pk', 'brand', 'model'):
+        row = by_car.get(car['pk'], {})
+        rented = _days(row.get('rented'))
+        result.append({
+            'car': car['pk'],
+            'brand': car['brand'],
+            'model': car['model'],
+            'rented_days': rented,
+            'utilization': round(rented * 100 / period_days, 2),
+            'revenue': row.get('revenue') or Decimal('0'),
+        })
+    return result
+
+
+def monthly_summary(date_from, date_to):
+    """
+    Rented days, booked revenue and completed payments per month.
+
+    :rtype: list[dict]
+    """
+    months = month_series(date_from, date_to)
+    rented, revenue, payments = {}, {}, {}
+    for rentals in booked_history(date_from, date_to):
+        for key, days in rentals.aggregate(**{
+            'm%d' % i: Sum(clipped_days(first, last), filter=overlap_q(first, last))
+            for i, (_, first, last) in enumerate(months)
+        }).items():
+            rented[key] = _add(rented.get(key), days)
+        for row in (rentals
+                    .filter(start_date__range=(date_from, date_to))
+                    .annotate(month=TruncMonth('start_date'))
+                    .values('month')
+                    .annotate(total=Sum('total_cost'))):
+            revenue[row['month']] = _add(revenue.get(row['month']), row['total'])
+
+    paid = [Payment.objects.filter(status='completed').annotate(paid=F('amount'))]
+    if Rental.objects.reaches_archive(date_from):
+        paid.append(ArchivedRental.objects.filter(payment_status='completed').annotate(paid=F('payment_amount')))
+    for payment_rows in paid:
+        for row in (payment_rows
+                    .filter(payment_date__date__range=(date_from, date_to))
+                    .order_by()
+                    .annotate(month=TruncMonth('payment_date'))
+                    .values('month')
+                    .annotate(total=Sum('paid'))):
+            month = row['month'].date()
+            payments[month] = _add(payments.get(month), row['total'])
+
+    return [
+        {
+            'month': month,
+            'rented_days': _days(rented.get('m%d' % i)),
+            'booked_revenue': revenue.get(month) or Decimal('0'),
+            'payments': payments.get(month) or Decimal('0'),
+        }
+        for i, (month, _, _) in enumerate(months)
+    ]
+
+
+def average_rental_days(date_from, date_to):
+    """
+    Average length in days of the rentals starting inside the range.
+
+    :rtype: float
+    """
+    days, count = datetime.timedelta(0), 0
+    for rentals in booked_history(date_from, date_to):
+        totals = (rentals
+                  .filter(start_date__range=(date_from, date_to))
+                  .aggregate(days=Sum(rental_length()), count=Count('pk')))
+        days += totals['days'] or datetime.timedelta(0)
+        count += totals['count']
+    return round(days.total_seconds() / 86400 / count, 2) if count else 0.0
+
+
+def fleet_report(date_from, date_to):
+    """
+    The complete owner report for a period.
+
+    :rtype: dict
+    """
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'days': (date_to - date_from).days + 1,
+        'average_rental_days': average_rental_days(date_from, date_to),
+        'cars': car_utilization(date_from, date_to),
+        'months': monthly_summary(date_from, date_to),
+    }
+
+
+def rental_counts(today):
+    """
+    Rentals per status and the number of cars out today, in one query.
+
+    :return: A count per rental status and ``cars_out``.
+    :rtype: dict[str, int]
+    """
+    return Rental.objects.order_by().aggregate(
+        **{status: Count('pk', filter=Q(status=status)) for status, _ in Rental.status_enum},
+        cars_out=Count('car', distinct=True, filter=Q(
+            status__in=BOOKED_STATUSES, start_date__lte=today, end_date__gte=today, return_date__isnull=True,
+        )),
+    )
+
+
+def payment_counts():
+    """
+    Number and total amount of payments per status.
+
+    :rtype: dict[str, dict]
+    """
+    rows = {
+        row['status']: row
+        for row in (Payment.objects
+                    .order_by()
+                    .values('status')
+                    .annotate(count=Count('pk'), amount=Sum('amount')))
+    }
+    return {
+        status: {'count': rows.get(status, {}).get('count', 0),
+                 'amount': rows.get(status, {}).get('amount') or Decimal('0')}
+        for status, _ in Payment.status_enum
+    }
+
+
+def todays_rentals(today):
+    """
+    The booked rentals starting or ending today, with their car, customer and payment status.
+
+    :rtype: list[dict]
+    """
+    return list(booked_rentals()
+                .filter(Q(start_date=today) | Q(end_date=today))
+                .order_by('start_date', 'pk')
+                .values('id', 'start_date', 'end_date', 'status', 'car',
+                        brand=F('car__brand'), model=F('car__model'),
+                        first_name=F('customer__user__first_name'), last_name=F('customer__user__last_name'),
+                        email=F('customer__user__email'), payment_status=F('payment__status')))
+
+
+def dashboard(today=None):
+    """
+    Everything the owner dashboard shows, in four queries.
+
+    :param today: The day to report on, defaults to today.
+    :type today: date
+    :rtype: dict
+    """
+    today = today or datetime.date.today()
+    rentals = rental_counts(today)
+    fleet = Car.objects.order_by().aggregate(cars=Count('pk'), available=Count('pk', filter=Q(availability=True)))
+    fleet['out'] = rentals.pop('cars_out')
+    todays = todays_rentals(today)
+    return {
+        'date': today,
+        'rentals': rentals,
+        'payments': payment_counts(),
+        'fleet': fleet,
+        'pickups_today': [row for row in todays if row['start_date'] == today],
+        'returns_today': [row for row in todays if row['end_date'] == today],
+    }
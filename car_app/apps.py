@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CarAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "car_app"
+
+    def ready(self):
+        from car_app import signals  # noqa: F401
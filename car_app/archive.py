@@ -0,0 +1,135 @@
+"""
+Archival of finished rentals.
+
+Confirmed and cancelled rentals that ended before a cutoff are moved, with
+their payments, from the live ``Rental``/``Payment`` tables into
+``ArchivedRental`` in batches, each batch one transaction. The live tables then
+only hold current and recent rentals, which keeps overlap checks and listings
+working on a small set of rows. Postgres declarative partitioning is not an
+option here since ``Payment`` references ``Rental`` by primary key, so the same
+archive table is used on every backend.
+
+The archive horizon (a ``Watermark``) is advanced before any row moves, so a
+query that decides from the horizon whether to look into the archive never
+misses a row that is on its way there.
+
+Rows are deleted without the per-row delete signals: each batch logs its
+tombstones with one :func:`car_app.changefeed.record_many` call per model, the
+rollups and reports already count archived rentals, and the availability of
+days that long past does not matter to anyone.
+"""
+import datetime
+import time
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from car_app import changefeed, response_cache
+from car_app.managers import ARCHIVE_WATERMARK, archive_horizon
+from car_app.models import ArchivedRental, Payment, Rental, Watermark
+
+ARCHIVABLE_STATUSES = ('confirmed', 'cancelled')
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    """
+    Outcome of one archival run.
+
+    :ivar rentals: Rentals moved to the archive.
+    :ivar batches: Number of batches (transactions) used.
+    :ivar seconds: Wall clock duration of the run.
+    """
+    rentals: int
+    batches: int
+    seconds: float
+
+
+def _archived(rental):
+    payment = getattr(rental, 'payment', None)
+    return ArchivedRental(
+        id=rental.pk,
+        customer_id=rental.customer_id,
+        car_id=rental.car_id,
+        start_date=rental.start_date,
+        end_date=rental.end_date,
+        return_date=rental.return_date,
+        total_cost=rental.total_cost,
+        status=rental.status,
+        created_at=rental.created_at,
+        payment_id=payment.pk if payment else None,
+        payment_amount=payment.amount if payment else None,
+        payment_date=payment.payment_date if payment else None,
+        payment_status=payment.status if payment else '',
+        provider_reference=payment.provider_reference if payment else '',
+    )
+
+
+def _delete(model, ids):
+    """
+    Deletes rows by primary key with one plain DELETE, without the per-row
+    signals ``QuerySet.delete()`` loads every row to send.
+    """
+    if not ids:
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM %s WHERE %s IN (%s)' % (
+                quote(model._meta.db_table), quote(model._meta.pk.column), ', '.join(['%s'] * len(ids))
+            ),
+            ids,
+        )
+
+
+def advance_horizon(before):
+    """
+    Moves the archive horizon forward to ``before``; it never moves back.
+
+    :type before: date
+    """
+    horizon = archive_horizon()
+    if horizon is None or before > horizon:
+        value = timezone.make_aware(datetime.datetime.combine(before, datetime.time.min))
+        Watermark.objects.update_or_create(name=ARCHIVE_WATERMARK, defaults={'value': value})
+
+
+def archive_rentals(before, batch_size=1000):
+    """
+    Moves finished rentals that ended before ``before`` to the archive.
+
+    :param before: Rentals ending on this day or later stay live.
+    :type before: date
+    :param batch_size: Rentals moved per transaction.
+    :type batch_size: int
+    :rtype: ArchiveResult
+    """
+    started = time.perf_counter()
+    advance_horizon(before)
+    moved = batches = 0
+
+    while True:
+        with transaction.atomic():
+            rentals = list(Rental.objects
+                           .filter(status__in=ARCHIVABLE_STATUSES, end_date__lt=before)
+                           .select_related('payment')
+                           .order_by('pk')[:batch_size])
+            if not rentals:
+                break
+            ids = [rental.pk for rental in rentals]
+            payment_ids = [rental.payment.pk for rental in rentals if getattr(rental, 'payment', None)]
+            ArchivedRental.objects.bulk_create([_archived(rental) for rental in rentals])
+            changefeed.record_many(Payment, payment_ids, 'delete')
+            changefeed.record_many(Rental, ids, 'delete')
+            # Payment is the only model referencing Rental, so plain DELETEs are safe.
+            _delete(Payment, payment_ids)
+            _delete(Rental, ids)
+        moved += len(rentals)
+        batches += 1
+        if len(rentals) < batch_size:
+            break
+
+    if moved:
+        response_cache.invalidate('dashboard')
+    return ArchiveResult(moved, batches, time.perf_counter() - started)
@@ -0,0 +1,225 @@
+"""
+Per car availability calendars backed by day bitmaps.
+
+Each car's booked days inside a rolling window are kept in the cache as a
+bitmap, one bit per day starting at the first day of the current month
+(bit ``i`` is set when day ``window_start + i`` is booked by a pending or
+confirmed rental). Bitmaps of many cars are loaded with one ``get_many`` and
+the missing ones are built together with a single query. Combining the
+calendars of several cars is a bitwise AND or OR.
+
+Bitmaps are never patched in place, since concurrent writers (and a reader
+storing a bitmap it built before a booking committed) would overwrite each
+other's bits. Instead every car has a version in the cache, part of its
+bitmap's key: rental changes bump it once committed (see
+:mod:`car_app.signals`), and readers store what they built under the version
+they read before querying, so a bitmap built from outdated rows is stored
+under a key nobody reads any more. A version that was evicted starts again
+from the clock rather than from a constant, so it never comes back to a value
+whose bitmap may still be cached.
+
+The cache key also contains the window start, so the window rolls forward at
+the start of every month on its own. :func:`book` and :func:`release` also
+publish the change to live subscribers through :mod:`car_app.broker`.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from car_app.analytics import BOOKED_STATUSES
+from car_app.broker import get_broker
+from car_app.models import Rental
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def availability_settings():
+    """
+    Returns the ``AVAILABILITY`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'WINDOW_DAYS': 400,
+        'CACHE_TIMEOUT': 3600,
+    }
+    options.update(getattr(settings, 'AVAILABILITY', {}))
+    return options
+
+
+def window(today=None):
+    """
+    The first and last day covered by the bitmaps.
+
+    :rtype: tuple[date, date]
+    """
+    start = (today or datetime.date.today()).replace(day=1)
+    return start, start + datetime.timedelta(days=availability_settings()['WINDOW_DAYS'] - 1)
+
+
+def _version_key(car_id):
+    return f"availability:{car_id}:version"
+
+
+def _cache_key(car_id, start, version):
+    return f"availability:{car_id}:{start.isoformat()}:{version}"
+
+
+def versions(car_ids):
+    """
+    The current bitmap version of each car.
+
+    :type car_ids: Iterable[int]
+    :rtype: dict[int, int]
+    """
+    keys = {_version_key(car_id): car_id for car_id in car_ids}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: value for key, value in found.items()}
+
+
+def invalidate(car_id):
+    """
+    Drops the car's cached bitmap by moving it to a new version.
+    """
+    key = _version_key(car_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def _range_mask(start, first, last):
+    """
+    Bitmask of the days ``[first, last]`` clipped to a window starting at ``start``.
+    """
+    window_last = start + datetime.timedelta(days=availability_settings()['WINDOW_DAYS'] - 1)
+    first, last = max(first, start), min(last, window_last)
+    if first > last:
+        return 0
+    return ((1 << ((last - first).days + 1)) - 1) << (first - start).days
+
+
+def _to_bytes(bits):
+    return bits.to_bytes((availability_settings()['WINDOW_DAYS'] + 7) // 8, 'little')
+
+
+def _booked(car_ids, first, last):
+    return (Rental.objects
+            .filter(car_id__in=car_ids, status__in=BOOKED_STATUSES, start_date__lte=last, end_date__gte=first)
+            .order_by()
+            .values_list('car_id', 'start_date', 'end_date'))
+
+
+def bitmaps(car_ids):
+    """
+    Booked day bitmaps of the given cars, from the cache or built with one query.
+
+    :param car_ids: Cars to load.
+    :type car_ids: Iterable[int]
+    :return: The bitmap of every car as an int, bit 0 being the window start.
+    :rtype: dict[int, int]
+    """
+    start, last = window()
+    car_versions = versions(car_ids)
+    keys = {_cache_key(car_id, start, version): car_id for car_id, version in car_versions.items()}
+    cached = cache.get_many(keys)
+    result = {keys[key]: int.from_bytes(value, 'little') for key, value in cached.items()}
+
+    missing = [car_id for key, car_id in keys.items() if key not in cached]
+    if missing:
+        built = dict.fromkeys(missing, 0)
+        for car_id, start_date, end_date in _booked(missing, start, last):
+            built[car_id] |= _range_mask(start, start_date, end_date)
+        cache.set_many(
+            {_cache_key(car_id, start, car_versions[car_id]): _to_bytes(bits) for car_id, bits in built.items()},
+            availability_settings()['CACHE_TIMEOUT'],
+        )
+        result.update(built)
+    return result
+
+
+def bit_runs(bits):
+    """
+    Runs of consecutive set bits of a bitmap.
+
+    :param bits: The bitmap, bit 0 first.
+    :type bits: int
+    :return: ``(offset, length)`` of every run, in order.
+    :rtype: list[tuple[int, int]]
+    """
+    runs = []
+    offset = 0
+    while bits:
+        skip = (bits & -bits).bit_length() - 1
+        bits >>= skip
+        offset += skip
+        length = (~bits & (bits + 1)).bit_length() - 1
+        runs.append((offset, length))
+        bits >>= length
+        offset += length
+    return runs
+
+
+def book(car_id, first, last):
+    """
+    Records newly booked days of a car: drops its bitmap and notifies subscribers.
+    """
+    invalidate(car_id)
+    get_broker().publish('booking', car=car_id, date_from=first.isoformat(), date_to=last.isoformat(), booked=True)
+
+
+def release(car_id, first, last):
+    """
+    Records days of a car that may have been freed: drops its bitmap and
+    notifies subscribers.
+    """
+    invalidate(car_id)
+    get_broker().publish('booking', car=car_id, date_from=first.isoformat(), date_to=last.isoformat(), booked=False)
+
+
+def ranges(bits, start, first, last):
+    """
+    Turns the set bits of a bitmap into ``(first_day, last_day)`` runs inside ``[first, last]``.
+
+    :rtype: list[tuple[date, date]]
+    """
+    return [
+        (start + datetime.timedelta(days=offset), start + datetime.timedelta(days=offset + length - 1))
+        for offset, length in bit_runs(bits & _range_mask(start, first, last))
+    ]
+
+
+def calendar(car_ids, first, last):
+    """
+    Booked days of each car, and the days on which all or any of them are booked.
+
+    :param car_ids: The cars to include.
+    :type car_ids: list[int]
+    :param first: First day, not before the window start.
+    :type first: date
+    :param last: Last day, not after the window end.
+    :type last: date
+    :rtype: dict
+    """
+    start, _ = window()
+    by_car = bitmaps(car_ids)
+    all_booked = _range_mask(start, first, last)
+    any_booked = 0
+    for bits in by_car.values():
+        all_booked &= bits
+        any_booked |= bits
+    return {
+        'date_from': first,
+        'date_to': last,
+        'cars': [{'car': car_id, 'booked': ranges(by_car[car_id], start, first, last)} for car_id in car_ids],
+        'all_booked': ranges(all_booked, start, first, last),
+        'any_booked': ranges(any_booked, start, first, last),
+    }
@@ -0,0 +1,59 @@
+"""
+A Bloom filter: a set that can answer "certainly not a member" without storing
+its members.
+
+Membership tests may give false positives, at a rate chosen when the filter is
+sized, but never false negatives, so a negative answer can skip a lookup and a
+positive one has to be confirmed by it.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A fixed size Bloom filter of strings.
+
+    Bit positions come from one BLAKE2b digest split into two 64-bit halves
+    (Kirsch-Mitzenmacher double hashing).
+
+    :ivar size: Number of bits.
+    :type size: int
+    :ivar hashes: Number of bits set per member.
+    :type hashes: int
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        :param capacity: Number of members the filter is sized for; it keeps
+            working beyond that, with a growing false positive rate.
+        :type capacity: int
+        :param error_rate: False positive rate at ``capacity`` members.
+        :type error_rate: float
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        """
+        :type value: str
+        """
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def update(self, values):
+        """
+        :type values: collections.abc.Iterable[str]
+        """
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
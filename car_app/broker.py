@@ -0,0 +1,258 @@
+"""
+In-process publish/subscribe broker for live availability events.
+
+Subscribers are asyncio consumers (the SSE and long-poll views) on the ASGI
+event loop; publishers are ordinary sync code, usually an ``on_commit`` hook.
+Each subscriber owns a small bounded queue fed with ``call_soon_threadsafe``,
+so an idle subscriber costs one queue and a slow one only loses its own events
+and is told to resync. Recent events are kept in a ring buffer so reconnecting
+clients can resume from their last event id.
+
+Events reach the other processes through the configured backend, which also
+numbers them: ids are consecutive and every process sees the events in id
+order, so a cursor never skips an event published by a slower process.
+:class:`LocalBackend` dispatches in the publishing process only, and
+:class:`RedisBackend` numbers and relays events in one Redis script, with one
+listener thread per process dispatching them locally. An id gap (the listener
+lost the channel for a while) empties the buffer, so cursors from before the
+gap are told to resync.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def events_settings():
+    """
+    Returns the ``EVENTS`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'BACKEND': 'car_app.broker.LocalBackend',
+        'HISTORY': 1000,
+        'QUEUE_SIZE': 100,
+        'HEARTBEAT_SECONDS': 15,
+        'POLL_TIMEOUT': 25,
+    }
+    options.update(getattr(settings, 'EVENTS', {}))
+    return options
+
+
+class Subscription:
+    """
+    One consumer's queue of events, bound to the event loop it was created on.
+
+    :ivar overflowed: Set when the consumer missed events, because it fell
+        behind or the backend lost some.
+    """
+
+    def __init__(self, broker, queue_size):
+        self._broker = broker
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event):
+        """
+        Hands an event to the consumer; safe to call from any thread.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop is closed, the consumer is gone.
+            self._broker.unsubscribe(self)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """
+        Waits for the next event.
+
+        :return: The event, or None after ``timeout`` seconds without one.
+        :rtype: dict | None
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class Broker:
+    """
+    Fans events out to the subscribers of this process.
+    """
+
+    def __init__(self, history=1000, queue_size=100):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        self._queue_size = queue_size
+        self._evicted_id = 0
+        self.backend = None
+
+    @property
+    def last_id(self):
+        with self._lock:
+            return self._history[-1]['id'] if self._history else 0
+
+    def subscribe(self):
+        """
+        Registers a consumer; must be called from a running event loop.
+
+        :rtype: Subscription
+        """
+        subscription = Subscription(self, self._queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type, **data):
+        """
+        Publishes an event to every process through the backend.
+
+        :param event_type: Name of the event, e.g. ``"booking"``.
+        :type event_type: str
+        :param data: JSON serializable event payload.
+        """
+        self.backend.publish(event_type, data)
+
+    def dispatch(self, event):
+        """
+        Delivers an event to the subscribers of this process.
+
+        Events have to arrive in id order, as the backends deliver them.
+        """
+        with self._lock:
+            missed = bool(self._history) and event['id'] != self._history[-1]['id'] + 1
+            if missed:
+                logger.warning("Missed events %d to %d", self._history[-1]['id'] + 1, event['id'] - 1)
+                self._history.clear()
+                self._evicted_id = event['id'] - 1
+            elif len(self._history) == self._history.maxlen:
+                self._evicted_id = self._history[0]['id']
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if missed:
+                subscription.overflowed = True
+            subscription.push(event)
+
+    def since(self, event_id):
+        """
+        Buffered events newer than ``event_id``, oldest first.
+
+        :return: The events, or None when some of them already left the buffer.
+        :rtype: list[dict] | None
+        """
+        with self._lock:
+            if event_id < self._evicted_id:
+                return None
+            return [event for event in self._history if event['id'] > event_id]
+
+
+def _first_id():
+    # Ids start from the clock, so cursors handed out before a restart or a
+    # lost counter stay below the new ids.
+    return time.time_ns() // 1000
+
+
+class LocalBackend:
+    """
+    Numbers events and delivers them to the publishing process only.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._lock = threading.Lock()
+        self._last_id = _first_id()
+
+    def publish(self, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            self.broker.dispatch({'id': self._last_id, 'type': event_type, 'data': data})
+
+
+# Numbering and publishing in one script keeps the channel in id order.
+PUBLISH_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'NX')
+local id = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', KEYS[2], id .. ' ' .. ARGV[2])
+return id
+"""
+
+
+class RedisBackend:
+    """
+    Numbers events with a Redis counter and relays them between processes
+    over a Redis pub/sub channel.
+
+    Uses ``EVENTS['REDIS_URL']`` and ``EVENTS['CHANNEL']``; the counter is
+    kept under the channel name with an ``:id`` suffix.
+    """
+
+    def __init__(self, broker):
+        import redis
+
+        options = events_settings()
+        self.broker = broker
+        self.channel = options.get('CHANNEL', 'car_app.events')
+        self.client = redis.Redis.from_url(options['REDIS_URL'])
+        self._publish = self.client.register_script(PUBLISH_SCRIPT)
+        threading.Thread(target=self._listen, name='events-listener', daemon=True).start()
+
+    def publish(self, event_type, data):
+        message = json.dumps({'type': event_type, 'data': data})
+        self._publish(keys=[f'{self.channel}:id', self.channel], args=[_first_id(), message])
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    event_id, body = message['data'].split(b' ', 1)
+                    self.broker.dispatch({'id': int(event_id), **json.loads(body)})
+            except Exception:
+                logger.exception("Lost the events channel, reconnecting")
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    The broker of this process, created with the configured backend on first use.
+
+    :rtype: Broker
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                options = events_settings()
+                broker = Broker(history=options['HISTORY'], queue_size=options['QUEUE_SIZE'])
+                broker.backend = import_string(options['BACKEND'])(broker)
+                _broker = broker
+    return _broker
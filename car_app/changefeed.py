@@ -0,0 +1,232 @@
+"""
+Change feed for incremental sync of cars, rentals and payments.
+
+Every save or delete of those models appends a :class:`ChangeLogEntry` in the
+same transaction (see :mod:`car_app.signals`; bulk ``update()`` and
+``delete()`` callers log through :func:`record_many`). Clients pass the
+``position`` of the last entry they saw back as ``?since=`` to get only what
+changed after it. The feed always serves the current state of the changed
+objects, so older entries of an object can be dropped by :func:`compact`
+without losing anything. Tombstones of deleted objects are kept for
+``TOMBSTONE_TTL``; clients whose cursor is older than the last purged tombstone
+have to sync from scratch.
+
+Primary keys are handed out when a transaction writes its entry, not when it
+commits, so a slow transaction can commit a lower key behind a client's
+cursor. Entries are therefore written without a position and numbered by
+:func:`sequence` once they are committed, under a lock on the sequence
+watermark: an entry committed later always gets a higher position than any a
+client has seen. The writing transaction runs :func:`sequence` after its
+commit, :func:`compact` catches up on anything a failed run left behind, and
+reading the feed only filters numbered entries, without locks or writes.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from car_app.managers import defer_car_details
+from car_app.models import Car, ChangeLogEntry, Payment, Rental, Watermark
+
+MODELS = {'car': Car, 'rental': Rental, 'payment': Payment}
+TOMBSTONE_WATERMARK = 'change_feed_tombstones'
+SEQUENCE_WATERMARK = 'change_feed_sequence'
+
+
+def feed_settings():
+    """
+    Returns the ``CHANGE_FEED`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'PAGE_SIZE': 500,
+        'SEQUENCE_BATCH_SIZE': 1000,
+        'COMPACT_AFTER': datetime.timedelta(days=1),
+        'TOMBSTONE_TTL': datetime.timedelta(days=30),
+    }
+    options.update(getattr(settings, 'CHANGE_FEED', {}))
+    return options
+
+
+def customer_of(instance):
+    """
+    The customer a logged object belongs to, None for cars.
+    """
+    if isinstance(instance, Rental):
+        return instance.customer_id
+    if isinstance(instance, Payment):
+        if Payment.rental.is_cached(instance):
+            return instance.rental.customer_id
+        return Rental.objects.filter(pk=instance.rental_id).values_list('customer_id', flat=True).first()
+    return None
+
+
+def record(instance, action):
+    """
+    Logs a change of one car, rental or payment.
+
+    :param action: "upsert" or "delete".
+    :type action: str
+    """
+    ChangeLogEntry.objects.create(
+        model=instance._meta.model_name,
+        object_id=instance.pk,
+        action=action,
+        customer_id=customer_of(instance),
+    )
+    transaction.on_commit(sequence, robust=True)
+
+
+def record_many(model, ids, action='upsert'):
+    """
+    Logs a change of many rows at once, for bulk ``update()`` callers.
+
+    Callers deleting rows in bulk log them before the delete, while their
+    customers can still be looked up.
+
+    :param model: Rental or Payment.
+    :param ids: Primary keys of the changed rows.
+    :type ids: Iterable[int]
+    """
+    customer_field = 'customer_id' if model is Rental else 'rental__customer_id'
+    rows = model.objects.filter(pk__in=list(ids)).values_list('pk', customer_field)
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(model=model._meta.model_name, object_id=pk, action=action, customer_id=customer_id)
+        for pk, customer_id in rows
+    )
+    transaction.on_commit(sequence, robust=True)
+
+
+def purge_horizon():
+    """
+    Position of the newest purged tombstone, 0 when none was purged.
+
+    :rtype: int
+    """
+    return Watermark.objects.filter(name=TOMBSTONE_WATERMARK).values_list('position', flat=True).first() or 0
+
+
+def sequence():
+    """
+    Numbers the committed entries that have no position yet, in the order they were written.
+
+    Runs in its own transaction holding the sequence watermark's row lock, so
+    concurrent callers number one after the other. Writers run it once their
+    transaction commits; a run finding nothing to number is cheap.
+
+    :return: The highest position handed out so far.
+    :rtype: int
+    """
+    batch_size = feed_settings()['SEQUENCE_BATCH_SIZE']
+    with transaction.atomic():
+        mark, _ = Watermark.objects.select_for_update().get_or_create(
+            name=SEQUENCE_WATERMARK, defaults={'value': timezone.now(), 'position': 0},
+        )
+        position = mark.position or 0
+        while True:
+            pending = list(ChangeLogEntry.objects.filter(position=None).order_by('pk').only('pk')[:batch_size])
+            for entry in pending:
+                position += 1
+                entry.position = position
+            ChangeLogEntry.objects.bulk_update(pending, ['position'])
+            if len(pending) < batch_size:
+                break
+        if position != mark.position:
+            mark.value, mark.position = timezone.now(), position
+            mark.save(update_fields=['value', 'position'])
+    return position
+
+
+def changes(since, customer_id=None, limit=None):
+    """
+    Changes after the ``since`` cursor, at most one per object, oldest first.
+
+    Only entries :func:`sequence` already numbered are served; the read takes
+    no locks and writes nothing.
+
+    :param since: Position of the last change the client has seen, 0 for an
+        initial sync.
+    :type since: int
+    :param customer_id: Restrict rentals and payments to one customer; cars
+        are always included. None returns everything.
+    :type customer_id: int | None
+    :param limit: Maximum number of entries to read.
+    :type limit: int | None
+    :return: ``(entries, cursor, has_more)``, where entries are
+        ``(position, model, object_id, action)`` and cursor is the position
+        to pass as the next ``since``.
+    :rtype: tuple[list[tuple], int, bool]
+    """
+    options = feed_settings()
+    limit = limit or options['PAGE_SIZE']
+
+    entries = ChangeLogEntry.objects.filter(position__gt=since)
+    if customer_id is not None:
+        entries = entries.filter(Q(model='car') | Q(customer_id=customer_id))
+    rows = list(entries.order_by('position').values_list('position', 'model', 'object_id', 'action')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for row in rows:
+        latest[row[1], row[2]] = row
+    cursor = rows[-1][0] if rows else since
+    return sorted(latest.values()), cursor, has_more
+
+
+def load_objects(entries):
+    """
+    Current state of the upserted objects of a page of entries, one query per model.
+
+    :return: Objects by ``(model, object_id)``; objects deleted meanwhile are missing.
+    :rtype: dict[tuple[str, int], Model]
+    """
+    wanted = {}
+    for _, model, object_id, action in entries:
+        if action == 'upsert':
+            wanted.setdefault(model, []).append(object_id)
+    related = {'rental': ('car', 'customer'), 'payment': ('rental__car', 'rental__customer')}
+    nested_car = {'rental': 'car', 'payment': 'rental__car'}
+    objects = {}
+    for model, ids in wanted.items():
+        queryset = MODELS[model].objects.select_related(*related.get(model, ()))
+        if model in nested_car:
+            queryset = defer_car_details(queryset, nested_car[model])
+        for pk, obj in queryset.in_bulk(ids).items():
+            objects[model, pk] = obj
+    return objects
+
+
+def compact(now=None):
+    """
+    Drops superseded entries older than ``COMPACT_AFTER`` and tombstones older
+    than ``TOMBSTONE_TTL``.
+
+    :return: ``(superseded, tombstones)`` entries deleted.
+    :rtype: tuple[int, int]
+    """
+    options = feed_settings()
+    now = now or timezone.now()
+    sequence()
+
+    newest = (ChangeLogEntry.objects
+              .filter(model=OuterRef('model'), object_id=OuterRef('object_id'))
+              .order_by('-pk')
+              .values('pk')[:1])
+    superseded, _ = (ChangeLogEntry.objects
+                     .filter(created_at__lt=now - options['COMPACT_AFTER'], pk__lt=Subquery(newest))
+                     .delete())
+
+    tombstones = ChangeLogEntry.objects.filter(action='delete', position__isnull=False, created_at__lt=now - options['TOMBSTONE_TTL'])
+    horizon = tombstones.order_by('-position').values_list('position', flat=True).first()
+    purged = 0
+    if horizon is not None:
+        Watermark.objects.update_or_create(
+            name=TOMBSTONE_WATERMARK,
+            defaults={'value': now, 'position': max(horizon, purge_horizon())},
+        )
+        purged, _ = tombstones.filter(position__lte=horizon).delete()
+    return superseded, purged
@@ -0,0 +1,202 @@
+"""
+Response body compression.
+
+gzip is always available; Brotli (``br``) and Zstandard (``zstd``) are used
+when the ``brotli`` and ``zstandard`` packages are installed. The encoding is
+picked from the client's ``Accept-Encoding`` header, with ties broken by the
+order of ``COMPRESSION['ENCODINGS']``.
+"""
+import functools
+import gzip
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+
+def compression_settings():
+    """
+    Returns the ``COMPRESSION`` settings with defaults for missing keys.
+
+    ``MIN_SIZE`` is the smallest body in bytes worth compressing, ``LEVELS``
+    the compression level per encoding, ``CONTENT_TYPES`` the media types (or
+    ``type/`` prefixes) that are compressed and ``EXCLUDED_CONTENT_TYPES`` the
+    ones that never are, such as event streams that must reach the client
+    event by event.
+
+    :rtype: dict
+    """
+    options = {
+        'ENCODINGS': ['zstd', 'br', 'gzip'],
+        'MIN_SIZE': 1024,
+        'LEVELS': {'gzip': 6, 'br': 5, 'zstd': 3},
+        'CONTENT_TYPES': ['text/', 'application/json', 'application/msgpack',
+                          'application/vnd.oai.openapi', 'application/javascript'],
+        'EXCLUDED_CONTENT_TYPES': ['text/event-stream'],
+    }
+    options.update(getattr(settings, 'COMPRESSION', {}))
+    return options
+
+
+def _gzip_compress(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _gzip_compressor(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+
+def _brotli_compress(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _brotli_compressor(level):
+    compressor = brotli.Compressor(quality=level)
+    return compressor.process, compressor.finish
+
+
+def _zstd_compress(data, level):
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _zstd_compressor(level):
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return compressor.compress, compressor.flush
+
+
+CODECS = {'gzip': (_gzip_compress, _gzip_compressor)}
+if brotli is not None:
+    CODECS['br'] = (_brotli_compress, _brotli_compressor)
+if zstandard is not None:
+    CODECS['zstd'] = (_zstd_compress, _zstd_compressor)
+
+
+def available_encodings():
+    """
+    The configured encodings that can be produced here, in order of preference.
+
+    :rtype: tuple[str]
+    """
+    return tuple(encoding for encoding in compression_settings()['ENCODINGS'] if encoding in CODECS)
+
+
+@functools.lru_cache(maxsize=256)
+def _negotiate(header, encodings):
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def negotiate(accept_encoding):
+    """
+    Picks the encoding for a response.
+
+    :param accept_encoding: The request's ``Accept-Encoding`` header.
+    :type accept_encoding: str
+    :return: The encoding, or None to send the body as it is.
+    :rtype: str | None
+    """
+    if not accept_encoding:
+        return None
+    return _negotiate(accept_encoding, available_encodings())
+
+
+def is_compressible(content_type):
+    """
+    Tells whether responses of a content type are compressed.
+
+    :param content_type: The ``Content-Type`` header, parameters included.
+    :type content_type: str
+    :rtype: bool
+    """
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    options = compression_settings()
+    if media_type in options['EXCLUDED_CONTENT_TYPES']:
+        return False
+    return any(media_type == allowed or (allowed.endswith('/') and media_type.startswith(allowed))
+               for allowed in options['CONTENT_TYPES'])
+
+
+def compress(data, encoding):
+    """
+    Compresses a whole body.
+
+    :type data: bytes
+    :param encoding: One of :func:`available_encodings`.
+    :type encoding: str
+    :rtype: bytes
+    """
+    return CODECS[encoding][0](data, compression_settings()['LEVELS'][encoding])
+
+
+def compress_all(data):
+    """
+    Compresses a body with every available encoding, for responses stored in a cache.
+
+    :type data: bytes
+    :return: The compressed bodies by encoding; empty when the body is below ``MIN_SIZE``.
+    :rtype: dict[str, bytes]
+    """
+    if len(data) < compression_settings()['MIN_SIZE']:
+        return {}
+    return {encoding: compress(data, encoding) for encoding in available_encodings()}
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compresses a streamed body chunk by chunk.
+
+    :param chunks: The body chunks.
+    :type chunks: collections.abc.Iterable[bytes]
+    :type encoding: str
+    :rtype: collections.abc.Iterator[bytes]
+    """
+    process, finish = CODECS[encoding][1](compression_settings()['LEVELS'][encoding])
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    """
+    Compresses an asynchronously streamed body, see :func:`compress_stream`.
+
+    :param chunks: The body chunks.
+    :type chunks: collections.abc.AsyncIterable[bytes]
+    :type encoding: str
+    :rtype: collections.abc.AsyncIterator[bytes]
+    """
+    process, finish = CODECS[encoding][1](compression_settings()['LEVELS'][encoding])
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
@@ -1,11 +1,25 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 from car_app.models import *
+from car_app.search import search_customers
+
+
+def brand_choices():
+    """
+    The brands currently in the fleet, as choices for :class:`CarFilter`.
+
+    Passed as a callable, so it runs when a ``brand`` filter is validated and
+    the filter objects shared between requests are never modified.
+    """
+    brands = (Car.objects
+              .values_list('brand', flat=True)
+              .distinct()
+              .order_by('brand'))
+    return [(b, b) for b in brands]
 
 
 class CarFilter(filters.FilterSet):
-    brand = filters.MultipleChoiceFilter(
-        lookup_expr='in'
-    )
+    brand = filters.MultipleChoiceFilter(choices=brand_choices)
     daily_rate_min = filters.NumberFilter(field_name="daily_rate", lookup_expr='gte')
     daily_rate_max = filters.NumberFilter(field_name="daily_rate", lookup_expr='lte')
     production_year_min = filters.NumberFilter(field_name="production_year", lookup_expr='gte')
@@ -20,12 +34,31 @@ class CarFilter(filters.FilterSet):
             'availability': ['exact'],
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
-        brands = (Car.objects
-                  .values_list('brand', flat=True)
-                  .distinct()
-                  .order_by('brand'))
+class DailyRollupFilter(filters.FilterSet):
+    day_from = filters.DateFilter(field_name="day", lookup_expr='gte')
+    day_to = filters.DateFilter(field_name="day", lookup_expr='lte')
+
+
+class CarDailyRollupFilter(DailyRollupFilter):
+    class Meta:
+        model = CarDailyRollup
+        fields = ['car']
+
+
+class PaymentDailyRollupFilter(DailyRollupFilter):
+    class Meta:
+        model = PaymentDailyRollup
+        fields = ['status']
+
+
+class CustomerSearchFilter(SearchFilter):
+    """
+    ``?search=`` for customers over the indexed search columns, see :mod:`car_app.search`.
+    """
 
-        self.filters['brand'].extra['choices'] = [(b, b) for b in brands]
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_customers(queryset, terms)
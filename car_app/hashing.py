@@ -0,0 +1,48 @@
+"""
+Password hashing spread over a pool of processes, for creating many users at once.
+
+Hashing is CPU bound by design, so threads do not help. The salt is drawn and
+the hasher picked in the calling process; workers only run the hasher's
+``encode``. They are started with ``spawn``, so they never inherit the
+caller's database connections, and the hasher needs no Django setup there.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.utils.module_loading import import_string
+
+
+def _encode(job):
+    hasher_path, password, salt = job
+    return import_string(hasher_path)().encode(password, salt)
+
+
+def hash_passwords(passwords, processes=None, min_pool_size=16):
+    """
+    Hashes passwords the way ``make_password`` does.
+
+    :param passwords: The raw passwords; empty ones get an unusable password.
+    :type passwords: list[str | None]
+    :param processes: Worker processes, defaults to the number of CPUs.
+    :type processes: int | None
+    :param min_pool_size: Fewer passwords than this are hashed in this process,
+        since starting the pool would cost more than it saves.
+    :type min_pool_size: int
+    :return: The encoded passwords, in the order given.
+    :rtype: list[str]
+    """
+    hasher = get_hasher()
+    hasher_path = '%s.%s' % (type(hasher).__module__, type(hasher).__qualname__)
+    jobs = [(hasher_path, password, hasher.salt()) for password in passwords if password]
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+
+    if processes <= 1 or len(jobs) < min_pool_size:
+        encoded = [_encode(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            encoded = list(pool.map(_encode, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+
+    encoded = iter(encoded)
+    return [next(encoded) if password else make_password(None) for password in passwords]
@@ -0,0 +1,33 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from car_app.archive import archive_rentals
+
+
+class Command(BaseCommand):
+    help = "Moves finished rentals older than RENTAL_ARCHIVE_AFTER to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            help="Override RENTAL_ARCHIVE_AFTER, in days since the rental ended.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Rentals moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        age = (datetime.timedelta(days=options['older_than_days'])
+               if options['older_than_days'] is not None else settings.RENTAL_ARCHIVE_AFTER)
+        before = datetime.date.today() - age
+        result = archive_rentals(before, batch_size=options['batch_size'])
+        self.stdout.write(
+            f"Archived {result.rentals} rental(s) ending before {before} "
+            f"in {result.batches} batch(es), {result.seconds:.2f}s"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from car_app.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = "Writes the OpenAPI schema to OPENAPI_SCHEMA['DIR'] so it is served without generating it per request."
+
+    def handle(self, *args, **options):
+        for path in build_schema():
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
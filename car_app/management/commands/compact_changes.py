@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from car_app.changefeed import compact
+
+
+class Command(BaseCommand):
+    help = "Drops superseded change feed entries and expired tombstones."
+
+    def handle(self, *args, **options):
+        superseded, tombstones = compact()
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {superseded} superseded entries and {tombstones} tombstone(s)"
+        ))
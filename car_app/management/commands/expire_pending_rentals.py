@@ -0,0 +1,58 @@
+import datetime
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from car_app.sweeper import expire_pending_rentals, purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = ("Cancels rentals that stayed pending for longer than PENDING_RENTAL_TTL and deletes "
+            "Idempotency-Key records older than IDEMPOTENCY_KEY_TTL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ttl-minutes',
+            type=int,
+            help="Override PENDING_RENTAL_TTL, in minutes.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Rentals cancelled per transaction.",
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help="Keep sweeping every --interval seconds until stopped.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help="Seconds between sweeps with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        ttl = (datetime.timedelta(minutes=options['ttl_minutes'])
+               if options['ttl_minutes'] is not None else settings.PENDING_RENTAL_TTL)
+
+        stop_event = threading.Event()
+        if options['loop']:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop_event.set())
+
+        while True:
+            result = expire_pending_rentals(ttl, batch_size=options['batch_size'])
+            self.stdout.write(
+                f"Cancelled {result.rentals} rental(s) and failed {result.payments} payment(s) "
+                f"in {result.batches} batch(es), {result.seconds:.2f}s, "
+                f"{result.rows_per_second:.0f} rows/s"
+            )
+            purged = purge_idempotency_keys(batch_size=options['batch_size'])
+            self.stdout.write(f"Deleted {purged} expired Idempotency-Key record(s)")
+            if not options['loop'] or stop_event.wait(options['interval']):
+                break
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from car_app.onboarding import CustomerImportError, import_customers, read_csv
+
+
+class Command(BaseCommand):
+    help = "Creates customers from a CSV file, all of them or none (see car_app.onboarding)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="The CSV file.")
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help="Password hashing processes, defaults to CUSTOMER_IMPORT['PROCESSES'] or one per CPU.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="Rows per INSERT, defaults to CUSTOMER_IMPORT['BATCH_SIZE'].",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as file:
+                rows = read_csv(file)
+            created = import_customers(rows, processes=options['processes'], batch_size=options['batch_size'])
+        except CustomerImportError as e:
+            for error in e.errors:
+                for field, messages in error['errors'].items():
+                    self.stderr.write(f"Line {error['row']}, {field}: {' '.join(map(str, messages))}")
+            raise CommandError(e.message)
+        self.stdout.write(f"Imported {created} customer(s)")
@@ -0,0 +1,36 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+import car_app.tasks  # noqa: F401 - registers the task functions
+from car_app.task_queue import run_pool
+
+
+class Command(BaseCommand):
+    help = "Runs background tasks from the task queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help="Number of worker threads.",
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help="Exit once no task is due instead of waiting for new ones.",
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop_event.set())
+
+        started = time.perf_counter()
+        processed = run_pool(options['concurrency'], burst=options['burst'], stop_event=stop_event)
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} task(s) in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from car_app.rollups import update_rollups
+
+
+class Command(BaseCommand):
+    help = "Refreshes the daily rental and payment rollups changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help="Rebuild every rollup row instead of starting from the watermark.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        car_rows, payment_rows = update_rollups(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {car_rows} car day(s) and {payment_rows} payment day row(s) "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
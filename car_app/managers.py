@@ -1,4 +1,25 @@
+from django.apps import apps
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
+
+ARCHIVE_WATERMARK = 'rental_archive'
+
+#: Car columns left out of lists and nested cars, see ``CarListSerializer``.
+CAR_DETAIL_FIELDS = ('description',)
+
+
+def defer_car_details(queryset, path=''):
+    """
+    Defers the heavy car columns of a queryset of cars, or of the car at ``path``.
+
+    :param queryset: A queryset of cars or of a model related to a car.
+    :type queryset: QuerySet
+    :param path: Lookup path to the car, e.g. ``'car'``; empty for cars themselves.
+    :type path: str
+    :rtype: QuerySet
+    """
+    prefix = path + '__' if path else ''
+    return queryset.defer(*(prefix + name for name in CAR_DETAIL_FIELDS))
 
 
 class CustomUserManager(BaseUserManager):
@@ -57,3 +78,87 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Superuser must have is_superuser=True.')
 
         return self.create_user(email, password, **extra_fields)
+
+
+def archive_horizon():
+    """
+    The day before which finished rentals may have been moved to the archive.
+
+    Rentals ending on or after this day are always in the live table.
+
+    :return: The horizon, or None when nothing was ever archived.
+    :rtype: date | None
+    """
+    Watermark = apps.get_model('car_app', 'Watermark')
+    value = Watermark.objects.filter(name=ARCHIVE_WATERMARK).values_list('value', flat=True).first()
+    return value.date() if value else None
+
+
+class RentalQuerySet(models.QuerySet):
+    """
+    Rentals in the live table, with opt-in access to archived rentals.
+
+    Plain queries only ever touch the live table, which holds current and recent
+    rentals. Old finished rentals live in ``ArchivedRental`` and are only
+    reached by :meth:`archived` and :meth:`history` when the requested period
+    starts before the archive horizon.
+    """
+
+    def overlapping(self, date_from=None, date_to=None):
+        """
+        Rentals with at least one day inside ``[date_from, date_to]``; open ends are not filtered.
+        """
+        return self.filter(**_overlap_filters(date_from, date_to))
+
+    def reaches_archive(self, date_from=None):
+        """
+        Whether rentals overlapping a period starting at ``date_from`` may have been archived.
+
+        :param date_from: First day of the period, None for an unbounded one.
+        :type date_from: date | None
+        :rtype: bool
+        """
+        horizon = archive_horizon()
+        return horizon is not None and (date_from is None or date_from < horizon)
+
+    def archived(self, date_from=None, date_to=None, **filters):
+        """
+        Archived rentals overlapping a period, or an empty queryset when the
+        period does not reach the archive.
+
+        :param filters: Lookups applied to the archive, e.g. ``customer=customer``.
+        :rtype: QuerySet[ArchivedRental]
+        """
+        ArchivedRental = apps.get_model('car_app', 'ArchivedRental')
+        if not self.reaches_archive(date_from):
+            return ArchivedRental.objects.none()
+        return ArchivedRental.objects.filter(**filters, **_overlap_filters(date_from, date_to))
+
+    def history(self, *fields, date_from=None, date_to=None, **filters):
+        """
+        ``values_list`` of live and, when needed, archived rentals overlapping a period.
+
+        Filters must be passed as keyword arguments so they apply to both tables;
+        the archive is only queried when the period starts before its horizon.
+
+        :param fields: Columns to return, present on both tables.
+        :param filters: Lookups applied to both tables, e.g. ``car_id=1``.
+        :rtype: QuerySet[tuple]
+        """
+        live = self.filter(**filters).overlapping(date_from, date_to).order_by().values_list(*fields)
+        if not self.reaches_archive(date_from):
+            return live
+        archived = self.archived(date_from, date_to, **filters).order_by().values_list(*fields)
+        return live.union(archived, all=True)
+
+
+def _overlap_filters(date_from, date_to):
+    filters = {}
+    if date_from is not None:
+        filters['end_date__gte'] = date_from
+    if date_to is not None:
+        filters['start_date__lte'] = date_to
+    return filters
+
+
+RentalManager = models.Manager.from_queryset(RentalQuerySet)
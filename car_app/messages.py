@@ -11,3 +11,24 @@ CUSTOMER_NOT_FOUND = "Customer not found"
 PAYMENT_NOT_FOUND = "Payment not found"
 RENTAL_NOT_FOUND = "Rental not found"
 CUSTOMER_PROFILE_EXISTS = "Customer profile already exists"
+CAR_NOT_FOUND = "Car not found"
+RENTAL_CONFIRMATION_SUBJECT = "Your car rental is booked"
+RENTAL_CONFIRMATION_BODY = "Your rental of {car} from {start_date} to {end_date} is booked. Total cost: {total_cost}."
+IDEMPOTENCY_KEY_IN_USE = "A request with this Idempotency-Key is still being processed"
+IDEMPOTENCY_KEY_MISMATCH = "This Idempotency-Key was already used for a different request"
+IDEMPOTENCY_KEY_TOO_LONG = "Idempotency-Key must be at most 255 characters"
+PAYMENT_EXPIRED = "Payment not completed in time"
+CHANGE_FEED_RESYNC = "The cursor is older than the retained change history, sync again from since=0"
+INVALID_EVENT_PARAMETERS = "cars must be a comma separated list of car ids and event ids must be integers"
+EVENTS_REQUIRE_ASGI = "Live events are only served by the ASGI application"
+EVENTS_RESYNC = "Some events are no longer available, reload the availability calendar and subscribe again"
+CUSTOMER_IMPORT_INVALID = "The file has invalid rows, nothing was imported"
+CUSTOMER_IMPORT_MALFORMED = "The file is not a valid CSV file: {error}"
+CUSTOMER_IMPORT_MISSING_COLUMNS = "The file is missing columns: {columns}"
+CUSTOMER_IMPORT_NO_FILE = "Upload the CSV file in the file field"
+CUSTOMER_IMPORT_NOT_UTF8 = "The file is not UTF-8 encoded, save it as CSV UTF-8 and upload it again"
+CUSTOMER_IMPORT_TOO_LARGE = "The file has more than {max_rows} rows, use the import_customers command"
+CUSTOMER_IMPORT_TOO_MANY_PASSWORDS = ("The file has more than {max_passwords} passwords, "
+                                      "use the import_customers command")
+DUPLICATE_IN_FILE = "Appears more than once in the file"
+AVAILABILITY_NOTHING_TO_CHECK = "Pass an email or a phone_number to check"
@@ -0,0 +1,52 @@
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from car_app import compression
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses response bodies with the best encoding the client accepts.
+
+    Bodies below ``COMPRESSION['MIN_SIZE']`` are sent as they are, and so are
+    bodies that would not get smaller. Streaming responses are compressed as
+    they stream. A response carrying a ``precompressed`` dict of encoded bodies
+    (see :class:`car_app.mixins.CachedResponseMixin`) is served from it instead
+    of being compressed again.
+
+    Like Django's ``GZipMiddleware``, it weakens strong ETags, since the
+    compressed bytes differ from the ones the tag was computed for.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not response.has_header('Content-Type'):
+            return response
+        if not response.streaming and len(response.content) < compression.compression_settings()['MIN_SIZE']:
+            return response
+        if not compression.is_compressible(response['Content-Type']):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compression.compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            precompressed = getattr(response, 'precompressed', None) or {}
+            content = precompressed.get(encoding) or compression.compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
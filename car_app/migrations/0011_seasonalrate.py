@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-19 07:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0010_remove_user_phone_number_customer_phone_number"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeasonalRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("brand", models.CharField(blank=True, max_length=255)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("daily_rate", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "car",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seasonal_rates",
+                        to="car_app.car",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("car__isnull", False),
+                            models.Q(("brand", ""), _negated=True),
+                            _connector="OR",
+                        ),
+                        name="chk_seasonalrate_car_or_brand",
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("end_date__gte", models.F("start_date"))),
+                        name="chk_seasonalrate_valid_range",
+                    ),
+                ],
+            },
+        ),
+    ]
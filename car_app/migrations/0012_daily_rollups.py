@@ -0,0 +1,107 @@
+# Generated by Django 5.2 on 2026-10-19 07:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0011_seasonalrate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Watermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("value", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PaymentDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "status"),
+                        name="uniq_paymentdailyrollup_day_status",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CarDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("rentals", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "car",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="car_app.car",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day"], name="cardailyrollup_day_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("car", "day"), name="uniq_cardailyrollup_car_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0014_payment_provider_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="rental",
+            index=models.Index(
+                fields=["status", "created_at"], name="rental_status_created_idx"
+            ),
+        ),
+    ]
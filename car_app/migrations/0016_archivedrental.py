@@ -0,0 +1,85 @@
+# Generated by Django 5.2 on 2026-10-19 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0015_rental_status_created_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedRental",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("return_date", models.DateField(blank=True, null=True)),
+                ("total_cost", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("confirmed", "Confirmed"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("payment_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "payment_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                ("payment_date", models.DateTimeField(blank=True, null=True)),
+                (
+                    "payment_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("pending", "Pending"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("provider_reference", models.CharField(blank=True, max_length=255)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "car",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_rentals",
+                        to="car_app.car",
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_rentals",
+                        to="car_app.customer",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["customer", "start_date"],
+                        name="archivedrental_customer_idx",
+                    ),
+                    models.Index(
+                        fields=["car", "start_date"], name="archivedrental_car_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
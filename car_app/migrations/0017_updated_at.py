@@ -0,0 +1,44 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0016_archivedrental"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="rental",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["updated_at"], name="payment_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="rental",
+            index=models.Index(fields=["updated_at"], name="rental_updated_idx"),
+        ),
+    ]
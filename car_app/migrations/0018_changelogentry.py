@@ -0,0 +1,92 @@
+# Generated by Django 5.2 on 2026-10-19 07:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    """
+    Logs every existing row once, so the feed can serve an initial sync.
+    """
+    ChangeLogEntry = apps.get_model("car_app", "ChangeLogEntry")
+    Car = apps.get_model("car_app", "Car")
+    Rental = apps.get_model("car_app", "Rental")
+    Payment = apps.get_model("car_app", "Payment")
+
+    def entries():
+        for pk in Car.objects.order_by("pk").values_list("pk", flat=True).iterator():
+            yield ChangeLogEntry(model="car", object_id=pk, action="upsert")
+        for pk, customer_id in Rental.objects.order_by("pk").values_list("pk", "customer_id").iterator():
+            yield ChangeLogEntry(model="rental", object_id=pk, action="upsert", customer_id=customer_id)
+        for pk, customer_id in Payment.objects.order_by("pk").values_list("pk", "rental__customer_id").iterator():
+            yield ChangeLogEntry(model="payment", object_id=pk, action="upsert", customer_id=customer_id)
+
+    batch = []
+    for entry in entries():
+        batch.append(entry)
+        if len(batch) == 1000:
+            ChangeLogEntry.objects.bulk_create(batch)
+            batch = []
+    ChangeLogEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0017_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watermark",
+            name="position",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[
+                            ("car", "Car"),
+                            ("rental", "Rental"),
+                            ("payment", "Payment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("upsert", "Upsert"), ("delete", "Delete")],
+                        max_length=10,
+                    ),
+                ),
+                ("customer_id", models.BigIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["model", "object_id"], name="changelog_object_idx"
+                    ),
+                    models.Index(
+                        fields=["customer_id", "id"], name="changelog_customer_idx"
+                    ),
+                    models.Index(fields=["created_at"], name="changelog_created_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-19 08:03
+
+from django.db import migrations, models
+
+
+def summarize(text, length=200):
+    # Frozen copy of car_app.models.summarize at the time of this migration.
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if text[length - 1] != " " and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" .,;:-") + "\u2026"
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    Fills the summary of every existing car from its description.
+    """
+    Car = apps.get_model("car_app", "Car")
+    batch = []
+    for car in Car.objects.only("pk", "description").order_by("pk").iterator(chunk_size=1000):
+        car.summary = summarize(car.description)
+        batch.append(car)
+        if len(batch) == 1000:
+            Car.objects.bulk_update(batch, ["summary"])
+            batch = []
+    Car.objects.bulk_update(batch, ["summary"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0018_changelogentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="summary",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
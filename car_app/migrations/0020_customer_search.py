@@ -0,0 +1,109 @@
+# Generated by Django 5.2 on 2026-10-19 08:19
+
+import unicodedata
+
+from django.db import migrations, models
+
+FOLD = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "æ": "ae", "œ": "oe", "ħ": "h", "ı": "i"})
+
+
+def search_columns(first_name, last_name, email, phone_number):
+    # Frozen copy of car_app.search.search_columns at the time of this migration.
+    text = unicodedata.normalize("NFKD", " ".join((first_name, last_name, email)).casefold().translate(FOLD))
+    return {
+        "search_text": " ".join("".join(c for c in text if not unicodedata.combining(c)).split())[:400],
+        "search_email": (email or "").strip().lower()[:255],
+        "search_phone": "".join(c for c in str(phone_number or "") if c.isdigit())[:32],
+    }
+
+
+def backfill_search_columns(apps, schema_editor):
+    """
+    Fills the search columns of every existing customer.
+    """
+    Customer = apps.get_model("car_app", "Customer")
+    batch = []
+    customers = (Customer.objects
+                 .select_related("user")
+                 .only("pk", "phone_number", "user__first_name", "user__last_name", "user__email")
+                 .order_by("pk"))
+    for customer in customers.iterator(chunk_size=1000):
+        user = customer.user
+        for name, value in search_columns(user.first_name, user.last_name, user.email,
+                                          customer.phone_number).items():
+            setattr(customer, name, value)
+        batch.append(customer)
+        if len(batch) == 1000:
+            Customer.objects.bulk_update(batch, ["search_text", "search_email", "search_phone"])
+            batch = []
+    Customer.objects.bulk_update(batch, ["search_text", "search_email", "search_phone"])
+
+
+POSTGRES_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX customer_search_text_trgm ON car_app_customer USING gin (search_text gin_trgm_ops)",
+]
+POSTGRES_DROP_INDEX = ["DROP INDEX IF EXISTS customer_search_text_trgm"]
+
+# External content FTS5 table mirroring search_text, kept in step by triggers.
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE car_app_customer_fts USING fts5("
+    "search_text, content='car_app_customer', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER car_app_customer_fts_insert AFTER INSERT ON car_app_customer BEGIN "
+    "INSERT INTO car_app_customer_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER car_app_customer_fts_delete AFTER DELETE ON car_app_customer BEGIN "
+    "INSERT INTO car_app_customer_fts(car_app_customer_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER car_app_customer_fts_update AFTER UPDATE OF search_text ON car_app_customer BEGIN "
+    "INSERT INTO car_app_customer_fts(car_app_customer_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO car_app_customer_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "INSERT INTO car_app_customer_fts(car_app_customer_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS car_app_customer_fts_insert",
+    "DROP TRIGGER IF EXISTS car_app_customer_fts_delete",
+    "DROP TRIGGER IF EXISTS car_app_customer_fts_update",
+    "DROP TABLE IF EXISTS car_app_customer_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0019_car_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="search_email",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="search_phone",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=32
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="search_text",
+            field=models.CharField(blank=True, editable=False, max_length=400),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_for_vendor({"postgresql": POSTGRES_INDEX, "sqlite": SQLITE_INDEX}),
+            run_for_vendor({"postgresql": POSTGRES_DROP_INDEX, "sqlite": SQLITE_DROP_INDEX}),
+        ),
+    ]
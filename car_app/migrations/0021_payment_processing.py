@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-19 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0020_customer_search"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedrental",
+            name="payment_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paymentdailyrollup",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 08:56
+
+from django.db import migrations, models
+from django.db.models import F, Max
+from django.utils import timezone
+
+
+def number_existing_entries(apps, schema_editor):
+    """
+    Gives existing entries their primary key as position, so cursors clients
+    already hold stay valid, and starts the sequence after them.
+    """
+    ChangeLogEntry = apps.get_model("car_app", "ChangeLogEntry")
+    Watermark = apps.get_model("car_app", "Watermark")
+    ChangeLogEntry.objects.update(position=F("pk"))
+    last = ChangeLogEntry.objects.aggregate(last=Max("pk"))["last"] or 0
+    purged = Watermark.objects.filter(name="change_feed_tombstones").values_list("position", flat=True).first()
+    Watermark.objects.update_or_create(
+        name="change_feed_sequence",
+        defaults={"value": timezone.now(), "position": max(last, purged or 0)},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_app", "0021_payment_processing"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="changelogentry",
+            name="changelog_customer_idx",
+        ),
+        migrations.AddField(
+            model_name="changelogentry",
+            name="position",
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_entries, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="changelogentry",
+            index=models.Index(
+                fields=["customer_id", "position"], name="changelog_customer_pos_idx"
+            ),
+        ),
+    ]
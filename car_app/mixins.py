@@ -0,0 +1,258 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from car_app import response_cache
+from car_app.messages import IDEMPOTENCY_KEY_IN_USE, IDEMPOTENCY_KEY_MISMATCH, IDEMPOTENCY_KEY_TOO_LONG
+from car_app.models import IdempotencyKey
+
+
+def fieldset_projection(serializer, model, prefix=''):
+    """
+    Works out which columns and relations a serializer needs to render.
+
+    :param serializer: The (possibly narrowed) serializer instance.
+    :type serializer: rest_framework.serializers.Serializer
+    :param model: The model the serializer renders.
+    :type model: django.db.models.Model
+    :param prefix: Lookup prefix of the relation being walked.
+    :type prefix: str
+    :return: A ``(columns, related)`` pair for ``.only()`` and ``.select_related()``,
+        or None when a field reads something that cannot be mapped to a column.
+    :rtype: tuple[list[str], list[str]] | None
+    """
+    columns, related = [], []
+    for field in serializer.fields.values():
+        if field.write_only or isinstance(field, serializers.HiddenField):
+            continue
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+
+        path = prefix + field.source
+        columns.append(path)
+        if isinstance(field, serializers.BaseSerializer):
+            nested = fieldset_projection(field, model_field.related_model, path + '__')
+            if nested is None:
+                return None
+            related.append(path)
+            columns.extend(nested[0])
+            related.extend(nested[1])
+    return columns, related
+
+
+class SparseFieldsetMixin:
+    """
+    Narrows the queryset of a generic view to the columns requested with
+    ``?fields=`` / ``?expand=``, so the database reads only what is rendered.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if self.request.method not in SAFE_METHODS or not ('fields' in params or 'expand' in params):
+            return queryset
+
+        projection = fieldset_projection(self.get_serializer(), queryset.model)
+        if projection is None:
+            return queryset
+        columns, related = projection
+        return queryset.select_related(None).select_related(*related).only(*columns)
+
+
+class ConditionalGetMixin:
+    """
+    Answers ``If-None-Match`` and ``If-Modified-Since`` on a detail view with
+    304 Not Modified.
+
+    The version of the object is read with one ``values_list`` query over the
+    ``updated_at`` columns listed in ``version_fields`` (the object's own and
+    those of the related rows it renders), so an unchanged object is neither
+    loaded nor serialized. The ETag also covers the query string and the
+    negotiated media type, since both change the representation.
+    """
+    version_fields = ['updated_at']
+
+    def get_version(self):
+        """
+        Timestamps making up the version of the requested object.
+
+        :return: The timestamps, or None when the object does not exist.
+        :rtype: tuple | None
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list(*self.version_fields)
+                .first())
+
+    def get_etag(self, request, version):
+        fingerprint = json.dumps([
+            self.kwargs,
+            [value.isoformat() if value else None for value in version],
+            sorted(request.query_params.lists()),
+            request.accepted_media_type,
+        ], sort_keys=True, default=str)
+        return quote_etag(hashlib.sha256(fingerprint.encode()).hexdigest()[:32])
+
+    def get(self, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag(request, version)
+        last_modified = max((value for value in version if value), default=None)
+        headers = {'ETag': etag}
+        if last_modified:
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+        if if_none_match is not None:
+            # Weak comparison: CompressionMiddleware sends the tag as W/"...".
+            tags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+            not_modified = '*' in if_none_match or etag in tags
+        else:
+            not_modified = (if_modified_since is not None and last_modified is not None
+                            and int(last_modified.timestamp()) <= if_modified_since)
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Caches the rendered responses of a public list view, together with their
+    compressed variants, so a hit neither queries, serializes nor compresses.
+
+    Responses are stored per full path and negotiated media type in the
+    ``response_cache_namespace`` of :mod:`car_app.response_cache`, which must
+    be invalidated whenever the listed rows change. The browsable API is not
+    cached, since it renders the requesting user.
+    """
+    response_cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'api':
+            return super().list(request, *args, **kwargs)
+
+        # Taken before the query, so a change committed meanwhile lands in a newer version.
+        key = response_cache.cache_key(self.response_cache_namespace, request.get_full_path(),
+                                       request.accepted_media_type)
+        entry = response_cache.get(key)
+        if entry is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            entry = response_cache.store(self.response_cache_namespace, key, response.data,
+                                         response['Content-Type'], response.content)
+        else:
+            response = Response(entry['data'], content_type=entry['content_type'])
+            # Setting the content marks the response as rendered.
+            response.content = entry['content']
+            response['Content-Type'] = entry['content_type']
+
+        response.precompressed = entry['precompressed']
+        return response
+
+
+class IdempotencyMixin:
+    """
+    Makes ``post`` safe to retry with an ``Idempotency-Key`` header.
+
+    The view implements ``create``, which the mixin's ``post`` wraps. The first
+    request with a key runs normally and its response is stored; later requests
+    from the same user with the same key get the stored response back (marked
+    with ``Idempotent-Replayed: true``) after a single cache lookup. A key reused
+    with a different body is rejected with 422, and a key whose first request is
+    still running with 409. Server errors are not stored, so the client can
+    retry them. Keys expire after ``IDEMPOTENCY_KEY_TTL``.
+    """
+    idempotency_header = 'Idempotency-Key'
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return self.create(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"message": IDEMPOTENCY_KEY_TOO_LONG}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = self._request_fingerprint(request)
+        cache_key = 'idempotency:%s:%s' % (request.user.pk, hashlib.sha256(key.encode()).hexdigest())
+        stored = cache.get(cache_key)
+        record = None
+        if stored is None:
+            record, created = IdempotencyKey.objects.get_or_create(
+                user=request.user, key=key, defaults={'request_hash': fingerprint}
+            )
+            if not created and record.created_at < timezone.now() - self._ttl():
+                record.delete()
+                record = IdempotencyKey.objects.create(user=request.user, key=key, request_hash=fingerprint)
+            elif not created:
+                if record.response_status is None:
+                    return Response({"message": IDEMPOTENCY_KEY_IN_USE}, status=status.HTTP_409_CONFLICT)
+                stored = {
+                    'request_hash': record.request_hash,
+                    'status': record.response_status,
+                    'body': record.response_body,
+                }
+
+        if stored is not None:
+            if stored['request_hash'] != fingerprint:
+                return Response({"message": IDEMPOTENCY_KEY_MISMATCH}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            return Response(stored['body'], status=stored['status'], headers={'Idempotent-Replayed': 'true'})
+
+        try:
+            response = self.create(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        body = json.loads(json.dumps(response.data, cls=encoders.JSONEncoder))
+        record.response_status = response.status_code
+        record.response_body = body
+        record.save(update_fields=['response_status', 'response_body'])
+        cache.set(
+            cache_key,
+            {'request_hash': fingerprint, 'status': response.status_code, 'body': body},
+            timeout=self._ttl().total_seconds(),
+        )
+        return response
+
+    def _ttl(self):
+        return getattr(settings, 'IDEMPOTENCY_KEY_TTL', datetime.timedelta(hours=24))
+
+    def _request_fingerprint(self, request):
+        data = request.data
+        if hasattr(data, 'lists'):
+            data = dict(data.lists())
+        payload = json.dumps([request.method, request.path, data], sort_keys=True, cls=encoders.JSONEncoder)
+        return hashlib.sha256(payload.encode()).hexdigest()
@@ -1,13 +1,33 @@
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import AbstractUser, PermissionsMixin, AbstractBaseUser
-from .managers import CustomUserManager
+from .managers import CustomUserManager, RentalManager
+from .search import search_columns
 from django.db import models
 from django.db.models.fields import CharField
+from django.utils import timezone
 from phone_field import PhoneField
 from django.core.validators import MaxLengthValidator, MinLengthValidator, MinValueValidator, MaxValueValidator
 import datetime
 
 
+SUMMARY_LENGTH = 200
+
+
+def summarize(text, length=SUMMARY_LENGTH):
+    """
+    Shortens a text to at most ``length`` characters, cutting at a word boundary.
+
+    :rtype: str
+    """
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if text[length - 1] != " " and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" .,;:-") + "\u2026"
+
+
 def current_year():
     return datetime.date.today().year
 
@@ -74,6 +94,14 @@ class Customer(models.Model):
     :type citizenship: str
     :ivar phone_number: The unique phone number of the user.
     :type phone_number: str
+    :ivar updated_at: The timestamp of the last change.
+    :type updated_at: datetime
+    :ivar search_text: The user's names and e-mail, normalized for search.
+    :type search_text: str
+    :ivar search_email: The user's lowercased e-mail, for prefix search.
+    :type search_email: str
+    :ivar search_phone: The digits of the phone number, for prefix search.
+    :type search_phone: str
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     date_of_birth = models.DateField()
@@ -84,6 +112,25 @@ class Customer(models.Model):
     country = models.CharField(max_length=255)
     citizenship = models.CharField(max_length=255)
     phone_number = PhoneField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_text = models.CharField(max_length=400, blank=True, editable=False)
+    search_email = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    search_phone = models.CharField(max_length=32, blank=True, editable=False, db_index=True)
+
+    def save(self, *args, **kwargs):
+        self.update_search_columns()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_text', 'search_email', 'search_phone'}
+        super().save(*args, **kwargs)
+
+    def update_search_columns(self):
+        """
+        Fills the search columns from the user and the phone number, see :mod:`car_app.search`.
+        """
+        user = self.user
+        for name, value in search_columns(user.first_name, user.last_name, user.email, self.phone_number).items():
+            setattr(self, name, value)
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}" if self.user else "Customer without user"
@@ -99,6 +146,9 @@ class Car(models.Model):
     :type model: CharField
     :ivar description: A text description of the car.
     :type description: TextField
+    :ivar summary: The start of the description, kept up to date on save and
+        shown in lists instead of the full text.
+    :type summary: CharField
     :ivar production_year: The year the car was produced
     :type production_year: PositiveIntegerField
     :ivar mileage: The mileage of the car.
@@ -110,10 +160,13 @@ class Car(models.Model):
     :ivar availability: A boolean flag indicating whether the car is available for
         rental.
     :type availability: BooleanField
+    :ivar updated_at: The timestamp of the last change.
+    :type updated_at: DateTimeField
     """
     brand = models.CharField(max_length=255)
     model = models.CharField(max_length=255)
     description = models.TextField()
+    summary = models.CharField(max_length=SUMMARY_LENGTH, blank=True, editable=False)
     production_year = models.PositiveIntegerField(
         validators=[MinValueValidator(1886), MaxValueValidator(current_year())])
     mileage = models.PositiveIntegerField()
@@ -121,11 +174,68 @@ class Car(models.Model):
                            validators=[MinLengthValidator(17), MaxLengthValidator(17)])
     daily_rate = models.DecimalField(max_digits=10, decimal_places=2)
     availability = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    loaded_availability = None
+
+    def save(self, *args, **kwargs):
+        self.summary = summarize(self.description)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'summary'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'availability' in field_names:
+            instance.loaded_availability = instance.availability
+        return instance
 
     def __str__(self):
         return self.brand + " " + self.model
 
 
+class SeasonalRate(models.Model):
+    """
+    A daily rate that replaces the car's base rate for a date range.
+
+    A rate applies either to a single car or to every car of a brand; car
+    specific rates take precedence over brand rates.
+
+    :ivar car: The car the rate applies to, or None for a brand rate.
+    :type car: Car or None
+    :ivar brand: The brand the rate applies to, blank for a car rate.
+    :type brand: str
+    :ivar start_date: First day the rate applies to.
+    :type start_date: date
+    :ivar end_date: Last day the rate applies to.
+    :type end_date: date
+    :ivar daily_rate: The daily rate within the range.
+    :type daily_rate: Decimal
+    """
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, null=True, blank=True, related_name='seasonal_rates')
+    brand = models.CharField(max_length=255, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    daily_rate = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(car__isnull=False) | ~models.Q(brand=''),
+                name='chk_seasonalrate_car_or_brand',
+            ),
+            models.CheckConstraint(
+                condition=models.Q(end_date__gte=models.F('start_date')),
+                name='chk_seasonalrate_valid_range',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.car or self.brand}: {self.daily_rate} ({self.start_date} - {self.end_date})"
+
+
 class Rental(models.Model):
     """
     Represents a rental transaction for a car rental service.
@@ -147,6 +257,8 @@ class Rental(models.Model):
     :type status: str
     :ivar created_at: The timestamp when the rental record is created.
     :type created_at: datetime
+    :ivar updated_at: The timestamp of the last change.
+    :type updated_at: datetime
     """
     status_enum = [
         ('pending', 'Pending'),
@@ -161,6 +273,39 @@ class Rental(models.Model):
     total_cost = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=50, choices=status_enum, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RentalManager()
+
+    loaded_booking = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='rental_status_created_idx'),
+            models.Index(fields=['updated_at'], name='rental_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Receivers compare the booking with the one loaded; from here on the saved one counts.
+        self.loaded_booking = self.booking()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if {'car_id', 'start_date', 'end_date', 'status'} <= loaded.keys():
+            instance.loaded_booking = instance.booking()
+        return instance
+
+    def booking(self):
+        """
+        The fields deciding which days of which car the rental blocks.
+
+        :return: ``(car_id, start_date, end_date, status)``
+        :rtype: tuple
+        """
+        return self.car_id, self.start_date, self.end_date, self.status
 
     def __str__(self):
         return f"Rental of {self.car} by {self.customer}"
@@ -176,11 +321,18 @@ class Payment(models.Model):
     :type amount: DecimalField
     :ivar payment_date: Date and time when the payment was made.
     :type payment_date: DateTimeField
-    :ivar status: Status of the payment ('pending', 'completed', 'failed').
+    :ivar status: Status of the payment ('pending', 'processing', 'completed', 'failed').
     :type status: CharField
+    :ivar provider_reference: The payment provider's id of the charge.
+    :type provider_reference: CharField
+    :ivar failure_reason: Why the provider declined the charge.
+    :type failure_reason: CharField
+    :ivar updated_at: Date and time of the last change.
+    :type updated_at: DateTimeField
     """
     status_enum = [
         ('pending', 'Pending'),
+        ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed')
     ]
@@ -189,6 +341,269 @@ class Payment(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=50, choices=status_enum, default='pending')
+    provider_reference = models.CharField(max_length=255, blank=True)
+    failure_reason = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Payment of {self.amount} for {self.rental}"
+
+
+class ArchivedRental(models.Model):
+    """
+    A finished rental moved out of the live table by ``archive_rentals``,
+    together with its payment.
+
+    The rental keeps its primary key. Use ``Rental.objects.archived()`` or
+    ``Rental.objects.history()`` to query archived and live rentals alike.
+
+    :ivar payment_id: Primary key the payment had, None if there was no payment.
+    :type payment_id: int or None
+    :ivar payment_amount: Amount of the payment.
+    :type payment_amount: Decimal or None
+    :ivar payment_date: Date and time of the payment.
+    :type payment_date: datetime or None
+    :ivar payment_status: Final status of the payment, empty if there was no payment.
+    :type payment_status: str
+    :ivar provider_reference: The payment provider's id of the charge.
+    :type provider_reference: str
+    :ivar archived_at: When the rental was archived.
+    :type archived_at: datetime
+    """
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_rentals')
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='archived_rentals')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    return_date = models.DateField(null=True, blank=True)
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=50, choices=Rental.status_enum)
+    created_at = models.DateTimeField()
+    payment_id = models.BigIntegerField(null=True, blank=True)
+    payment_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    payment_date = models.DateTimeField(null=True, blank=True)
+    payment_status = models.CharField(max_length=50, choices=Payment.status_enum, blank=True)
+    provider_reference = models.CharField(max_length=255, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'start_date'], name='archivedrental_customer_idx'),
+            models.Index(fields=['car', 'start_date'], name='archivedrental_car_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived rental {self.pk} of {self.car_id} by {self.customer_id}"
+
+
+class CarDailyRollup(models.Model):
+    """
+    Per car, per day summary of booked rentals, maintained by ``update_rollups``.
+
+    Only days with at least one booked (not cancelled) rental have a row.
+
+    :ivar car: The car the row summarizes.
+    :type car: Car
+    :ivar day: The summarized day.
+    :type day: date
+    :ivar rentals: Number of booked rentals covering the day.
+    :type rentals: int
+    :ivar revenue: The day's share of those rentals' total cost.
+    :type revenue: Decimal
+    """
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+    rentals = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['car', 'day'], name='uniq_cardailyrollup_car_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='cardailyrollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.car_id} on {self.day}: {self.rentals} rental(s), {self.revenue}"
+
+
+class PaymentDailyRollup(models.Model):
+    """
+    Per day, per status summary of payments, maintained by ``update_rollups``.
+
+    :ivar day: The day the payments were made.
+    :type day: date
+    :ivar status: The payment status summarized by the row.
+    :type status: str
+    :ivar count: Number of payments.
+    :type count: int
+    :ivar amount: Sum of the payments' amounts.
+    :type amount: Decimal
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=Payment.status_enum)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='uniq_paymentdailyrollup_day_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.count} payment(s), {self.amount}"
+
+
+class Watermark(models.Model):
+    """
+    Remembers how far a background job has processed a table.
+
+    :ivar name: Unique name of the job.
+    :type name: str
+    :ivar value: Rows changed after this moment still have to be processed.
+    :type value: datetime
+    :ivar position: For jobs following a sequence rather than time, the last
+        sequence number processed.
+    :type position: int or None
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField()
+    position = models.BigIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One change of a car, rental or payment, for the incremental sync feed.
+
+    The position is the sequence number clients use as cursor. It is None
+    until :func:`car_app.changefeed.sequence` numbers the committed entry.
+
+    :ivar model: "car", "rental" or "payment".
+    :type model: str
+    :ivar object_id: Primary key of the changed row.
+    :type object_id: int
+    :ivar action: "upsert" or "delete".
+    :type action: str
+    :ivar customer_id: Customer the rental or payment belongs to, None for cars.
+    :type customer_id: int or None
+    :ivar position: Place of the entry in the feed, None until sequenced.
+    :type position: int or None
+    :ivar created_at: When the change happened.
+    :type created_at: datetime
+    """
+    model_enum = [
+        ('car', 'Car'),
+        ('rental', 'Rental'),
+        ('payment', 'Payment')
+    ]
+    action_enum = [
+        ('upsert', 'Upsert'),
+        ('delete', 'Delete')
+    ]
+    model = models.CharField(max_length=20, choices=model_enum)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=action_enum)
+    customer_id = models.BigIntegerField(null=True, blank=True)
+    position = models.BigIntegerField(null=True, blank=True, unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id'], name='changelog_object_idx'),
+            models.Index(fields=['customer_id', 'position'], name='changelog_customer_pos_idx'),
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.position} {self.action} {self.model} {self.object_id}"
+
+
+class Task(models.Model):
+    """
+    A unit of background work, run by the ``run_worker`` command.
+
+    :ivar name: Registered name of the task function.
+    :type name: str
+    :ivar payload: Keyword arguments passed to the task function.
+    :type payload: dict
+    :ivar status: "queued", "running", "done" or "failed".
+    :type status: str
+    :ivar attempts: How many times the task has been started.
+    :type attempts: int
+    :ivar max_attempts: Attempts after which a failing task is given up.
+    :type max_attempts: int
+    :ivar run_at: The task is not started before this moment.
+    :type run_at: datetime
+    :ivar locked_at: When a worker claimed the task, None while queued.
+    :type locked_at: datetime or None
+    :ivar last_error: Traceback of the last failed attempt.
+    :type last_error: str
+    :ivar created_at: The timestamp when the task was queued.
+    :type created_at: datetime
+    """
+    status_enum = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ]
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=50, choices=status_enum, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored outcome of a POST sent with an ``Idempotency-Key`` header.
+
+    :ivar user: The user who sent the request.
+    :type user: User
+    :ivar key: The client supplied key.
+    :type key: str
+    :ivar request_hash: Fingerprint of the request the key was first used with.
+    :type request_hash: str
+    :ivar response_status: HTTP status of the stored response, None while the
+        first request is still being processed.
+    :type response_status: int or None
+    :ivar response_body: The stored response data.
+    :type response_body: dict or None
+    :ivar created_at: The timestamp when the key was first used.
+    :type created_at: datetime
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='uniq_idempotencykey_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
@@ -0,0 +1,354 @@
+"""
+MessagePack encoding for API payloads.
+
+Uses the ``msgpack`` package when it is installed and a pure Python codec
+otherwise; both produce the same bytes. Values JSON can only carry as strings
+get extension types, so clients get them back typed:
+
+========  ======  ===========================================================
+Type      Ext     Payload
+========  ======  ===========================================================
+Decimal   1       The decimal as an ASCII string, e.g. ``b"89.99"``.
+date      2       Days since 1970-01-01 as a big-endian signed 32-bit integer.
+time      3       ISO 8601 string, e.g. ``b"14:30:00"``.
+datetime  -1      The standard MessagePack timestamp, always UTC. Naive
+                  values are taken to be in the current time zone.
+========  ======  ===========================================================
+
+Anything else (UUIDs, lazy translation strings, ...) is encoded the way DRF's
+JSON encoder encodes it.
+"""
+import datetime
+import decimal
+import struct
+
+from django.utils import timezone
+from rest_framework.utils import encoders
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is an optional speed-up
+    msgpack = None
+
+EXT_DECIMAL = 1
+EXT_DATE = 2
+EXT_TIME = 3
+EXT_TIMESTAMP = -1
+
+EPOCH = datetime.date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+UTC = datetime.timezone.utc
+
+
+class PackError(ValueError):
+    """
+    The data cannot be encoded or the bytes are not valid MessagePack.
+    """
+
+
+def _timestamp_parts(value):
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    delta = value - datetime.datetime(1970, 1, 1, tzinfo=UTC)
+    seconds = delta.days * 86400 + delta.seconds
+    return seconds, delta.microseconds * 1000
+
+
+def _ext(value):
+    """
+    The ``(code, payload)`` extension for a value, or None for a value to encode the JSON way.
+    """
+    if isinstance(value, decimal.Decimal):
+        return EXT_DECIMAL, str(value).encode('ascii')
+    if isinstance(value, datetime.datetime):
+        return None
+    if isinstance(value, datetime.date):
+        return EXT_DATE, struct.pack('>i', value.toordinal() - EPOCH_ORDINAL)
+    if isinstance(value, datetime.time):
+        return EXT_TIME, value.isoformat().encode('ascii')
+    return None
+
+
+def _decode_ext(code, data):
+    if code == EXT_DECIMAL:
+        return decimal.Decimal(data.decode('ascii'))
+    if code == EXT_DATE:
+        return datetime.date.fromordinal(struct.unpack('>i', data)[0] + EPOCH_ORDINAL)
+    if code == EXT_TIME:
+        return datetime.time.fromisoformat(data.decode('ascii'))
+    if code == EXT_TIMESTAMP:
+        if len(data) == 4:
+            nanoseconds, seconds = 0, struct.unpack('>I', data)[0]
+        elif len(data) == 8:
+            packed = struct.unpack('>Q', data)[0]
+            nanoseconds, seconds = packed >> 34, packed & 0x3FFFFFFFF
+        elif len(data) == 12:
+            nanoseconds, seconds = struct.unpack('>Iq', data)
+        else:
+            raise PackError('Invalid timestamp length %d' % len(data))
+        if nanoseconds > 999999999:
+            raise PackError('Invalid timestamp nanoseconds %d' % nanoseconds)
+        return datetime.datetime(1970, 1, 1, tzinfo=UTC) + datetime.timedelta(
+            seconds=seconds, microseconds=nanoseconds // 1000
+        )
+    raise PackError('Unknown extension type %d' % code)
+
+
+def _json_default(value):
+    try:
+        return encoders.JSONEncoder().default(value)
+    except TypeError as exc:
+        raise PackError(str(exc))
+
+
+def _msgpack_default(value):
+    # Aware datetimes are packed by msgpack itself, only naive ones end up here.
+    if isinstance(value, datetime.datetime):
+        return timezone.make_aware(value)
+    ext = _ext(value)
+    if ext is not None:
+        return msgpack.ExtType(*ext)
+    return _json_default(value)
+
+
+def _msgpack_ext_hook(code, data):
+    return _decode_ext(code, data)
+
+
+def packb(data):
+    """
+    Encodes data to MessagePack.
+
+    :rtype: bytes
+    :raises PackError: If a value cannot be encoded.
+    """
+    if msgpack is not None:
+        try:
+            return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=True)
+        except (TypeError, ValueError, OverflowError) as exc:
+            raise PackError(str(exc))
+    buffer = bytearray()
+    Packer(buffer).pack(data)
+    return bytes(buffer)
+
+
+# What malformed input makes the decoders or the extension hooks raise:
+# truncated data, unhashable map keys, invalid decimals, out of range dates and
+# timestamps, nesting too deep for the pure decoder. The msgpack package's own
+# errors are ValueErrors.
+DECODE_ERRORS = (ValueError, TypeError, ArithmeticError, IndexError, struct.error, RecursionError)
+
+
+def unpackb(data):
+    """
+    Decodes MessagePack bytes.
+
+    :raises PackError: If the bytes are not a single valid MessagePack value.
+    """
+    try:
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False, ext_hook=_msgpack_ext_hook, timestamp=3, strict_map_key=False)
+        unpacker = Unpacker(data)
+        value = unpacker.unpack()
+    except PackError:
+        raise
+    except DECODE_ERRORS as exc:
+        raise PackError('Truncated or invalid MessagePack data: %s' % exc)
+    if unpacker.position != len(data):
+        raise PackError('Extra data after the MessagePack value')
+    return value
+
+
+class Packer:
+    """
+    Pure Python MessagePack encoder writing into a bytearray.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def pack(self, value):
+        write = self.buffer.extend
+        if value is None:
+            write(b'\xc0')
+        elif value is True:
+            write(b'\xc3')
+        elif value is False:
+            write(b'\xc2')
+        elif isinstance(value, str):
+            self.pack_str(value)
+        elif isinstance(value, int):
+            self.pack_int(value)
+        elif isinstance(value, dict):
+            self.pack_header(len(value), 0x80, 0xde, 0xdf)
+            for key, item in value.items():
+                self.pack(key)
+                self.pack(item)
+        elif isinstance(value, (list, tuple)):
+            self.pack_header(len(value), 0x90, 0xdc, 0xdd)
+            for item in value:
+                self.pack(item)
+        elif isinstance(value, float):
+            write(struct.pack('>Bd', 0xcb, value))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self.pack_bin(bytes(value))
+        elif isinstance(value, datetime.datetime):
+            self.pack_timestamp(value)
+        else:
+            ext = _ext(value)
+            if ext is not None:
+                self.pack_ext(*ext)
+            else:
+                self.pack(_json_default(value))
+
+    def pack_int(self, value):
+        write = self.buffer.extend
+        if 0 <= value < 0x80:
+            write(struct.pack('B', value))
+        elif -0x20 <= value < 0:
+            write(struct.pack('b', value))
+        elif value >= 0:
+            for code, fmt, limit in ((0xcc, '>BB', 0xff), (0xcd, '>BH', 0xffff),
+                                     (0xce, '>BI', 0xffffffff), (0xcf, '>BQ', 0xffffffffffffffff)):
+                if value <= limit:
+                    write(struct.pack(fmt, code, value))
+                    return
+            raise PackError('Integer %d is too large for MessagePack' % value)
+        else:
+            for code, fmt, limit in ((0xd0, '>Bb', -0x80), (0xd1, '>Bh', -0x8000),
+                                     (0xd2, '>Bi', -0x80000000), (0xd3, '>Bq', -0x8000000000000000)):
+                if value >= limit:
+                    write(struct.pack(fmt, code, value))
+                    return
+            raise PackError('Integer %d is too small for MessagePack' % value)
+
+    def pack_str(self, value):
+        data = value.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            self.buffer.append(0xa0 | size)
+        elif size <= 0xff:
+            self.buffer.extend(struct.pack('>BB', 0xd9, size))
+        elif size <= 0xffff:
+            self.buffer.extend(struct.pack('>BH', 0xda, size))
+        else:
+            self.buffer.extend(struct.pack('>BI', 0xdb, size))
+        self.buffer.extend(data)
+
+    def pack_bin(self, data):
+        size = len(data)
+        if size <= 0xff:
+            self.buffer.extend(struct.pack('>BB', 0xc4, size))
+        elif size <= 0xffff:
+            self.buffer.extend(struct.pack('>BH', 0xc5, size))
+        else:
+            self.buffer.extend(struct.pack('>BI', 0xc6, size))
+        self.buffer.extend(data)
+
+    def pack_header(self, size, fix, code16, code32):
+        if size < 16:
+            self.buffer.append(fix | size)
+        elif size <= 0xffff:
+            self.buffer.extend(struct.pack('>BH', code16, size))
+        else:
+            self.buffer.extend(struct.pack('>BI', code32, size))
+
+    def pack_ext(self, code, data):
+        size = len(data)
+        fixed = {1: 0xd4, 2: 0xd5, 4: 0xd6, 8: 0xd7, 16: 0xd8}.get(size)
+        if fixed is not None:
+            self.buffer.extend(struct.pack('>Bb', fixed, code))
+        elif size <= 0xff:
+            self.buffer.extend(struct.pack('>BBb', 0xc7, size, code))
+        elif size <= 0xffff:
+            self.buffer.extend(struct.pack('>BHb', 0xc8, size, code))
+        else:
+            self.buffer.extend(struct.pack('>BIb', 0xc9, size, code))
+        self.buffer.extend(data)
+
+    def pack_timestamp(self, value):
+        seconds, nanoseconds = _timestamp_parts(value)
+        if seconds >> 34 == 0:
+            if nanoseconds == 0 and seconds <= 0xffffffff:
+                self.pack_ext(EXT_TIMESTAMP, struct.pack('>I', seconds))
+            else:
+                self.pack_ext(EXT_TIMESTAMP, struct.pack('>Q', nanoseconds << 34 | seconds))
+        else:
+            self.pack_ext(EXT_TIMESTAMP, struct.pack('>Iq', nanoseconds, seconds))
+
+
+class Unpacker:
+    """
+    Pure Python MessagePack decoder over a bytes object.
+    """
+
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.position = 0
+
+    def take(self, size):
+        start = self.position
+        self.position += size
+        if self.position > len(self.data):
+            raise IndexError('unexpected end of data')
+        return self.data[start:self.position]
+
+    def read(self, fmt):
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))[0]
+
+    def unpack(self):
+        code = self.data[self.position]
+        self.position += 1
+        if code <= 0x7f:
+            return code
+        if code >= 0xe0:
+            return code - 0x100
+        if 0xa0 <= code <= 0xbf:
+            return self.take(code & 0x1f).decode('utf-8')
+        if 0x90 <= code <= 0x9f:
+            return [self.unpack() for _ in range(code & 0x0f)]
+        if 0x80 <= code <= 0x8f:
+            return self.unpack_map(code & 0x0f)
+        simple = {0xc0: None, 0xc2: False, 0xc3: True}
+        if code in simple:
+            return simple[code]
+        if code in UNPACK_SCALARS:
+            return self.read(UNPACK_SCALARS[code])
+        if code in (0xd9, 0xda, 0xdb):
+            return self.take(self.read(SIZES[code])).decode('utf-8')
+        if code in (0xc4, 0xc5, 0xc6):
+            return self.take(self.read(SIZES[code]))
+        if code in (0xdc, 0xdd):
+            return [self.unpack() for _ in range(self.read(SIZES[code]))]
+        if code in (0xde, 0xdf):
+            return self.unpack_map(self.read(SIZES[code]))
+        if code in FIXEXT_SIZES:
+            ext = self.read('>b')
+            return _decode_ext(ext, self.take(FIXEXT_SIZES[code]))
+        if code in (0xc7, 0xc8, 0xc9):
+            size = self.read(SIZES[code])
+            ext = self.read('>b')
+            return _decode_ext(ext, self.take(size))
+        raise PackError('Invalid MessagePack type byte 0x%02x' % code)
+
+    def unpack_map(self, size):
+        result = {}
+        for _ in range(size):
+            key = self.unpack()
+            result[key] = self.unpack()
+        return result
+
+
+UNPACK_SCALARS = {
+    0xca: '>f', 0xcb: '>d',
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+}
+SIZES = {
+    0xd9: '>B', 0xda: '>H', 0xdb: '>I',
+    0xc4: '>B', 0xc5: '>H', 0xc6: '>I',
+    0xdc: '>H', 0xdd: '>I',
+    0xde: '>H', 0xdf: '>I',
+    0xc7: '>B', 0xc8: '>H', 0xc9: '>I',
+}
+FIXEXT_SIZES = {0xd4: 1, 0xd5: 2, 0xd6: 4, 0xd7: 8, 0xd8: 16}
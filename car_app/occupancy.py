@@ -0,0 +1,136 @@
+"""
+Fleet wide occupancy matrix: which car is booked on which day.
+
+All booked rental intervals of the period are loaded with one query and turned
+into a cars x days matrix in one pass. With NumPy (in requirements.txt),
+interval starts and ends are scattered into a difference array (+1 on the first
+day, -1 after the last) and a cumulative sum along the days gives the number of
+bookings per cell. Without NumPy, every row is a Python int used as a bitmap
+and each interval is OR-ed in as a mask, which is also linear in the number of
+intervals.
+
+Rows are returned as int bitmaps (bit 0 is the first day), ready to be encoded
+as runs or as one packed binary matrix.
+"""
+import base64
+import datetime
+
+from car_app.analytics import BOOKED_STATUSES
+from car_app.availability import bit_runs
+from car_app.models import Car, Rental
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy is an optional speed-up
+    numpy = None
+
+
+def load_intervals(first, last):
+    """
+    Booked rental intervals overlapping ``[first, last]``, as day offsets from ``first``.
+
+    Intervals are clipped to the period.
+
+    :return: ``(car_id, first_offset, last_offset)`` of every rental.
+    :rtype: list[tuple[int, int, int]]
+    """
+    rows = (Rental.objects
+            .filter(status__in=BOOKED_STATUSES, start_date__lte=last, end_date__gte=first)
+            .order_by()
+            .values_list('car_id', 'start_date', 'end_date'))
+    days = (last - first).days
+    return [
+        (car_id, max((start_date - first).days, 0), min((end_date - first).days, days))
+        for car_id, start_date, end_date in rows
+    ]
+
+
+def _matrix_numpy(car_ids, intervals, days):
+    index = {car_id: row for row, car_id in enumerate(car_ids)}
+    intervals = [(index[car_id], start, end) for car_id, start, end in intervals if car_id in index]
+    diff = numpy.zeros((len(car_ids), days + 1), dtype=numpy.int32)
+    if intervals:
+        rows, starts, ends = numpy.array(intervals, dtype=numpy.int64).T
+        numpy.add.at(diff, (rows, starts), 1)
+        numpy.add.at(diff, (rows, ends + 1), -1)
+    booked = numpy.cumsum(diff, axis=1)[:, :days] > 0
+    packed = numpy.packbits(booked, axis=1, bitorder='little')
+    return [int.from_bytes(row.tobytes(), 'little') for row in packed]
+
+
+def _matrix_python(car_ids, intervals, days):
+    index = {car_id: row for row, car_id in enumerate(car_ids)}
+    rows = [0] * len(car_ids)
+    for car_id, start, end in intervals:
+        row = index.get(car_id)
+        if row is not None:
+            rows[row] |= ((1 << (end - start + 1)) - 1) << start
+    return rows
+
+
+def build_matrix(car_ids, intervals, days, use_numpy=None):
+    """
+    Builds the occupancy rows of the given cars.
+
+    :param car_ids: Cars in row order.
+    :type car_ids: list[int]
+    :param intervals: ``(car_id, first_offset, last_offset)`` tuples, clipped to ``days``.
+    :type intervals: list[tuple[int, int, int]]
+    :param days: Number of days (columns).
+    :type days: int
+    :param use_numpy: Force or forbid the NumPy implementation; by default it
+        is used when NumPy is installed.
+    :type use_numpy: bool | None
+    :return: One bitmap per car, bit ``i`` set when the car is booked on day ``i``.
+    :rtype: list[int]
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy:
+        return _matrix_numpy(car_ids, intervals, days)
+    return _matrix_python(car_ids, intervals, days)
+
+
+def encode_runs(car_ids, rows):
+    """
+    Run-length encoding: booked ``[offset, length]`` runs per car.
+
+    :rtype: list[dict]
+    """
+    return [
+        {'car': car_id, 'booked': [[offset, length] for offset, length in bit_runs(bits)]}
+        for car_id, bits in zip(car_ids, rows)
+    ]
+
+
+def encode_bitmap(rows, days):
+    """
+    Binary encoding: all rows packed little-endian, ``(days + 7) // 8`` bytes each, base64 encoded.
+
+    :rtype: tuple[int, str]
+    :return: ``(row_bytes, bitmap)``
+    """
+    row_bytes = (days + 7) // 8
+    packed = b''.join(bits.to_bytes(row_bytes, 'little') for bits in rows)
+    return row_bytes, base64.b64encode(packed).decode('ascii')
+
+
+def occupancy(date_from, days, encoding='rle'):
+    """
+    The occupancy of the whole fleet for ``days`` days starting at ``date_from``.
+
+    :param encoding: ``"rle"`` for booked runs per car, ``"bitmap"`` for a packed binary matrix.
+    :type encoding: str
+    :rtype: dict
+    """
+    last = date_from + datetime.timedelta(days=days - 1)
+    car_ids = list(Car.objects.order_by('pk').values_list('pk', flat=True))
+    rows = build_matrix(car_ids, load_intervals(date_from, last), days)
+
+    result = {'date_from': date_from, 'days': days, 'encoding': encoding}
+    if encoding == 'bitmap':
+        result['cars'] = car_ids
+        result['row_bytes'], result['bitmap'] = encode_bitmap(rows, days)
+    else:
+        result['cars'] = encode_runs(car_ids, rows)
+    return result
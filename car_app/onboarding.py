@@ -0,0 +1,191 @@
+"""
+Bulk customer import from CSV files.
+
+A file is imported completely or not at all. Every row is validated first,
+e-mails and phone numbers are checked against the database with set based
+queries (see :mod:`car_app.registration`) and against the rest of the file,
+and only then are passwords hashed, in a process pool (see
+:mod:`car_app.hashing`), and the users and customers inserted with
+``bulk_create`` in chunks, inside one transaction.
+
+The file has a header row naming the columns of :class:`CustomerImportRowSerializer`;
+``first_name``, ``last_name`` and ``password`` may be left out. Users imported
+without a password get an unusable one and sign in with Google or after
+setting a password.
+"""
+import csv
+import io
+
+from django.conf import settings
+from django.db import transaction
+
+from car_app import registration
+
+from car_app.hashing import hash_passwords
+from car_app.messages import (
+    CUSTOMER_IMPORT_INVALID,
+    CUSTOMER_IMPORT_MALFORMED,
+    CUSTOMER_IMPORT_MISSING_COLUMNS,
+    CUSTOMER_IMPORT_NOT_UTF8,
+    DUPLICATE_IN_FILE,
+    EMAIL_ALREADY_REGISTERED,
+    PHONE_ALREADY_REGISTERED,
+)
+from car_app.models import Customer, User
+from car_app.serializers import CustomerImportRowSerializer
+
+REQUIRED_COLUMNS = ('email', 'date_of_birth', 'licence_since', 'licence_expiry_date', 'address', 'city',
+                    'country', 'citizenship', 'phone_number')
+USER_FIELDS = ('email', 'first_name', 'last_name')
+
+
+def import_settings():
+    """
+    Returns the ``CUSTOMER_IMPORT`` settings with defaults for missing keys.
+
+    ``BATCH_SIZE`` is the number of rows per INSERT and ``PROCESSES`` the size
+    of the hashing pool (None for one per CPU). ``MAX_ROWS`` and
+    ``MAX_PASSWORDS`` are the most rows and the most passwords the import
+    endpoint accepts; it hashes inside the request, without a pool, at about
+    0.3 s per password with the default hasher, so the default of 50 keeps a
+    file well within ``GUNICORN_TIMEOUT``. Larger files go through the
+    ``import_customers`` command.
+
+    :rtype: dict
+    """
+    options = {
+        'BATCH_SIZE': 500,
+        'PROCESSES': None,
+        'MAX_ROWS': 1000,
+        'MAX_PASSWORDS': 50,
+    }
+    options.update(getattr(settings, 'CUSTOMER_IMPORT', {}))
+    return options
+
+
+class CustomerImportError(Exception):
+    """
+    The file cannot be imported.
+
+    :ivar message: What is wrong with the file.
+    :type message: str
+    :ivar errors: The invalid rows as ``{'row': <line number>, 'errors': {<field>: [<message>]}}``.
+    :type errors: list[dict]
+    """
+
+    def __init__(self, message, errors=()):
+        super().__init__(message)
+        self.message = message
+        self.errors = list(errors)
+
+
+def read_csv(file):
+    """
+    Reads the rows of a CSV file.
+
+    :param file: A binary or text file; UTF-8, with or without a byte order mark.
+    :return: The rows as dicts of stripped values, keyed by lowercased column name.
+    :rtype: list[dict[str, str]]
+    :raises CustomerImportError: If the file is not UTF-8, is not valid CSV or
+        required columns are missing.
+    """
+    try:
+        content = file.read()
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise CustomerImportError(CUSTOMER_IMPORT_NOT_UTF8)
+    reader = csv.DictReader(io.StringIO(content))
+    try:
+        columns = {name.strip().lower() for name in reader.fieldnames or ()}
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise CustomerImportError(CUSTOMER_IMPORT_MISSING_COLUMNS.format(columns=', '.join(missing)))
+        return [
+            {name.strip().lower(): (value or '').strip() for name, value in row.items() if name}
+            for row in reader
+        ]
+    except csv.Error as e:
+        raise CustomerImportError(CUSTOMER_IMPORT_MALFORMED.format(error=e))
+
+
+def validate_rows(rows):
+    """
+    Validates rows and checks their e-mails and phone numbers are not taken.
+
+    :type rows: list[dict[str, str]]
+    :return: The validated rows and the errors; rows are numbered by file line,
+        the header being line 1.
+    :rtype: tuple[list[dict], list[dict]]
+    """
+    valid, errors = [], {}
+    for line, row in enumerate(rows, start=2):
+        serializer = CustomerImportRowSerializer(data=row)
+        if serializer.is_valid():
+            data = dict(serializer.validated_data)
+            data['email'] = registration.email_key(data['email'])
+            valid.append((line, data))
+        else:
+            errors[line] = dict(serializer.errors)
+
+    emails = registration.taken_emails(data['email'] for _, data in valid)
+    phones = registration.taken_phones(data['phone_number'] for _, data in valid)
+    seen_emails, seen_phones = set(), set()
+    for line, data in valid:
+        row_errors = {}
+        if data['email'] in emails:
+            row_errors['email'] = [EMAIL_ALREADY_REGISTERED]
+        elif data['email'] in seen_emails:
+            row_errors['email'] = [DUPLICATE_IN_FILE]
+        phone = registration.phone_key(data['phone_number'])
+        if data['phone_number'] in phones:
+            row_errors['phone_number'] = [PHONE_ALREADY_REGISTERED]
+        elif phone in seen_phones:
+            row_errors['phone_number'] = [DUPLICATE_IN_FILE]
+        seen_emails.add(data['email'])
+        seen_phones.add(phone)
+        if row_errors:
+            errors[line] = row_errors
+
+    return ([data for line, data in valid if line not in errors],
+            [{'row': line, 'errors': errors[line]} for line in sorted(errors)])
+
+
+def import_customers(rows, processes=None, batch_size=None):
+    """
+    Creates a user and a customer for every row.
+
+    :type rows: list[dict[str, str]]
+    :param processes: Size of the hashing pool, defaults to ``CUSTOMER_IMPORT['PROCESSES']``.
+    :type processes: int | None
+    :param batch_size: Rows per INSERT, defaults to ``CUSTOMER_IMPORT['BATCH_SIZE']``.
+    :type batch_size: int | None
+    :return: The number of customers created.
+    :rtype: int
+    :raises CustomerImportError: If any row is invalid; nothing is imported then.
+    :raises django.db.IntegrityError: If a concurrent registration took an
+        e-mail or phone number after the check.
+    """
+    options = import_settings()
+    valid, errors = validate_rows(rows)
+    if errors:
+        raise CustomerImportError(CUSTOMER_IMPORT_INVALID, errors)
+
+    passwords = hash_passwords([data.pop('password') for data in valid], processes or options['PROCESSES'])
+    users = [
+        User(password=password, is_owner=False, **{field: data.pop(field) for field in USER_FIELDS})
+        for data, password in zip(valid, passwords)
+    ]
+    batch_size = batch_size or options['BATCH_SIZE']
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        customers = [Customer(user=user, **data) for user, data in zip(users, valid)]
+        for customer in customers:
+            # bulk_create() skips save(), which fills in the search columns.
+            customer.update_search_columns()
+        Customer.objects.bulk_create(customers, batch_size=batch_size)
+    # bulk_create() skips the signals, which keep the registration prefilters current.
+    for customer in customers:
+        registration.EMAILS.add(customer.user.email)
+        registration.PHONES.add(registration.phone_key(customer.phone_number))
+    return len(customers)
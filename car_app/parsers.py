@@ -0,0 +1,42 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from car_app import msgpack_codec
+from car_app.renderers import FastJSONRenderer, MessagePackRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson, falling back to DRF's stdlib parser when
+    orjson is not installed.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses ``application/msgpack`` request bodies, see :mod:`car_app.msgpack_codec`.
+    """
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack_codec.unpackb(stream.read())
+        except msgpack_codec.PackError as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
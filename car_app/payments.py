@@ -0,0 +1,234 @@
+"""
+Payment processing.
+
+A payment is created ``pending`` together with its rental and charged later by
+the ``process_payment`` background task through the provider configured in
+``PAYMENT_PROVIDER``. Before charging, a worker claims the payment by moving
+it from ``pending`` to ``processing`` with a conditional UPDATE, so only one
+worker charges it and the sweeper (see :mod:`car_app.sweeper`) leaves it
+alone. The charge then settles it as ``completed`` or ``failed``, and its
+rental follows it to ``confirmed`` or ``cancelled``. Provider outages raise
+:class:`PaymentProviderError` and put the payment back to ``pending``, so the
+task queue retries the charge. A claim older than ``PAYMENT_CLAIM_TIMEOUT``
+belongs to a worker that died and can be taken over; the provider sees the
+same payment again and, using its primary key as idempotency key, does not
+charge twice.
+"""
+import datetime
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from car_app import availability, changefeed, response_cache
+from car_app.models import Payment, Rental
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS = {
+    'pending': {'processing', 'completed', 'failed'},
+    'processing': {'processing', 'pending', 'completed', 'failed'},
+}
+
+
+class PaymentProviderError(Exception):
+    """
+    The provider could not be reached or did not give an answer; try again later.
+    """
+
+
+class InvalidPaymentTransition(Exception):
+    """
+    The payment cannot move from its current status to the requested one.
+    """
+
+
+@dataclass(frozen=True)
+class ChargeResult:
+    """
+    The provider's answer to a charge.
+
+    :ivar success: Whether the charge went through.
+    :ivar reference: The provider's id of the charge.
+    :ivar error: Why the charge was declined.
+    """
+    success: bool
+    reference: str = ''
+    error: str = ''
+
+
+class BasePaymentProvider:
+    """
+    Interface of a payment provider.
+    """
+
+    def charge(self, payment):
+        """
+        Charges the customer for a payment.
+
+        Declined charges are reported with ``ChargeResult(success=False)``;
+        transient problems raise :class:`PaymentProviderError`. The payment's
+        primary key can be used as the provider side idempotency key.
+
+        :param payment: The pending payment.
+        :type payment: Payment
+        :rtype: ChargeResult
+        """
+        raise NotImplementedError
+
+    def refund(self, payment, reference):
+        """
+        Gives back a charge that could not be recorded.
+
+        :param payment: The payment the charge was made for.
+        :type payment: Payment
+        :param reference: The provider's id of the charge.
+        :type reference: str
+        :raises PaymentProviderError: If the refund did not go through.
+        """
+        raise NotImplementedError
+
+
+class FakePaymentProvider(BasePaymentProvider):
+    """
+    Local provider for development and tests that approves every charge.
+    """
+
+    def charge(self, payment):
+        return ChargeResult(success=True, reference=f"fake-{payment.pk}")
+
+    def refund(self, payment, reference):
+        pass
+
+
+def get_provider():
+    """
+    Returns an instance of the provider configured in ``PAYMENT_PROVIDER``.
+
+    :rtype: BasePaymentProvider
+    """
+    return import_string(settings.PAYMENT_PROVIDER)()
+
+
+def transition(payment, status, **fields):
+    """
+    Moves a payment to a new status.
+
+    The update is conditional on the status the payment had when it was loaded,
+    so of two workers racing on the same payment only one wins. A ``processing``
+    payment must also still carry the claim's ``updated_at``, so a worker whose
+    claim was taken over cannot settle it.
+
+    :param payment: The payment to update.
+    :type payment: Payment
+    :param status: The new status.
+    :type status: str
+    :param fields: Other payment fields to update along with the status.
+    :return: False when another worker moved the payment first.
+    :rtype: bool
+    :raises InvalidPaymentTransition: If the transition is not allowed.
+    """
+    if status not in TRANSITIONS.get(payment.status, ()):
+        raise InvalidPaymentTransition(f"Payment {payment.pk} cannot go from {payment.status} to {status}")
+    current = {'pk': payment.pk, 'status': payment.status}
+    if payment.status == 'processing':
+        current['updated_at'] = payment.updated_at
+    fields['updated_at'] = timezone.now()
+    updated = Payment.objects.filter(**current).update(status=status, **fields)
+    if updated:
+        payment.status = status
+        for name, value in fields.items():
+            setattr(payment, name, value)
+        changefeed.record(payment, 'upsert')
+        transaction.on_commit(lambda: response_cache.invalidate('dashboard'))
+    return bool(updated)
+
+
+def claim_timeout():
+    """
+    How long a ``processing`` claim holds before another worker may take it over.
+
+    :rtype: datetime.timedelta
+    """
+    return getattr(settings, 'PAYMENT_CLAIM_TIMEOUT', datetime.timedelta(minutes=5))
+
+
+def claim(payment):
+    """
+    Claims a payment for charging by moving it to ``processing``.
+
+    :param payment: The payment as loaded.
+    :type payment: Payment
+    :return: False when the payment is settled or another worker holds a live claim.
+    :rtype: bool
+    """
+    if payment.status == 'processing' and payment.updated_at >= timezone.now() - claim_timeout():
+        return False
+    if payment.status not in ('pending', 'processing'):
+        return False
+    return transition(payment, 'processing')
+
+
+def _refund_lost_charge(provider, payment, result):
+    """
+    Refunds a charge made for a payment that was settled without it meanwhile.
+    """
+    current = Payment.objects.only('status', 'provider_reference').get(pk=payment.pk)
+    if current.status == 'completed' and current.provider_reference == result.reference:
+        # The worker that took over the claim recorded this very charge.
+        return
+    logger.error("Payment %s was charged (%s) but is %s now, refunding the charge",
+                 payment.pk, result.reference, current.status)
+    try:
+        provider.refund(payment, result.reference)
+    except Exception:
+        logger.exception("Refund of charge %s for payment %s failed, refund it by hand",
+                         result.reference, payment.pk)
+
+
+def process_payment(payment_id):
+    """
+    Charges a pending payment and settles the payment and its rental.
+
+    Only the worker that claims the payment charges it; everyone else leaves it
+    alone, so running this twice for the same payment is harmless.
+
+    :param payment_id: Primary key of the payment.
+    :type payment_id: int
+    :return: The payment's status afterwards.
+    :rtype: str
+    :raises PaymentProviderError: If the provider is unavailable.
+    """
+    payment = Payment.objects.get(pk=payment_id)
+    if not claim(payment):
+        return Payment.objects.values_list('status', flat=True).get(pk=payment_id)
+
+    provider = get_provider()
+    try:
+        result = provider.charge(payment)
+    except PaymentProviderError:
+        transition(payment, 'pending')
+        raise
+
+    with transaction.atomic():
+        if result.success:
+            if transition(payment, 'completed', provider_reference=result.reference):
+                if Rental.objects.filter(pk=payment.rental_id, status='pending').update(
+                        status='confirmed', updated_at=timezone.now()):
+                    changefeed.record_many(Rental, [payment.rental_id])
+            else:
+                _refund_lost_charge(provider, payment, result)
+        else:
+            if transition(payment, 'failed', provider_reference=result.reference,
+                          failure_reason=result.error[:255]):
+                if Rental.objects.filter(pk=payment.rental_id, status='pending').update(
+                        status='cancelled', updated_at=timezone.now()):
+                    changefeed.record_many(Rental, [payment.rental_id])
+                    rental = Rental.objects.only('car_id', 'start_date', 'end_date').get(pk=payment.rental_id)
+                    transaction.on_commit(
+                        lambda: availability.release(rental.car_id, rental.start_date, rental.end_date)
+                    )
+    return Payment.objects.values_list('status', flat=True).get(pk=payment_id)
@@ -0,0 +1,210 @@
+"""
+Rental pricing engine.
+
+A price is built from the car's base daily rate, overridden by per-brand and
+per-car seasonal rates, with a weekend discount and a long-rental discount on
+top. Every quote is split into segments of equal rate and each segment is
+priced with closed-form day arithmetic, so the cost of a quote depends on the
+number of seasonal rates involved and not on the length of the rental. Rates
+for a whole batch of quotes are loaded with a single query.
+"""
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db.models import Q
+
+from car_app.models import SeasonalRate
+
+CENT = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class Quote:
+    """
+    The price of renting one car for one date range.
+
+    :ivar days: Number of rental days, both ends included.
+    :ivar weekend_days: How many of those days fall on a Saturday or Sunday.
+    :ivar base_cost: Cost at the applicable daily rates before any discount.
+    :ivar discount: Total amount taken off ``base_cost``.
+    :ivar total_cost: The price to pay.
+    """
+    car_id: int
+    start_date: datetime.date
+    end_date: datetime.date
+    days: int
+    weekend_days: int
+    base_cost: Decimal
+    discount: Decimal
+    total_cost: Decimal
+
+
+def pricing_settings():
+    """
+    Returns the ``PRICING`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'WEEKEND_DISCOUNT': Decimal('0'),
+        'LONG_RENTAL_MIN_DAYS': 7,
+        'LONG_RENTAL_DISCOUNT': Decimal('0'),
+    }
+    options.update(getattr(settings, 'PRICING', {}))
+    return options
+
+
+def _overlap(start, end, other_start, other_end):
+    return max(0, min(end, other_end) - max(start, other_start))
+
+
+def rental_days(start_date, end_date):
+    """
+    Number of charged days for a rental, both ends included.
+
+    :rtype: int
+    """
+    return (end_date - start_date).days + 1
+
+
+def weekend_days(first, last):
+    """
+    Counts Saturdays and Sundays between two dates, both ends included.
+
+    :param first: First day of the range.
+    :type first: date
+    :param last: Last day of the range.
+    :type last: date
+    :rtype: int
+    """
+    days = rental_days(first, last)
+    if days <= 0:
+        return 0
+    weeks, rest = divmod(days, 7)
+    weekday = first.weekday()
+    # The remaining days occupy weekday positions [weekday, weekday + rest),
+    # which can wrap once; weekends sit at positions 5-6 and 12-13.
+    return (weeks * 2
+            + _overlap(weekday, weekday + rest, 5, 7)
+            + _overlap(weekday, weekday + rest, 12, 14))
+
+
+class RateTable:
+    """
+    Seasonal rates for a batch of cars, loaded with one query.
+
+    :param cars: The cars that will be quoted.
+    :type cars: Iterable[Car]
+    :param first: First day any quote may touch.
+    :type first: date
+    :param last: Last day any quote may touch.
+    :type last: date
+    """
+
+    def __init__(self, cars, first, last):
+        car_ids = {car.pk for car in cars}
+        brands = {car.brand for car in cars}
+        self._by_car = {}
+        self._by_brand = {}
+
+        rates = (SeasonalRate.objects
+                 .filter(Q(car_id__in=car_ids) | Q(car__isnull=True, brand__in=brands),
+                         start_date__lte=last, end_date__gte=first)
+                 .order_by('start_date', 'pk'))
+        for rate in rates:
+            season = (rate.start_date, rate.end_date, rate.daily_rate)
+            if rate.car_id is not None:
+                self._by_car.setdefault(rate.car_id, []).append(season)
+            else:
+                self._by_brand.setdefault(rate.brand, []).append(season)
+
+    def segments(self, car, first, last):
+        """
+        Splits a date range into ``(first, last, daily_rate)`` segments.
+
+        Brand rates are painted over the base rate and car rates over both, so
+        the most specific rate wins; later seasons win over earlier ones.
+
+        :rtype: list[tuple[date, date, Decimal]]
+        """
+        segments = [(first, last, car.daily_rate)]
+        seasons = self._by_brand.get(car.brand, []) + self._by_car.get(car.pk, [])
+        for season_first, season_last, season_rate in seasons:
+            if season_first > last or season_last < first:
+                continue
+            painted = []
+            for seg_first, seg_last, rate in segments:
+                inner_first = max(seg_first, season_first)
+                inner_last = min(seg_last, season_last)
+                if inner_first > inner_last:
+                    painted.append((seg_first, seg_last, rate))
+                    continue
+                if seg_first < inner_first:
+                    painted.append((seg_first, inner_first - datetime.timedelta(days=1), rate))
+                painted.append((inner_first, inner_last, season_rate))
+                if inner_last < seg_last:
+                    painted.append((inner_last + datetime.timedelta(days=1), seg_last, rate))
+            segments = painted
+        return segments
+
+
+def quote_many(requests):
+    """
+    Prices many ``(car, start_date, end_date)`` requests in one pass.
+
+    :param requests: The cars and date ranges to price.
+    :type requests: Iterable[tuple[Car, date, date]]
+    :return: One quote per request, in the same order.
+    :rtype: list[Quote]
+    """
+    requests = list(requests)
+    if not requests:
+        return []
+
+    options = pricing_settings()
+    weekend_discount = Decimal(options['WEEKEND_DISCOUNT'])
+    long_rental_discount = Decimal(options['LONG_RENTAL_DISCOUNT'])
+    long_rental_min_days = int(options['LONG_RENTAL_MIN_DAYS'])
+
+    table = RateTable(
+        [car for car, _, _ in requests],
+        min(start for _, start, _ in requests),
+        max(end for _, _, end in requests),
+    )
+
+    quotes = []
+    for car, start_date, end_date in requests:
+        base_cost = Decimal('0')
+        discount = Decimal('0')
+        for seg_first, seg_last, rate in table.segments(car, start_date, end_date):
+            base_cost += rate * rental_days(seg_first, seg_last)
+            discount += rate * weekend_days(seg_first, seg_last) * weekend_discount
+
+        days = rental_days(start_date, end_date)
+        if days >= long_rental_min_days:
+            discount += (base_cost - discount) * long_rental_discount
+
+        base_cost = base_cost.quantize(CENT, rounding=ROUND_HALF_UP)
+        discount = discount.quantize(CENT, rounding=ROUND_HALF_UP)
+        quotes.append(Quote(
+            car_id=car.pk,
+            start_date=start_date,
+            end_date=end_date,
+            days=days,
+            weekend_days=weekend_days(start_date, end_date),
+            base_cost=base_cost,
+            discount=discount,
+            total_cost=base_cost - discount,
+        ))
+    return quotes
+
+
+def quote(car, start_date, end_date):
+    """
+    Prices a single rental.
+
+    :rtype: Quote
+    """
+    return quote_many([(car, start_date, end_date)])[0]
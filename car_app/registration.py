@@ -0,0 +1,241 @@
+"""
+Uniqueness checks for registering users and customers.
+
+E-mails and phone numbers are checked before anything is hashed or inserted,
+so a duplicate costs one indexed lookup instead of a password hash, an INSERT
+and a rollback. The unique constraints stay the last word: a registration
+racing another one for the same value still fails with ``IntegrityError``,
+and views then run the checks again to tell which value was taken.
+
+With ``REGISTRATION['PREFILTER']`` on, every process also keeps a Bloom filter
+(see :mod:`car_app.bloom`) of the registered e-mails and of the registered
+phone numbers, rebuilt from the database every
+``REGISTRATION['PREFILTER_MAX_AGE']`` seconds. A value the filter has never
+seen is free without a query; a value it might have seen is looked up. Values
+registered through this process are added right away (see
+:func:`car_app.signals.remember_registration`); ones registered elsewhere
+reach the filter with the next rebuild, so until then the filter may call
+them free. That only costs a password hash before the unique constraints
+reject the registration. Answers that must be right skip the filter with
+``use_prefilter=False``: the availability endpoint, and the re-checks after
+an ``IntegrityError`` that tell which value was taken.
+"""
+import threading
+import time
+
+from django.conf import settings
+from phone_field.phone_number import PhoneNumber
+
+from car_app.bloom import BloomFilter
+from car_app.messages import EMAIL_ALREADY_REGISTERED, PHONE_ALREADY_REGISTERED
+from car_app.models import Customer, User
+
+CHUNK_SIZE = 900
+
+
+def registration_settings():
+    """
+    Returns the ``REGISTRATION`` settings with defaults for missing keys.
+
+    ``PREFILTER`` turns the Bloom filters on, ``PREFILTER_ERROR_RATE`` is their
+    false positive rate and ``PREFILTER_MAX_AGE`` how often they are rebuilt,
+    in seconds.
+
+    :rtype: dict
+    """
+    options = {
+        'PREFILTER': False,
+        'PREFILTER_ERROR_RATE': 0.01,
+        'PREFILTER_MAX_AGE': 300,
+    }
+    options.update(getattr(settings, 'REGISTRATION', {}))
+    return options
+
+
+def email_key(email):
+    """
+    An e-mail as it is stored, see ``User.objects.normalize_email``.
+
+    :rtype: str
+    """
+    return User.objects.normalize_email(email or '')
+
+
+def phone_key(phone_number):
+    """
+    A phone number as ``PhoneField`` stores it.
+
+    :rtype: str
+    """
+    return PhoneNumber(phone_number).cleaned if phone_number else ''
+
+
+def _registered_emails():
+    return User.objects.values_list('email', flat=True).iterator(chunk_size=2000)
+
+
+def _registered_phones():
+    phones = Customer.objects.values_list('phone_number', flat=True).iterator(chunk_size=2000)
+    return (phone_key(phone) for phone in phones if phone)
+
+
+class Prefilter:
+    """
+    A Bloom filter of the registered values of one field, rebuilt when it gets old.
+    """
+
+    def __init__(self, load):
+        """
+        :param load: Zero-argument callable yielding every registered value.
+        :type load: callable
+        """
+        self.load = load
+        self.filter = None
+        self.built_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        The current filter, built or rebuilt first if needed.
+
+        :rtype: car_app.bloom.BloomFilter
+        """
+        options = registration_settings()
+        if self.filter is None or time.monotonic() - self.built_at > options['PREFILTER_MAX_AGE']:
+            with self.lock:
+                if self.filter is None or time.monotonic() - self.built_at > options['PREFILTER_MAX_AGE']:
+                    values = list(self.load())
+                    bloom = BloomFilter(max(2 * len(values), 1000), options['PREFILTER_ERROR_RATE'])
+                    bloom.update(values)
+                    self.filter, self.built_at = bloom, time.monotonic()
+        return self.filter
+
+    def might_contain(self, value):
+        """
+        False when ``value`` is certainly not registered.
+
+        :type value: str
+        :rtype: bool
+        """
+        if not registration_settings()['PREFILTER']:
+            return True
+        return value in self.get()
+
+    def add(self, value):
+        """
+        Records a newly registered value in the built filter, if there is one.
+
+        :type value: str
+        """
+        bloom = self.filter
+        if bloom is not None and value:
+            bloom.add(value)
+
+    def reset(self):
+        """
+        Drops the filter; the next check rebuilds it.
+        """
+        with self.lock:
+            self.filter = None
+
+
+EMAILS = Prefilter(_registered_emails)
+PHONES = Prefilter(_registered_phones)
+
+
+def email_taken(email, exclude_user=None, use_prefilter=True):
+    """
+    Whether an e-mail belongs to a user.
+
+    :param exclude_user: A user whose own e-mail does not count, e.g. the one
+        updating their profile.
+    :type exclude_user: car_app.models.User | None
+    :param use_prefilter: Trust the prefilter's "certainly free", which may be
+        stale for e-mails registered by other processes.
+    :type use_prefilter: bool
+    :rtype: bool
+    """
+    email = email_key(email)
+    if not email or (use_prefilter and not EMAILS.might_contain(email)):
+        return False
+    users = User.objects.filter(email=email)
+    if exclude_user is not None:
+        users = users.exclude(pk=exclude_user.pk)
+    return users.exists()
+
+
+def phone_taken(phone_number, exclude_user=None, use_prefilter=True):
+    """
+    Whether a phone number belongs to a customer.
+
+    :param exclude_user: A user whose own phone number does not count.
+    :type exclude_user: car_app.models.User | None
+    :param use_prefilter: See :func:`email_taken`.
+    :type use_prefilter: bool
+    :rtype: bool
+    """
+    phone_number = phone_key(phone_number)
+    if not phone_number or (use_prefilter and not PHONES.might_contain(phone_number)):
+        return False
+    customers = Customer.objects.filter(phone_number=phone_number)
+    if exclude_user is not None:
+        customers = customers.exclude(user=exclude_user)
+    return customers.exists()
+
+
+def find_conflict(email=None, phone_number=None, exclude_user=None, use_prefilter=True):
+    """
+    Why a registration with these values would fail, the e-mail checked first.
+
+    :type email: str | None
+    :type phone_number: str | None
+    :type exclude_user: car_app.models.User | None
+    :param use_prefilter: See :func:`email_taken`.
+    :type use_prefilter: bool
+    :return: The error message, or None when the values are free.
+    :rtype: str | None
+    """
+    if email and email_taken(email, exclude_user, use_prefilter):
+        return EMAIL_ALREADY_REGISTERED
+    if phone_number and phone_taken(phone_number, exclude_user, use_prefilter):
+        return PHONE_ALREADY_REGISTERED
+    return None
+
+
+def _chunks(values):
+    values = sorted(set(values))
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
+
+
+def taken_emails(emails):
+    """
+    The given e-mails that already belong to a user.
+
+    :param emails: Normalized e-mails, see :func:`email_key`.
+    :type emails: collections.abc.Iterable[str]
+    :rtype: set[str]
+    """
+    taken = set()
+    for chunk in _chunks(emails):
+        taken.update(User.objects.filter(email__in=chunk).values_list('email', flat=True))
+    return taken
+
+
+def taken_phones(phone_numbers):
+    """
+    The given phone numbers that already belong to a customer.
+
+    :param phone_numbers: Phone numbers as given; each is compared as stored,
+        see :func:`phone_key`.
+    :type phone_numbers: collections.abc.Iterable[str]
+    :rtype: set[str]
+    """
+    given = {}
+    for phone_number in phone_numbers:
+        given.setdefault(phone_key(phone_number), set()).add(phone_number)
+    taken = set()
+    for chunk in _chunks(given):
+        for phone in Customer.objects.filter(phone_number__in=chunk).values_list('phone_number', flat=True):
+            taken.update(given.get(phone_key(phone), ()))
+    return taken
@@ -0,0 +1,64 @@
+import decimal
+
+from rest_framework.utils import encoders
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from car_app import msgpack_codec
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def _orjson_default(obj):
+    """
+    Encodes the types orjson does not know about the same way DRF's encoder does.
+    """
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return encoders.JSONEncoder().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    ``date``, ``datetime``, ``time`` and ``UUID`` values are encoded natively,
+    ``Decimal`` and lazy strings go through a small default hook. Falls back to
+    DRF's stdlib renderer when orjson is missing or ASCII-only output is configured.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_orjson_default, option=option)
+        # Keep the output a strict JavaScript subset, like JSONRenderer does.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack renderer, picked with ``Accept: application/msgpack`` or ``?format=msgpack``.
+
+    Serializer output keeps the same shape as the JSON rendering, so decimals and
+    dates formatted by serializer fields stay strings; native ``Decimal``, ``date``,
+    ``time`` and ``datetime`` values use the extension types described in
+    :mod:`car_app.msgpack_codec`.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack_codec.packb(data)
@@ -0,0 +1,145 @@
+"""
+Cache for read endpoints: whole responses (see :class:`car_app.mixins.CachedResponseMixin`)
+or computed data (see :func:`remember`).
+
+Entries are keyed by a per-namespace version number, so invalidating a
+namespace is a single ``incr`` and stale entries simply expire. A version that
+was evicted is recreated from the clock rather than from 1, so it cannot come
+back as a number whose entries are still cached. Receivers in
+:mod:`car_app.signals` invalidate the ``catalog`` namespace when a car changes
+and the ``dashboard`` namespace when a car, rental or payment does.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from car_app import compression
+
+
+def response_cache_settings():
+    """
+    Returns the ``RESPONSE_CACHE`` settings with defaults for missing keys.
+
+    ``TIMEOUT`` is how long an entry is kept, in seconds, and ``TIMEOUTS``
+    overrides it per namespace.
+
+    :rtype: dict
+    """
+    options = {
+        'TIMEOUT': 300,
+        'TIMEOUTS': {'dashboard': 30},
+    }
+    options.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return options
+
+
+def timeout(namespace):
+    """
+    How long entries of a namespace are kept, in seconds.
+
+    :type namespace: str
+    :rtype: int
+    """
+    options = response_cache_settings()
+    return options['TIMEOUTS'].get(namespace, options['TIMEOUT'])
+
+
+def _version_key(namespace):
+    return 'response-cache:%s:version' % namespace
+
+
+def version(namespace):
+    """
+    The current version of a namespace.
+
+    :type namespace: str
+    :rtype: int
+    """
+    key = _version_key(namespace)
+    value = cache.get(key)
+    if value is None:
+        seed = time.time_ns()
+        cache.add(key, seed, timeout=None)
+        value = cache.get(key, seed)
+    return value
+
+
+def invalidate(namespace):
+    """
+    Drops every cached response of a namespace by moving it to a new version.
+
+    :type namespace: str
+    """
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def cache_key(namespace, path, media_type):
+    """
+    Key of one representation of a resource in the current namespace version.
+
+    :param path: The full request path, query string included.
+    :type path: str
+    :param media_type: The negotiated media type.
+    :type media_type: str
+    :rtype: str
+    """
+    digest = hashlib.sha256(('%s\n%s' % (path, media_type)).encode()).hexdigest()[:32]
+    return 'response-cache:%s:%s:%s' % (namespace, version(namespace), digest)
+
+
+def get(key):
+    """
+    A stored response.
+
+    :return: ``data``, ``content_type``, ``content`` and ``precompressed``
+        (compressed bodies by encoding), or None on a miss.
+    :rtype: dict | None
+    """
+    return cache.get(key)
+
+
+def store(namespace, key, data, content_type, content):
+    """
+    Stores a rendered response together with its compressed variants.
+
+    :type namespace: str
+    :param key: The key from :func:`cache_key`.
+    :type key: str
+    :param data: The response data, kept for code reading ``response.data``.
+    :type content_type: str
+    :type content: bytes
+    :return: The stored entry, as :func:`get` returns it.
+    :rtype: dict
+    """
+    entry = {
+        'data': data,
+        'content_type': content_type,
+        'content': content,
+        'precompressed': compression.compress_all(content),
+    }
+    cache.set(key, entry, timeout=timeout(namespace))
+    return entry
+
+
+def remember(namespace, name, compute):
+    """
+    Returns ``compute()``, cached under ``name`` in the current version of a namespace.
+
+    :type namespace: str
+    :param name: Identifies the value within the namespace.
+    :type name: str
+    :param compute: Zero-argument callable producing the value on a miss.
+    :type compute: callable
+    """
+    key = 'response-cache:%s:%s:%s' % (namespace, version(namespace), name)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=timeout(namespace))
+    return value
@@ -0,0 +1,90 @@
+"""
+Precompiled OpenAPI schema.
+
+Generating the schema introspects every view and serializer, which is slow and
+pulls in the whole of drf-spectacular's generator. The ``build_schema``
+management command runs the generator once at build time and writes the YAML
+and JSON documents to ``OPENAPI_SCHEMA['DIR']``; the schema view serves those
+files with an ``ETag`` and ``Cache-Control`` and only falls back to generating
+the schema per request when they have not been built.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+FORMATS = {
+    'yaml': 'application/vnd.oai.openapi; charset=utf-8',
+    'json': 'application/vnd.oai.openapi+json; charset=utf-8',
+}
+
+_loaded = {}
+
+
+def schema_settings():
+    """
+    Returns the ``OPENAPI_SCHEMA`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'DIR': settings.BASE_DIR / 'staticfiles' / 'schema',
+        'MAX_AGE': 3600,
+    }
+    options.update(getattr(settings, 'OPENAPI_SCHEMA', {}))
+    return options
+
+
+def schema_path(fmt):
+    """
+    Where the precompiled schema in ``fmt`` (``yaml`` or ``json``) is written.
+
+    :rtype: Path
+    """
+    return Path(schema_settings()['DIR']) / f"openapi.{fmt}"
+
+
+def build_schema():
+    """
+    Generates the OpenAPI schema and writes it in every format.
+
+    :return: The files written.
+    :rtype: list[Path]
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    renderers = {'yaml': OpenApiYamlRenderer(), 'json': OpenApiJsonRenderer()}
+    written = []
+    for fmt, renderer in renderers.items():
+        path = schema_path(fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_bytes(renderer.render(schema, renderer_context={}))
+        os.replace(tmp, path)
+        written.append(path)
+    _loaded.clear()
+    return written
+
+
+def load_schema(fmt):
+    """
+    The precompiled schema in ``fmt``, read once per process and reloaded when the file changes.
+
+    :return: ``(content, etag)``, or None when the schema has not been built.
+    :rtype: tuple[bytes, str] | None
+    """
+    path = schema_path(fmt)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _loaded.get(fmt)
+    if cached is None or cached[0] != (path, mtime):
+        content = path.read_bytes()
+        cached = ((path, mtime), content, '"%s"' % hashlib.sha256(content).hexdigest()[:32])
+        _loaded[fmt] = cached
+    return cached[1], cached[2]
@@ -0,0 +1,118 @@
+"""
+Customer search.
+
+The text a customer is found by is kept, normalized, on the customer row
+itself (see :meth:`car_app.models.Customer.save` and
+:func:`car_app.signals.refresh_customer_search`), so a search neither joins
+the users table nor lowercases on the fly:
+
+* ``search_text``: first name, last name and e-mail, lowercased and with
+  diacritics removed. On PostgreSQL it carries a trigram GIN index
+  (``pg_trgm``) and terms match anywhere in it; on SQLite it is mirrored into
+  the ``car_app_customer_fts`` FTS5 table by triggers and terms match word
+  prefixes.
+* ``search_email`` and ``search_phone``: the lowercased e-mail and the digits
+  of the phone number, with B-tree indexes for prefix matching.
+
+Both the FTS5 table and its triggers are created by migration 0020; SQLite
+drops triggers when a migration rebuilds the ``car_app_customer`` table, so
+such a migration has to recreate them.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'car_app_customer_fts'
+
+# Letters NFKD does not decompose into a base letter and a combining mark.
+FOLD = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ħ': 'h', 'ı': 'i'})
+PHONE_TERM = re.compile(r'^\+?[\d\-().]*\d[\d\-().]*$')
+
+
+def normalize(text):
+    """
+    Lowercases a text, removes diacritics and collapses whitespace.
+
+    :type text: str
+    :rtype: str
+    """
+    text = unicodedata.normalize('NFKD', text.casefold().translate(FOLD))
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
+def phone_digits(phone_number):
+    """
+    The digits of a phone number, e.g. ``48600123456`` for ``+48 600-123-456``.
+
+    :rtype: str
+    """
+    return ''.join(char for char in str(phone_number or '') if char.isdigit())
+
+
+def search_columns(first_name, last_name, email, phone_number):
+    """
+    The values of a customer's search columns.
+
+    :rtype: dict[str, str]
+    """
+    return {
+        'search_text': normalize(' '.join((first_name, last_name, email)))[:400],
+        'search_email': (email or '').strip().lower()[:255],
+        'search_phone': phone_digits(phone_number)[:32],
+    }
+
+
+def _prefix(field, prefix, vendor):
+    # SQLite only uses an index for LIKE on NOCASE columns, so ask for the range instead.
+    if vendor == 'sqlite':
+        return Q(**{field + '__gte': prefix, field + '__lt': prefix + '\U0010ffff'})
+    return Q(**{field + '__startswith': prefix})
+
+
+def _fts_query(terms):
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def search_customers(queryset, terms):
+    """
+    Narrows a customer queryset to the customers matching every search term.
+
+    Terms containing ``@`` match e-mail prefixes, terms made of phone digits
+    (optionally with ``+``, dashes or brackets) match phone number prefixes,
+    consecutive ones taken as a single number, and other terms match names
+    and e-mails.
+
+    :type queryset: django.db.models.QuerySet
+    :param terms: The search terms as typed.
+    :type terms: list[str]
+    :rtype: django.db.models.QuerySet
+    """
+    vendor = connections[queryset.db].vendor
+    text_terms, phones = [], []
+    previous_was_phone = False
+    for term in terms:
+        is_phone = bool(PHONE_TERM.match(term))
+        if is_phone and previous_was_phone:
+            phones[-1] += phone_digits(term)
+        elif is_phone:
+            phones.append(phone_digits(term))
+        elif '@' in term:
+            queryset = queryset.filter(_prefix('search_email', term.strip().lower(), vendor))
+        else:
+            text_terms.extend(normalize(term).split())
+        previous_was_phone = is_phone
+    for digits in phones:
+        queryset = queryset.filter(_prefix('search_phone', digits, vendor))
+    if not text_terms:
+        return queryset
+
+    if vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT rowid FROM %s WHERE %s MATCH %%s' % (FTS_TABLE, FTS_TABLE), [_fts_query(text_terms)]
+        ))
+    for term in text_terms:
+        queryset = queryset.filter(search_text__contains=term)
+    return queryset
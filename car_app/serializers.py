@@ -1,12 +1,99 @@
+import datetime
+from . import availability
+from .messages import AVAILABILITY_NOTHING_TO_CHECK, PAYMENT_NOT_FOUND
 from .models import *
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
-class UserSerializer(serializers.ModelSerializer):
+def parse_fieldset(value):
+    """
+    Parses a comma separated list of (optionally dotted) field names into a tree.
+
+    ``"id,car.brand,car.model"`` becomes ``{"id": {}, "car": {"brand": {}, "model": {}}}``.
+    An empty subtree means "every field of that relation".
+
+    :param value: The raw query parameter value.
+    :type value: str | None
+    :return: The field tree, or None when no fields were requested.
+    :rtype: dict | None
+    """
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree or None
+
+
+class DynamicFieldsMixin:
+    """
+    Lets a serializer render a sparse fieldset.
+
+    Root serializers read ``?fields=`` and ``?expand=`` from the request in their
+    context, nested serializers get their part of the tree from the parent.
+    ``fields`` keeps only the listed fields (``car.brand`` addresses nested ones).
+    When ``expand`` is given, nested relations that are not listed in it are
+    collapsed to their primary key. Only safe requests are narrowed, so writes
+    always validate against the full serializer.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            fields, expand = self._requested_fieldset()
+        if fields is not None or expand is not None:
+            self.apply_fieldset(fields, expand)
+
+    def _requested_fieldset(self):
+        request = self._context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None, None
+        params = getattr(request, 'query_params', request.GET)
+        return parse_fieldset(params.get('fields')), parse_fieldset(params.get('expand'))
+
+    def apply_fieldset(self, fields, expand):
+        """
+        Drops or collapses fields according to the given field trees.
+
+        :param fields: Tree of fields to keep, or None to keep all of them.
+        :type fields: dict | None
+        :param expand: Tree of nested relations to render in full, or None to
+            render every nested relation.
+        :type expand: dict | None
+        """
+        for name in list(self.fields):
+            if fields is not None and name not in fields:
+                self.fields.pop(name)
+                continue
+
+            field = self.fields[name]
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if not isinstance(nested, serializers.BaseSerializer):
+                continue
+
+            if expand is not None and name not in expand:
+                source = {} if field.source == name else {'source': field.source}
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, many=nested is not field, **source
+                )
+            elif isinstance(nested, DynamicFieldsMixin):
+                nested.apply_fieldset(
+                    (fields or {}).get(name) or None,
+                    (expand or {}).get(name) or None,
+                )
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'first_name', 'last_name', 'email', 'is_owner']
+        # UserProfileView checks e-mails with car_app.registration instead.
+        extra_kwargs = {'email': {'validators': []}}
 
 
 class UserSerializerToken(UserSerializer):
@@ -26,14 +113,28 @@ class UserSerializerToken(UserSerializer):
         return str(token)
 
 
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Car
         fields = ['id', 'brand', 'model', 'production_year', 'mileage', 'vin', 'daily_rate', 'availability',
                   'description']
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CarListSerializer(CarSerializer):
+    """
+    The list projection of a car: ``summary`` instead of the full description.
+
+    Used by the car list and wherever a car is nested in another object; pair
+    it with :func:`car_app.managers.defer_car_details` so the description is
+    not read either.
+    """
+
+    class Meta(CarSerializer.Meta):
+        fields = ['id', 'brand', 'model', 'production_year', 'mileage', 'vin', 'daily_rate', 'availability',
+                  'summary']
+
+
+class CustomerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
@@ -42,18 +143,306 @@ class CustomerSerializer(serializers.ModelSerializer):
                   'country', 'citizenship', 'phone_number']
 
 
-class RentalSerializer(serializers.ModelSerializer):
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """
+    The values to check for availability; at least one is required.
+    """
+    email = serializers.EmailField(max_length=255, required=False)
+    phone_number = serializers.CharField(max_length=255, required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(AVAILABILITY_NOTHING_TO_CHECK)
+        return attrs
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    """
+    Whether each of the checked values can still be registered.
+    """
+    email = serializers.BooleanField(required=False)
+    phone_number = serializers.BooleanField(required=False)
+
+
+class CustomerImportRowSerializer(serializers.Serializer):
+    """
+    One row of a customer import file; uniqueness is checked for the whole file at once.
+    """
+    email = serializers.EmailField(max_length=255)
+    first_name = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    password = serializers.CharField(required=False, allow_blank=True, default='', trim_whitespace=False)
+    date_of_birth = serializers.DateField()
+    licence_since = serializers.DateField()
+    licence_expiry_date = serializers.DateField()
+    address = serializers.CharField(max_length=255)
+    city = serializers.CharField(max_length=255)
+    country = serializers.CharField(max_length=255)
+    citizenship = serializers.CharField(max_length=255)
+    phone_number = serializers.CharField(max_length=255)
+
+
+class CustomerImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+
+
+class RentalSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
-    car = CarSerializer(read_only=True)
+    car = CarListSerializer(read_only=True)
 
     class Meta:
         model = Rental
         fields = ['id', 'customer', 'car', 'start_date', 'end_date', 'total_cost', 'status']
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     rental = RentalSerializer(read_only=True)
 
     class Meta:
         model = Payment
-        fields = ['id', 'rental', 'amount', 'payment_date']
+        fields = ['id', 'rental', 'amount', 'payment_date', 'status']
+
+
+class ArchivedRentalSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    customer = CustomerSerializer(read_only=True)
+    car = CarListSerializer(read_only=True)
+    payment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedRental
+        fields = ['id', 'customer', 'car', 'start_date', 'end_date', 'total_cost', 'status', 'payment',
+                  'archived_at']
+
+    def get_payment(self, obj):
+        if obj.payment_id is None:
+            return {'message': PAYMENT_NOT_FOUND}
+        return {
+            'id': obj.payment_id,
+            'amount': str(obj.payment_amount),
+            'payment_date': serializers.DateTimeField().to_representation(obj.payment_date),
+            'status': obj.payment_status,
+        }
+
+
+class RentalHistoryQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError({'date_to': 'date_to must not be before date_from'})
+        return attrs
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    cars = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['end_date'] <= attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'end_date must be after start_date'})
+        return attrs
+
+
+class QuoteSerializer(serializers.Serializer):
+    car = serializers.IntegerField(source='car_id')
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    days = serializers.IntegerField()
+    weekend_days = serializers.IntegerField()
+    base_cost = serializers.DecimalField(max_digits=10, decimal_places=2)
+    discount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_cost = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    cars = serializers.CharField()
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    MAX_CARS = 100
+
+    def validate_cars(self, value):
+        try:
+            car_ids = list(dict.fromkeys(int(car_id) for car_id in value.split(',') if car_id.strip()))
+        except ValueError:
+            raise serializers.ValidationError('cars must be a comma separated list of car ids')
+        if not car_ids:
+            raise serializers.ValidationError('At least one car is required')
+        if len(car_ids) > self.MAX_CARS:
+            raise serializers.ValidationError(f'At most {self.MAX_CARS} cars can be requested at once')
+        return car_ids
+
+    def validate(self, attrs):
+        first, last = availability.window()
+        attrs.setdefault('date_from', first)
+        attrs.setdefault('date_to', last)
+        if attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError({'date_to': 'date_to must not be before date_from'})
+        if attrs['date_from'] < first or attrs['date_to'] > last:
+            raise serializers.ValidationError(f'The calendar covers {first} to {last}')
+        return attrs
+
+
+class CarCalendarSerializer(serializers.Serializer):
+    car = serializers.IntegerField()
+    booked = serializers.ListField(child=serializers.ListField(child=serializers.DateField()))
+
+
+class CalendarSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    cars = CarCalendarSerializer(many=True)
+    all_booked = serializers.ListField(child=serializers.ListField(child=serializers.DateField()))
+    any_booked = serializers.ListField(child=serializers.ListField(child=serializers.DateField()))
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(required=False, default=0, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=1000)
+
+
+class ChangeSerializer(serializers.Serializer):
+    seq = serializers.IntegerField()
+    model = serializers.CharField()
+    id = serializers.IntegerField()
+    action = serializers.CharField()
+    data = serializers.JSONField(allow_null=True)
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    changes = ChangeSerializer(many=True)
+    cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+
+
+class AnalyticsPeriodSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    MAX_DAYS = 3 * 366
+
+    def validate(self, attrs):
+        date_to = attrs.get('date_to') or datetime.date.today()
+        date_from = attrs.get('date_from') or (date_to - datetime.timedelta(days=364)).replace(day=1)
+        if date_to < date_from:
+            raise serializers.ValidationError({'date_to': 'date_to must not be before date_from'})
+        if (date_to - date_from).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'date_from': 'The period can span at most three years'})
+        return {'date_from': date_from, 'date_to': date_to}
+
+
+class CarUtilizationSerializer(serializers.Serializer):
+    car = serializers.IntegerField()
+    brand = serializers.CharField()
+    model = serializers.CharField()
+    rented_days = serializers.IntegerField()
+    utilization = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class MonthlySummarySerializer(serializers.Serializer):
+    month = serializers.DateField()
+    rented_days = serializers.IntegerField()
+    booked_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    payments = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class FleetReportSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    days = serializers.IntegerField()
+    average_rental_days = serializers.FloatField()
+    cars = CarUtilizationSerializer(many=True)
+    months = MonthlySummarySerializer(many=True)
+
+
+class RentalStatusCountsSerializer(serializers.Serializer):
+    pending = serializers.IntegerField()
+    confirmed = serializers.IntegerField()
+    cancelled = serializers.IntegerField()
+
+
+class PaymentStatusTotalSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class PaymentStatusTotalsSerializer(serializers.Serializer):
+    pending = PaymentStatusTotalSerializer()
+    processing = PaymentStatusTotalSerializer()
+    completed = PaymentStatusTotalSerializer()
+    failed = PaymentStatusTotalSerializer()
+
+
+class FleetStatusSerializer(serializers.Serializer):
+    cars = serializers.IntegerField()
+    available = serializers.IntegerField()
+    out = serializers.IntegerField()
+
+
+class DashboardRentalSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    status = serializers.CharField()
+    car = serializers.IntegerField()
+    brand = serializers.CharField()
+    model = serializers.CharField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    email = serializers.EmailField()
+    payment_status = serializers.CharField(allow_null=True)
+
+
+class DashboardSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    rentals = RentalStatusCountsSerializer()
+    payments = PaymentStatusTotalsSerializer()
+    fleet = FleetStatusSerializer()
+    pickups_today = DashboardRentalSerializer(many=True)
+    returns_today = DashboardRentalSerializer(many=True)
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    days = serializers.IntegerField(required=False, default=90, min_value=1, max_value=366)
+    encoding = serializers.ChoiceField(choices=['rle', 'bitmap'], required=False, default='rle')
+
+    def validate(self, attrs):
+        attrs.setdefault('date_from', datetime.date.today())
+        return attrs
+
+
+class CarOccupancySerializer(serializers.Serializer):
+    car = serializers.IntegerField()
+    booked = serializers.ListField(child=serializers.ListField(child=serializers.IntegerField()))
+
+
+class OccupancyRunsSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    days = serializers.IntegerField()
+    encoding = serializers.CharField()
+    cars = CarOccupancySerializer(many=True)
+
+
+class OccupancyBitmapSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    days = serializers.IntegerField()
+    encoding = serializers.CharField()
+    cars = serializers.ListField(child=serializers.IntegerField())
+    row_bytes = serializers.IntegerField()
+    bitmap = serializers.CharField()
+
+
+class CarDailyRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CarDailyRollup
+        fields = ['car', 'day', 'rentals', 'revenue']
+
+
+class PaymentDailyRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentDailyRollup
+        fields = ['day', 'status', 'count', 'amount']
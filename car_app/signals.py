@@ -0,0 +1,166 @@
+"""
+Signal receivers keeping caches in step with model changes.
+
+Connected in :meth:`car_app.apps.CarAppConfig.ready`. Bulk ``update()`` calls
+bypass these receivers, so code that changes rentals that way updates the
+caches itself.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from car_app import availability, changefeed, registration, response_cache
+from car_app.analytics import BOOKED_STATUSES
+from car_app.broker import get_broker
+from car_app.models import Car, Customer, Payment, Rental, User
+from car_app.tasks import refresh_car_rollups
+
+
+@receiver(post_save, sender=Rental)
+def update_availability_on_save(sender, instance, created, **kwargs):
+    """
+    Invalidates the car's availability bitmap once a change to a rental's booked days commits.
+
+    The rental as it was loaded (see ``Rental.from_db``) tells which days may
+    have been freed; unchanged rentals cost nothing.
+    """
+    old = instance.loaded_booking
+    new = instance.booking()
+    if old == new:
+        return
+    if old is None and not created:
+        old = new
+
+    def apply():
+        if old is not None and old[3] in BOOKED_STATUSES:
+            availability.release(old[0], old[1], old[2])
+        if new[3] in BOOKED_STATUSES:
+            availability.book(new[0], new[1], new[2])
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_delete, sender=Rental)
+def update_availability_on_delete(sender, instance, **kwargs):
+    """
+    Invalidates the car's availability bitmap once a deleted booking is committed.
+    """
+    if instance.status in BOOKED_STATUSES:
+        transaction.on_commit(
+            lambda: availability.release(instance.car_id, instance.start_date, instance.end_date)
+        )
+
+
+def _refresh_rollups_later(car_id, first, last):
+    refresh_car_rollups.delay(car_id=car_id, first=first.isoformat(), last=last.isoformat())
+
+
+@receiver(post_save, sender=Rental)
+def refresh_rollups_on_move(sender, instance, **kwargs):
+    """
+    Queues a rollup refresh of the days a booking no longer covers.
+
+    Incremental rollup runs (see :func:`car_app.rollups.refresh_since`) only
+    recompute the days a changed rental covers now.
+    """
+    old = instance.loaded_booking
+    if old is not None and old[3] in BOOKED_STATUSES and old[:3] != instance.booking()[:3]:
+        _refresh_rollups_later(*old[:3])
+
+
+@receiver(post_delete, sender=Rental)
+def refresh_rollups_on_delete(sender, instance, **kwargs):
+    """
+    Queues a rollup refresh of the days of a deleted booking.
+    """
+    if instance.status in BOOKED_STATUSES:
+        _refresh_rollups_later(instance.car_id, instance.start_date, instance.end_date)
+
+
+@receiver(post_save, sender=Car)
+def publish_car_availability(sender, instance, created, **kwargs):
+    """
+    Tells live subscribers when a car is taken off or put back on the market.
+    """
+    old = instance.loaded_availability
+    instance.loaded_availability = instance.availability
+    if created or old == instance.availability:
+        return
+    car_id, available = instance.pk, instance.availability
+    transaction.on_commit(lambda: get_broker().publish('car', car=car_id, available=available))
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Rental)
+@receiver(post_save, sender=Payment)
+def log_change_on_save(sender, instance, **kwargs):
+    """
+    Appends the saved object to the change feed.
+    """
+    changefeed.record(instance, 'upsert')
+
+
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Rental)
+@receiver(post_delete, sender=Payment)
+def log_change_on_delete(sender, instance, **kwargs):
+    """
+    Appends a tombstone of the deleted object to the change feed.
+    """
+    changefeed.record(instance, 'delete')
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def invalidate_catalog(sender, instance, **kwargs):
+    """
+    Drops the cached car list responses once a car change is committed.
+    """
+    transaction.on_commit(lambda: response_cache.invalidate('catalog'))
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Rental)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Rental)
+@receiver(post_delete, sender=Payment)
+def invalidate_dashboard(sender, instance, **kwargs):
+    """
+    Drops the cached owner dashboard once a change to what it counts is committed.
+    """
+    transaction.on_commit(lambda: response_cache.invalidate('dashboard'))
+
+
+@receiver(post_save, sender=User)
+def refresh_customer_search(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Copies a user's new names or e-mail into the search columns of their customer profile.
+    """
+    if created:
+        return
+    if update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields):
+        return
+    customer = Customer.objects.filter(user=instance).only('pk', 'phone_number').first()
+    if customer is None:
+        return
+    customer.user = instance
+    customer.update_search_columns()
+    Customer.objects.filter(pk=customer.pk).update(
+        search_text=customer.search_text, search_email=customer.search_email, search_phone=customer.search_phone,
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Customer)
+def remember_registration(sender, instance, **kwargs):
+    """
+    Adds a saved e-mail or phone number to this process's registration prefilters.
+
+    Adding a value that was already there, or one whose transaction rolls back,
+    only makes the prefilter less selective, never wrong.
+    """
+    if sender is User:
+        registration.EMAILS.add(instance.email)
+    else:
+        registration.PHONES.add(registration.phone_key(instance.phone_number))
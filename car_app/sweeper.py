@@ -0,0 +1,139 @@
+"""
+Expiry of stale pending rentals.
+
+Rentals stay ``pending`` until their payment settles. When that never happens
+(abandoned checkouts, payments that exhausted their retries) they would block
+the car forever, so rentals pending for longer than ``PENDING_RENTAL_TTL`` are
+cancelled in batches, together with their pending payments. Each batch is one
+short transaction driven by the ``(status, created_at)`` index.
+
+The payment row decides between the sweeper and a worker charging it (see
+:mod:`car_app.payments`): rentals whose payment a worker has claimed are
+skipped, and a rental is only cancelled once its payment is failed.
+
+The sweeper also deletes ``Idempotency-Key`` records older than
+``IDEMPOTENCY_KEY_TTL``, which are never replayed again.
+"""
+import datetime
+import time
+from dataclasses import dataclass
+from functools import partial
+
+from django.db import transaction
+from django.conf import settings
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from car_app import availability, changefeed, response_cache
+from car_app.messages import PAYMENT_EXPIRED
+from car_app.models import IdempotencyKey, Payment, Rental
+from car_app.tasks import refresh_car_rollups
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """
+    Outcome of one sweep.
+
+    :ivar rentals: Rentals cancelled.
+    :ivar payments: Pending payments marked as failed.
+    :ivar batches: Number of batches (transactions) used.
+    :ivar seconds: Wall clock duration of the sweep.
+    """
+    rentals: int
+    payments: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        return self.rentals / self.seconds if self.seconds else 0.0
+
+
+def expire_pending_rentals(ttl, batch_size=1000):
+    """
+    Cancels rentals that have been pending for longer than ``ttl``.
+
+    Only rows still pending at update time are touched, so a payment that is
+    claimed or settles while the sweep runs wins over the sweeper.
+
+    :param ttl: How long a rental may stay pending.
+    :type ttl: timedelta
+    :param batch_size: Rentals cancelled per transaction.
+    :type batch_size: int
+    :rtype: SweepResult
+    """
+    started = time.perf_counter()
+    cutoff = timezone.now() - ttl
+    rentals = payments = batches = 0
+
+    while True:
+        with transaction.atomic():
+            ids = list(Rental.objects
+                       .filter(status='pending', created_at__lt=cutoff)
+                       .exclude(payment__status__in=('processing', 'completed'))
+                       .order_by('created_at')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            now = timezone.now()
+            payment_ids = list(Payment.objects
+                               .filter(rental_id__in=ids, status='pending')
+                               .values_list('pk', flat=True))
+            payments += (Payment.objects
+                         .filter(pk__in=payment_ids, status='pending')
+                         .update(status='failed', failure_reason=PAYMENT_EXPIRED, updated_at=now))
+            # Payments claimed by a worker since the select above are not failed; their rentals stay.
+            rentals += (Rental.objects
+                        .filter(pk__in=ids, status='pending')
+                        .filter(Q(payment__isnull=True) | Q(payment__status='failed'))
+                        .update(status='cancelled', updated_at=now))
+            # Only the rows the updates above matched carry their timestamp.
+            cancelled = list(Rental.objects
+                             .filter(pk__in=ids, status='cancelled', updated_at=now)
+                             .values_list('pk', flat=True))
+            changefeed.record_many(Rental, cancelled)
+            changefeed.record_many(Payment, Payment.objects
+                                   .filter(pk__in=payment_ids, status='failed', updated_at=now)
+                                   .values_list('pk', flat=True))
+            transaction.on_commit(partial(response_cache.invalidate, 'dashboard'))
+            ranges = (Rental.objects
+                      .filter(pk__in=cancelled)
+                      .values('car_id')
+                      .annotate(first=Min('start_date'), last=Max('end_date'))
+                      .order_by())
+            for row in ranges:
+                refresh_car_rollups.delay(
+                    car_id=row['car_id'], first=row['first'].isoformat(), last=row['last'].isoformat()
+                )
+                transaction.on_commit(partial(availability.release, row['car_id'], row['first'], row['last']))
+        batches += 1
+        if len(ids) < batch_size:
+            break
+
+    return SweepResult(rentals, payments, batches, time.perf_counter() - started)
+
+
+def purge_idempotency_keys(ttl=None, batch_size=1000):
+    """
+    Deletes ``Idempotency-Key`` records older than ``ttl``, in batches.
+
+    :param ttl: Defaults to ``IDEMPOTENCY_KEY_TTL``.
+    :type ttl: timedelta | None
+    :param batch_size: Records deleted per statement.
+    :type batch_size: int
+    :return: Number of records deleted.
+    :rtype: int
+    """
+    ttl = ttl or getattr(settings, 'IDEMPOTENCY_KEY_TTL', datetime.timedelta(hours=24))
+    cutoff = timezone.now() - ttl
+    deleted = 0
+    while True:
+        ids = list(IdempotencyKey.objects
+                   .filter(created_at__lt=cutoff)
+                   .order_by('created_at')
+                   .values_list('pk', flat=True)[:batch_size])
+        if ids:
+            deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return deleted
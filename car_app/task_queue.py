@@ -0,0 +1,196 @@
+"""
+A small database backed task queue.
+
+Functions decorated with :func:`task` can be queued with ``func.delay(**payload)``.
+The :class:`~car_app.models.Task` row is written with ``transaction.on_commit``,
+so work queued inside a request transaction only exists once the transaction
+commits, and never sees rows that were rolled back. Tasks are claimed with a
+conditional UPDATE, which works the same on SQLite and Postgres, and failed
+attempts are retried with exponential backoff until ``max_attempts``.
+"""
+import datetime
+import logging
+import random
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from car_app.models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name=None, max_attempts=5):
+    """
+    Registers a function as a background task.
+
+    The function gets a ``delay(**payload)`` attribute that queues it. Payloads
+    are stored as JSON, so pass ids rather than model instances.
+
+    :param name: Registered name, defaults to ``module.function``.
+    :type name: str | None
+    :param max_attempts: Attempts before a failing task is given up.
+    :type max_attempts: int
+    """
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        _registry[task_name] = func
+        func.task_name = task_name
+        func.delay = lambda **payload: enqueue(task_name, max_attempts=max_attempts, **payload)
+        return func
+    return decorator
+
+
+def enqueue(name, max_attempts=5, run_at=None, **payload):
+    """
+    Queues a registered task once the current transaction commits.
+
+    Outside of a transaction the task is queued immediately.
+    """
+    def create():
+        Task.objects.create(
+            name=name,
+            payload=payload,
+            max_attempts=max_attempts,
+            run_at=run_at or timezone.now(),
+        )
+    transaction.on_commit(create)
+
+
+def queue_settings():
+    """
+    Returns the ``TASK_QUEUE`` settings with defaults for missing keys.
+
+    :rtype: dict
+    """
+    options = {
+        'RETRY_BACKOFF': 5,
+        'RETRY_BACKOFF_MAX': 3600,
+        'LOCK_TIMEOUT': 600,
+        'POLL_INTERVAL': 1.0,
+    }
+    options.update(getattr(settings, 'TASK_QUEUE', {}))
+    return options
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before the next attempt, doubling per attempt with some jitter.
+
+    :rtype: float
+    """
+    options = queue_settings()
+    delay = min(options['RETRY_BACKOFF'] * 2 ** max(attempts - 1, 0), options['RETRY_BACKOFF_MAX'])
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_next():
+    """
+    Claims the next due task for the calling worker.
+
+    Tasks left ``running`` longer than ``LOCK_TIMEOUT`` seconds are assumed to
+    belong to a dead worker and can be claimed again.
+
+    :return: The claimed task, or None when nothing is due.
+    :rtype: Task | None
+    """
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=queue_settings()['LOCK_TIMEOUT'])
+    claimable = Q(status='queued', run_at__lte=now) | Q(status='running', locked_at__lt=stale)
+
+    candidates = Task.objects.filter(claimable).order_by('run_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = (Task.objects
+                   .filter(claimable, pk=pk)
+                   .update(status='running', locked_at=now, attempts=F('attempts') + 1))
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run_task(task_row):
+    """
+    Runs a claimed task and records the outcome.
+
+    :return: True when the task succeeded.
+    :rtype: bool
+    """
+    func = _registry.get(task_row.name)
+    try:
+        if func is None:
+            raise LookupError(f"Task {task_row.name!r} is not registered")
+        func(**task_row.payload)
+    except Exception:
+        task_row.last_error = traceback.format_exc()
+        task_row.locked_at = None
+        if task_row.attempts >= task_row.max_attempts:
+            task_row.status = 'failed'
+            logger.error("Task %s (%s) failed for good", task_row.pk, task_row.name)
+        else:
+            task_row.status = 'queued'
+            task_row.run_at = timezone.now() + datetime.timedelta(seconds=retry_delay(task_row.attempts))
+            logger.warning("Task %s (%s) failed, retrying at %s", task_row.pk, task_row.name, task_row.run_at)
+        task_row.save(update_fields=['status', 'run_at', 'locked_at', 'last_error'])
+        return False
+
+    task_row.status = 'done'
+    task_row.locked_at = None
+    task_row.save(update_fields=['status', 'locked_at'])
+    return True
+
+
+def work(stop_event, burst=False):
+    """
+    Worker loop: claims and runs tasks until ``stop_event`` is set.
+
+    :param stop_event: Set to ask the loop to finish after the current task.
+    :type stop_event: threading.Event
+    :param burst: Return as soon as no task is due instead of polling.
+    :type burst: bool
+    :return: Number of tasks processed.
+    :rtype: int
+    """
+    processed = 0
+    poll_interval = queue_settings()['POLL_INTERVAL']
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            task_row = claim_next()
+            if task_row is None:
+                if burst:
+                    break
+                stop_event.wait(poll_interval)
+                continue
+            run_task(task_row)
+            processed += 1
+    finally:
+        connection.close()
+    return processed
+
+
+def run_pool(concurrency=1, burst=False, stop_event=None):
+    """
+    Runs ``concurrency`` worker threads, each with its own database connection.
+
+    :return: Number of tasks processed by all workers.
+    :rtype: int
+    """
+    stop_event = stop_event or threading.Event()
+    counts = []
+
+    def target():
+        counts.append(work(stop_event, burst=burst))
+
+    threads = [threading.Thread(target=target, name=f"task-worker-{i}", daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(timeout=0.5)
+    return sum(counts)
@@ -0,0 +1,59 @@
+"""
+Background tasks run by the ``run_worker`` command.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from car_app import payments
+from car_app.messages import RENTAL_CONFIRMATION_BODY, RENTAL_CONFIRMATION_SUBJECT
+from car_app.models import Payment, Rental
+from car_app.rollups import refresh_car_days
+from car_app.task_queue import task
+
+
+@task()
+def send_rental_confirmation(rental_id):
+    """
+    Emails the booking confirmation to the customer.
+    """
+    rental = Rental.objects.select_related('car', 'customer__user').get(pk=rental_id)
+    send_mail(
+        RENTAL_CONFIRMATION_SUBJECT,
+        RENTAL_CONFIRMATION_BODY.format(
+            car=rental.car,
+            start_date=rental.start_date,
+            end_date=rental.end_date,
+            total_cost=rental.total_cost,
+        ),
+        settings.DEFAULT_FROM_EMAIL,
+        [rental.customer.user.email],
+    )
+
+
+@task()
+def refresh_rental_rollups(rental_id):
+    """
+    Brings the daily rollups of a rental's car and days up to date.
+    """
+    rental = Rental.objects.only('car_id', 'start_date', 'end_date').get(pk=rental_id)
+    refresh_car_days(rental.car_id, rental.start_date, rental.end_date)
+
+
+@task(max_attempts=8)
+def process_payment(payment_id):
+    """
+    Charges a pending payment; a declined charge cancels the rental and frees its days.
+    """
+    payment = Payment.objects.only('rental_id').get(pk=payment_id)
+    if payments.process_payment(payment_id) == 'failed':
+        refresh_rental_rollups.delay(rental_id=payment.rental_id)
+
+
+@task()
+def refresh_car_rollups(car_id, first, last):
+    """
+    Brings the daily rollups of a car up to date between two ISO dates.
+    """
+    refresh_car_days(car_id, datetime.date.fromisoformat(first), datetime.date.fromisoformat(last))
@@ -0,0 +1,150 @@
+"""
+Token bucket throttles on the shared cache.
+
+Every client gets a bucket of ``num_requests`` tokens per scope, refilled
+continuously at ``num_requests / period``; rates use DRF's ``"100/min"`` format
+and are configured in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``. A bucket is
+two cache keys, the moment it was (last) full and the tokens taken since, and
+a request costs one atomic ``incr`` plus one ``get``, so it works the same on
+Redis in production and on the local memory cache in tests.
+
+Users are told apart by the user id claim of their access token, which is
+verified but not looked up in the database, and anonymous clients by IP. With
+:class:`EarlyThrottleMixin` a view checks its throttles before authentication,
+so a rejected request never reaches the database.
+"""
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def jwt_user_id(request):
+    """
+    The user id claim of the request's access token, without a database query.
+
+    :return: The user id, or None without a valid bearer token.
+    :rtype: str | None
+    """
+    if not hasattr(request, '_throttle_user_id'):
+        user_id = None
+        header = request.META.get(jwt_settings.AUTH_HEADER_NAME, '').split()
+        if len(header) == 2 and header[0] in jwt_settings.AUTH_HEADER_TYPES:
+            try:
+                user_id = AccessToken(header[1])[jwt_settings.USER_ID_CLAIM]
+            except (TokenError, KeyError):
+                pass
+        request._throttle_user_id = None if user_id is None else str(user_id)
+    return request._throttle_user_id
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Base class of the token bucket throttles; subclasses define ``get_cache_key``.
+
+    Buckets expire after being idle for ten times their refill time. An active
+    bucket also expires that long after it was created and comes back full,
+    which lets through at most one extra bucket per expiry period.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        refill = self.num_requests / self.duration
+        timeout = max(math.ceil(10 * self.duration), 60)
+        stamp_key, count_key = f"{self.key}:t", f"{self.key}:n"
+
+        try:
+            taken = self.cache.incr(count_key)
+            started = self.cache.get(stamp_key)
+        except ValueError:
+            taken, started = 1, None
+        if started is None:
+            self.cache.set_many({stamp_key: self.now, count_key: 1}, timeout)
+            taken, started = 1, self.now
+
+        self.tokens = self.num_requests + (self.now - started) * refill - taken
+        if self.tokens < 0:
+            self.cache.decr(count_key)
+            self.wait_time = -self.tokens / refill
+            return False
+        if self.tokens > self.num_requests - 1:
+            # Idle long enough for the bucket to overflow: start again from a full one.
+            self.cache.set_many({stamp_key: self.now, count_key: 1}, timeout)
+        return True
+
+    def wait(self):
+        return getattr(self, 'wait_time', None)
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits clients without a valid access token, per IP address.
+    """
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if jwt_user_id(request) is not None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits authenticated clients, per user.
+    """
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        user_id = jwt_user_id(request)
+        if user_id is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': user_id}
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits the endpoint group named by the view's ``throttle_scope``, per user
+    or, for anonymous clients, per IP address.
+    """
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # The rate depends on the view, so it is looked up in allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        ident = jwt_user_id(request) or self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class EarlyThrottleMixin:
+    """
+    Checks the throttles before authentication and permissions instead of after,
+    so throttled requests are rejected before any database work.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.check_throttles(request)
+        self._throttles_checked = True
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request):
+        if not getattr(self, '_throttles_checked', False):
+            super().check_throttles(request)
@@ -0,0 +1,10 @@
+from django.urls import path
+from car_app.views.analytics_views import *
+
+urlpatterns = [
+    path('dashboard/', OwnerDashboardView.as_view(), name='analytics-dashboard'),
+    path('fleet/', FleetAnalyticsView.as_view(), name='analytics-fleet'),
+    path('occupancy/', FleetOccupancyView.as_view(), name='analytics-occupancy'),
+    path('rollups/cars/', CarDailyRollupListView.as_view(), name='analytics-car-rollups'),
+    path('rollups/payments/', PaymentDailyRollupListView.as_view(), name='analytics-payment-rollups'),
+]
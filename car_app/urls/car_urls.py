@@ -1,7 +1,12 @@
 from django.urls import path
 from car_app.views.car_views import *
+from car_app.views.event_views import CarEventPollView, CarEventStreamView
 
 urlpatterns = [
+    path('quote/', CarQuoteView.as_view(), name='car-quote'),
+    path('events/', CarEventStreamView.as_view(), name='car-events'),
+    path('events/poll/', CarEventPollView.as_view(), name='car-events-poll'),
+    path('calendar/', CarCalendarView.as_view(), name='car-calendar'),
     path('car/<int:pk>/', CarDetailView.as_view(), name='car-detail'),
     path('', CarListView.as_view(), name='car-list'),
 ]
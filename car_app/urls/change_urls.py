@@ -0,0 +1,6 @@
+from django.urls import path
+from car_app.views.change_views import *
+
+urlpatterns = [
+    path('', ChangeFeedView.as_view(), name='changes'),
+]
@@ -3,6 +3,7 @@ from car_app.views.customer_views import *
 
 urlpatterns = [
     path('register/', RegisterCustomer.as_view(), name='customer-register'),
+    path('import/', CustomerImportView.as_view(), name='customer-import'),
     path('profile/', CustomerProfileView.as_view(), name='customer-profile'),
     path('<str:pk>/', CustomerDetailView.as_view(), name='customer-detail'),
     path('', CustomerListView.as_view(), name='customers')
@@ -6,6 +6,7 @@ urlpatterns = [
     path('login/', MyTokenObtainPairView.as_view(), name='login'),
     path('profile/password/', ChangePasswordView.as_view(), name='user-update-password'),
     path('profile/', UserProfileView.as_view(), name='profile'),
+    path('availability/', AvailabilityView.as_view(), name='user-availability'),
     path('<str:pk>/', UserDetailView.as_view(), name='user-detail'),
     path("auth/google/", GoogleAuthView.as_view(), name="google_login"),
     path('', UserListView.as_view(), name='users')
@@ -0,0 +1,97 @@
+import datetime
+
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from car_app import response_cache
+from car_app.analytics import dashboard, fleet_report
+from car_app.filters import CarDailyRollupFilter, PaymentDailyRollupFilter
+from car_app.models import CarDailyRollup, PaymentDailyRollup
+from car_app.occupancy import occupancy
+from car_app.permissions import IsOwner
+from car_app.serializers import (
+    AnalyticsPeriodSerializer,
+    CarDailyRollupSerializer,
+    DashboardSerializer,
+    FleetReportSerializer,
+    OccupancyBitmapSerializer,
+    OccupancyQuerySerializer,
+    OccupancyRunsSerializer,
+    PaymentDailyRollupSerializer,
+)
+from docs.analytics_views_docs import (
+    FLEET_ANALYTICS_SCHEMA,
+    CAR_ROLLUPS_SCHEMA,
+    PAYMENT_ROLLUPS_SCHEMA,
+    FLEET_OCCUPANCY_SCHEMA,
+    OWNER_DASHBOARD_SCHEMA,
+)
+
+
+@FLEET_ANALYTICS_SCHEMA
+class FleetAnalyticsView(APIView):
+    """
+    Fleet utilization, revenue per month and average rental length for owners.
+    """
+    permission_classes = [IsOwner]
+
+    def get(self, request):
+        period = AnalyticsPeriodSerializer(data=request.query_params)
+        period.is_valid(raise_exception=True)
+        report = fleet_report(**period.validated_data)
+        return Response(FleetReportSerializer(report).data, status=status.HTTP_200_OK)
+
+
+@OWNER_DASHBOARD_SCHEMA
+class OwnerDashboardView(APIView):
+    """
+    Rentals and payments per status, fleet status and today's pickups and returns for owners.
+    """
+    permission_classes = [IsOwner]
+
+    def get(self, request):
+        today = datetime.date.today()
+        data = response_cache.remember(
+            'dashboard', today.isoformat(), lambda: DashboardSerializer(dashboard(today)).data
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+@FLEET_OCCUPANCY_SCHEMA
+class FleetOccupancyView(APIView):
+    """
+    Cars x days occupancy matrix of the whole fleet for owners.
+    """
+    permission_classes = [IsOwner]
+
+    def get(self, request):
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        result = occupancy(**query.validated_data)
+        serializer_class = OccupancyBitmapSerializer if result['encoding'] == 'bitmap' else OccupancyRunsSerializer
+        return Response(serializer_class(result).data, status=status.HTTP_200_OK)
+
+
+@CAR_ROLLUPS_SCHEMA
+class CarDailyRollupListView(generics.ListAPIView):
+    """
+    Lists the per car, per day rental rollups.
+    """
+    queryset = CarDailyRollup.objects.order_by('day', 'car')
+    serializer_class = CarDailyRollupSerializer
+    permission_classes = [IsOwner]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CarDailyRollupFilter
+
+
+@PAYMENT_ROLLUPS_SCHEMA
+class PaymentDailyRollupListView(generics.ListAPIView):
+    """
+    Lists the per day, per status payment rollups.
+    """
+    queryset = PaymentDailyRollup.objects.order_by('day', 'status')
+    serializer_class = PaymentDailyRollupSerializer
+    permission_classes = [IsOwner]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PaymentDailyRollupFilter
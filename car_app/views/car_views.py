@@ -1,20 +1,30 @@
 from car_app.filters import CarFilter
+from car_app.managers import defer_car_details
 from car_app.serializers import *
 from rest_framework.permissions import AllowAny
 from car_app.permissions import IsOwner
-from rest_framework import generics, permissions
+from car_app.messages import *
+from car_app.mixins import CachedResponseMixin, ConditionalGetMixin, SparseFieldsetMixin
+from car_app.availability import calendar
+from car_app.pricing import quote_many
+from car_app.throttling import EarlyThrottleMixin
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from docs.car_views_docs import CAR_DETAIL_SCHEMA, LIST_CARS_SCHEMA
+from docs.car_views_docs import CAR_DETAIL_SCHEMA, LIST_CARS_SCHEMA, CAR_QUOTE_SCHEMA, CAR_CALENDAR_SCHEMA
 
 
 @LIST_CARS_SCHEMA
-class CarListView(generics.ListAPIView):
+class CarListView(EarlyThrottleMixin, CachedResponseMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     Gets a list of all cars.
     """
-    queryset = Car.objects.all()
-    serializer_class = CarSerializer
+    throttle_scope = 'catalog'
+    response_cache_namespace = 'catalog'
+    queryset = defer_car_details(Car.objects.all())
+    serializer_class = CarListSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = CarFilter
@@ -23,7 +33,7 @@ class CarListView(generics.ListAPIView):
 
 
 @CAR_DETAIL_SCHEMA
-class CarDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CarDetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Car.objects.all()
     serializer_class = CarSerializer
 
@@ -31,3 +41,53 @@ class CarDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method == "GET":
             return [permissions.AllowAny()]
         return [IsOwner()]
+
+
+@CAR_QUOTE_SCHEMA
+class CarQuoteView(APIView):
+    """
+    Prices a list of cars for one date range, e.g. a whole search result page.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        cars = Car.objects.in_bulk(data["cars"])
+        missing = [car_id for car_id in data["cars"] if car_id not in cars]
+        if missing:
+            return Response(
+                {"message": CAR_NOT_FOUND, "cars": missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        quotes = quote_many(
+            (cars[car_id], data["start_date"], data["end_date"]) for car_id in data["cars"]
+        )
+        return Response(QuoteSerializer(quotes, many=True).data, status=status.HTTP_200_OK)
+
+
+@CAR_CALENDAR_SCHEMA
+class CarCalendarView(APIView):
+    """
+    Booked days of one or more cars, served from the cached availability bitmaps.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        serializer = CalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        existing = set(Car.objects.filter(pk__in=data["cars"]).values_list("pk", flat=True))
+        missing = [car_id for car_id in data["cars"] if car_id not in existing]
+        if missing:
+            return Response(
+                {"message": CAR_NOT_FOUND, "cars": missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = calendar(data["cars"], data["date_from"], data["date_to"])
+        return Response(CalendarSerializer(result).data, status=status.HTTP_200_OK)
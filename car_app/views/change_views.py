@@ -0,0 +1,57 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from car_app import changefeed
+from car_app.messages import *
+from car_app.serializers import *
+from docs.change_views_docs import CHANGE_FEED_SCHEMA
+
+CHANGE_SERIALIZERS = {
+    'car': CarSerializer,
+    'rental': RentalSerializer,
+    'payment': PaymentSerializer,
+}
+
+
+@CHANGE_FEED_SCHEMA
+class ChangeFeedView(APIView):
+    """
+    Cars, rentals and payments changed after a cursor, for incremental sync.
+
+    Owners see every change, customers the cars and their own rentals and payments.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = ChangeFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data["since"]
+
+        if since and since < changefeed.purge_horizon():
+            return Response({"message": CHANGE_FEED_RESYNC}, status=status.HTTP_410_GONE)
+
+        customer_id = None
+        if not request.user.is_owner:
+            customer_id = Customer.objects.filter(user=request.user).values_list("pk", flat=True).first() or 0
+
+        entries, cursor, has_more = changefeed.changes(
+            since, customer_id=customer_id, limit=query.validated_data.get("limit")
+        )
+        objects = changefeed.load_objects(entries)
+
+        result = []
+        for seq, model, object_id, action in entries:
+            data = None
+            if action == "upsert":
+                obj = objects.get((model, object_id))
+                if obj is None:
+                    # Deleted meanwhile, its tombstone follows later in the feed.
+                    continue
+                data = CHANGE_SERIALIZERS[model](obj, expand={}).data
+            result.append({"seq": seq, "model": model, "id": object_id, "action": action, "data": data})
+
+        return Response(
+            ChangeFeedSerializer({"changes": result, "cursor": cursor, "has_more": has_more}).data,
+            status=status.HTTP_200_OK
+        )
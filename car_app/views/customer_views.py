@@ -1,7 +1,13 @@
 from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from car_app import registration
 from car_app.permissions import IsOwner
+from car_app.filters import CustomerSearchFilter
+from car_app.mixins import SparseFieldsetMixin
+from car_app.onboarding import CustomerImportError, import_customers, import_settings, read_csv
+from car_app.throttling import EarlyThrottleMixin
 from car_app.serializers import *
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework import generics, status
@@ -13,11 +19,12 @@ from docs.customer_views_docs import *
 
 
 @REGISTER_CUSTOMER_SCHEMA
-class RegisterCustomer(APIView):
+class RegisterCustomer(EarlyThrottleMixin, APIView):
     """
     Customer registration view.
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'register'
 
     def post(self, request):
         data = request.data
@@ -40,24 +47,23 @@ class RegisterCustomer(APIView):
             "phone_number": data.get("phone_number", ""),
         }
 
+        # Checked before create_user() hashes the password.
+        conflict = registration.find_conflict(user_data["email"], customer_data["phone_number"])
+        if conflict:
+            return Response({'message': conflict}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             with transaction.atomic():
                 user = User.objects.create_user(**user_data)
                 customer = Customer.objects.create(user=user, **customer_data)
 
-        except IntegrityError as e:
-            if 'email' in str(e):
-                return Response(
-                    {'message': EMAIL_ALREADY_REGISTERED},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if 'phone_number' in str(e):
-                return Response(
-                    {'message': PHONE_ALREADY_REGISTERED},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        except IntegrityError:
+            # A concurrent registration won the race for the e-mail or phone
+            # number, or the prefilter did not know it yet.
+            conflict = registration.find_conflict(user_data["email"], customer_data["phone_number"],
+                                                  use_prefilter=False)
             return Response(
-                {'message': REGISTRATION_FAILURE},
+                {'message': conflict or REGISTRATION_FAILURE},
                 status=status.HTTP_400_BAD_REQUEST
             )
         except ValidationError as e:
@@ -69,19 +75,56 @@ class RegisterCustomer(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@CUSTOMER_IMPORT_SCHEMA
+class CustomerImportView(APIView):
+    """
+    Creates customers from an uploaded CSV file, all of them or none.
+
+    Passwords are hashed in the request, one after another, so the file size
+    and its number of passwords are limited to what fits the worker timeout.
+    """
+    permission_classes = [IsOwner]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'message': CUSTOMER_IMPORT_NO_FILE}, status=status.HTTP_400_BAD_REQUEST)
+
+        options = import_settings()
+        try:
+            rows = read_csv(file)
+            if len(rows) > options['MAX_ROWS']:
+                return Response(
+                    {'message': CUSTOMER_IMPORT_TOO_LARGE.format(max_rows=options['MAX_ROWS'])},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if sum(1 for row in rows if row.get('password')) > options['MAX_PASSWORDS']:
+                return Response(
+                    {'message': CUSTOMER_IMPORT_TOO_MANY_PASSWORDS.format(max_passwords=options['MAX_PASSWORDS'])},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            created = import_customers(rows, processes=1)
+        except CustomerImportError as e:
+            return Response({'message': e.message, 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({'message': REGISTRATION_FAILURE}, status=status.HTTP_409_CONFLICT)
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+
+
 @LIST_CUSTOMERS_SCHEMA
-class CustomerListView(generics.ListAPIView):
+class CustomerListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     Retrieves a list of customers.
     """
 
-    queryset = Customer.objects.all()
+    queryset = Customer.objects.select_related("user")
     serializer_class = CustomerSerializer
     permission_classes = [IsOwner]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, CustomerSearchFilter, filters.OrderingFilter]
     filterset_fields = ['city', 'country', 'citizenship']
-    search_fields = ['user__first_name', 'user__last_name', 'user__email', 'phone_number']
     ordering_fields = ['licence_since', 'date_of_birth']
+    ordering = ['pk']
 
 
 @CUSTOMER_PROFILE_SCHEMA
@@ -115,7 +158,7 @@ class CustomerProfileView(generics.RetrieveUpdateAPIView):
 
 
 @CUSTOMER_DETAIL_SCHEMA
-class CustomerDetailView(generics.RetrieveAPIView):
+class CustomerDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
     """
     Retrieves customer details for admin.
     """
@@ -0,0 +1,168 @@
+import asyncio
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from car_app.broker import events_settings, get_broker
+from car_app.messages import *
+
+
+def parse_car_ids(value):
+    """
+    Parses the ``cars`` query parameter, a comma separated list of car ids.
+
+    :return: The ids, or None to receive events of every car.
+    :rtype: set[int] | None
+    :raises ValueError: If an id is not an integer.
+    """
+    if not value:
+        return None
+    return {int(car_id) for car_id in value.split(",") if car_id.strip()}
+
+
+def wanted(event, car_ids):
+    return car_ids is None or event["data"].get("car") in car_ids
+
+
+def parse_event_id(value):
+    """
+    Parses an event id from ``Last-Event-ID`` or ``since``; missing means "from now on".
+
+    :rtype: int | None
+    :raises ValueError: If the id is not an integer.
+    """
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def require_asgi(request):
+    """
+    Refuses requests that did not come through the ASGI application.
+
+    Under WSGI an async view runs to completion on the worker serving the
+    request, so a stream would never end and a long poll would hold the worker
+    for its whole timeout.
+
+    :return: A 501 response, or None when the request is served over ASGI.
+    :rtype: JsonResponse | None
+    """
+    if isinstance(request, ASGIRequest):
+        return None
+    return JsonResponse({"message": EVENTS_REQUIRE_ASGI}, status=501)
+
+
+def sse_message(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def resync_message():
+    return f"event: resync\ndata: {json.dumps({'message': EVENTS_RESYNC})}\n\n"
+
+
+class CarEventStreamView(View):
+    """
+    Server-Sent Events stream of booking and car availability changes.
+
+    Served by the ASGI application; each connection is one broker subscription
+    on the event loop, not a worker thread. ``?cars=1,2`` limits the stream to
+    some cars. Reconnecting clients send ``Last-Event-ID`` and get the buffered
+    events they missed; when those are gone, or the client reads too slowly,
+    the stream sends a ``resync`` event and closes, and the client should
+    reload the calendar before reconnecting. Answers 501 under WSGI.
+    """
+
+    async def get(self, request):
+        refused = require_asgi(request)
+        if refused is not None:
+            return refused
+        try:
+            car_ids = parse_car_ids(request.GET.get("cars"))
+            last_event_id = parse_event_id(request.headers.get("Last-Event-ID"))
+        except ValueError:
+            return JsonResponse({"message": INVALID_EVENT_PARAMETERS}, status=400)
+
+        response = StreamingHttpResponse(
+            self.stream(car_ids, last_event_id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, car_ids, last_event_id):
+        options = events_settings()
+        broker = get_broker()
+        subscription = broker.subscribe()
+        try:
+            yield f"retry: {options['HEARTBEAT_SECONDS'] * 1000}\n\n"
+            if last_event_id is not None:
+                missed = broker.since(last_event_id)
+                if missed is None:
+                    yield resync_message()
+                    return
+                for event in missed:
+                    last_event_id = event["id"]
+                    if wanted(event, car_ids):
+                        yield sse_message(event)
+            while True:
+                event = await subscription.get(options["HEARTBEAT_SECONDS"])
+                if subscription.overflowed:
+                    yield resync_message()
+                    return
+                if event is None:
+                    yield ": heartbeat\n\n"
+                elif last_event_id is None or event["id"] > last_event_id:
+                    if wanted(event, car_ids):
+                        yield sse_message(event)
+        finally:
+            subscription.close()
+
+
+class CarEventPollView(View):
+    """
+    Long-poll fallback for clients that cannot use Server-Sent Events.
+
+    Without ``since`` it answers at once with the current cursor. With it, the
+    request waits up to ``EVENTS['POLL_TIMEOUT']`` seconds for the first
+    matching event and returns the events after ``since`` with the cursor to
+    send next time. A cursor too old to resume from answers 410 Gone. Like the
+    stream, it is only served over ASGI and answers 501 under WSGI.
+    """
+
+    async def get(self, request):
+        refused = require_asgi(request)
+        if refused is not None:
+            return refused
+        try:
+            car_ids = parse_car_ids(request.GET.get("cars"))
+            since = parse_event_id(request.GET.get("since"))
+        except ValueError:
+            return JsonResponse({"message": INVALID_EVENT_PARAMETERS}, status=400)
+
+        broker = get_broker()
+        if since is None:
+            return JsonResponse({"events": [], "cursor": broker.last_id})
+
+        subscription = broker.subscribe()
+        try:
+            events = broker.since(since)
+            if events is None:
+                return JsonResponse({"message": EVENTS_RESYNC}, status=410)
+            cursor = events[-1]["id"] if events else since
+            events = [event for event in events if wanted(event, car_ids)]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + events_settings()["POLL_TIMEOUT"]
+            while not events and loop.time() < deadline:
+                event = await subscription.get(deadline - loop.time())
+                if subscription.overflowed:
+                    return JsonResponse({"message": EVENTS_RESYNC}, status=410)
+                if event is None:
+                    break
+                if event["id"] > cursor:
+                    cursor = event["id"]
+                    if wanted(event, car_ids):
+                        events.append(event)
+        finally:
+            subscription.close()
+        return JsonResponse({"events": events, "cursor": cursor})
@@ -1,19 +1,36 @@
 from datetime import date
 from django.db import transaction
+from django.http import Http404
 from rest_framework import status, generics
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from car_app.managers import defer_car_details
 from car_app.messages import *
+from car_app.mixins import ConditionalGetMixin, IdempotencyMixin, SparseFieldsetMixin
 from car_app.permissions import IsOwner, IsCustomer
+from car_app.pricing import quote
+from car_app.tasks import process_payment, refresh_rental_rollups, send_rental_confirmation
 from car_app.serializers import *
 from docs.rental_views_docs import LIST_CUSTOMER_RENTALS, CREATE_RENTAL_SCHEMA, RENTAL_DETAIL_SCHEMA, RENTAL_LIST_SCHEMA
 
 
+def archived_rentals():
+    """
+    Every archived rental, or none when nothing was archived yet.
+
+    :rtype: QuerySet[ArchivedRental]
+    """
+    return defer_car_details(Rental.objects.archived().select_related('car', 'customer__user'), 'car')
+
+
 @LIST_CUSTOMER_RENTALS
 class CustomerRentalListView(APIView):
     """
-    List all rentals for the authenticated customer.
+    List all rentals for the authenticated customer, archived ones after the live ones.
+
+    The archive is only queried when the period, unbounded without
+    ``date_from``, reaches back before the archive horizon.
     """
     permission_classes = [IsAuthenticated, IsCustomer]
 
@@ -26,16 +43,24 @@ class CustomerRentalListView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        rentals = (
+        period = RentalHistoryQuerySerializer(data=request.query_params)
+        period.is_valid(raise_exception=True)
+        date_from = period.validated_data.get("date_from")
+        date_to = period.validated_data.get("date_to")
+
+        rentals = defer_car_details(
             Rental.objects
             .filter(customer=customer)
-            .select_related("car")
+            .overlapping(date_from, date_to)
+            .select_related("car"),
+            "car",
         )
+        payments = defer_car_details(Payment.objects.select_related("rental__car", "rental__customer"), "rental__car")
 
         result = []
         for rent in rentals:
             rent_data = RentalSerializer(rent).data
-            pay = Payment.objects.filter(rental=rent).first()
+            pay = payments.filter(rental=rent).first()
             if pay:
                 rent_data["payment"] = PaymentSerializer(pay).data
             else:
@@ -43,23 +68,42 @@ class CustomerRentalListView(APIView):
 
             result.append(rent_data)
 
+        archived = defer_car_details(
+            Rental.objects
+            .archived(date_from, date_to, customer=customer)
+            .select_related("car", "customer")
+            .order_by("start_date"),
+            "car",
+        )
+        result.extend(ArchivedRentalSerializer(archived, many=True).data)
+
         return Response(result, status=status.HTTP_200_OK)
 
 
 @RENTAL_DETAIL_SCHEMA
-class RentalDetailView(generics.RetrieveUpdateAPIView):
+class RentalDetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveUpdateAPIView):
     """
     Rental detail view for updating and retrieving rental information.
+
+    Archived rentals can be retrieved but no longer updated.
     """
     permission_classes = [IsOwner]
+    version_fields = ['updated_at', 'car__updated_at', 'customer__updated_at', 'payment__updated_at']
     serializer_class = RentalSerializer
-    queryset = Rental.objects.select_related('car', 'customer__user')
+    queryset = defer_car_details(Rental.objects.select_related('car', 'customer__user'), 'car')
 
     def retrieve(self, request, *args, **kwargs):
-        rental = self.get_object()
+        try:
+            rental = self.get_object()
+        except Http404:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            archived = generics.get_object_or_404(archived_rentals(), pk=self.kwargs[lookup_url_kwarg])
+            return Response(ArchivedRentalSerializer(archived, context=self.get_serializer_context()).data)
         data = self.get_serializer(rental).data
 
-        payment = Payment.objects.filter(rental=rental).first()
+        payment = defer_car_details(
+            Payment.objects.select_related("rental__car", "rental__customer"), "rental__car"
+        ).filter(rental=rental).first()
         if payment:
             data["payment"] = PaymentSerializer(payment).data
         else:
@@ -69,14 +113,14 @@ class RentalDetailView(generics.RetrieveUpdateAPIView):
 
 
 @CREATE_RENTAL_SCHEMA
-class RentalCreateView(generics.GenericAPIView):
+class RentalCreateView(IdempotencyMixin, generics.GenericAPIView):
     """
     Rental creation view for customers to book a car.
     """
     permission_classes = [IsAuthenticated, IsCustomer]
     serializer_class = RentalSerializer
 
-    def post(self, request):
+    def create(self, request, *args, **kwargs):
         car_id = request.data.get("car")
         start_date = request.data.get("start_date")
         end_date = request.data.get("end_date")
@@ -103,18 +147,20 @@ class RentalCreateView(generics.GenericAPIView):
         if end_date <= start_date:
             return Response({"message": "end_date must be after start_date"}, status=400)
 
-        overlap = Rental.objects.filter(
-            car=car,
-            start_date__lt=end_date,
-            end_date__gt=start_date,
-        ).exists()
-        if overlap:
-            return Response({"message": "Car already booked for given dates"}, status=400)
-
-        days = (end_date - start_date).days + 1
-        total_cost = car.daily_rate * days
+        total_cost = quote(car, start_date, end_date).total_cost
 
         with transaction.atomic():
+            # Concurrent bookings of the same car queue up on its row lock, so
+            # the overlap check below sees every booking committed before it.
+            Car.objects.select_for_update().filter(pk=car.pk).values_list("pk").get()
+            overlap = Rental.objects.filter(
+                car=car,
+                start_date__lt=end_date,
+                end_date__gt=start_date,
+            ).exclude(status="cancelled").exists()
+            if overlap:
+                return Response({"message": "Car already booked for given dates"}, status=400)
+
             rental = Rental.objects.create(
                 customer=customer,
                 car=car,
@@ -126,8 +172,11 @@ class RentalCreateView(generics.GenericAPIView):
             payment = Payment.objects.create(
                 rental=rental,
                 amount=total_cost,
-                status="completed",
+                status="pending",
             )
+            process_payment.delay(payment_id=payment.pk)
+            send_rental_confirmation.delay(rental_id=rental.pk)
+            refresh_rental_rollups.delay(rental_id=rental.pk)
 
         data = self.get_serializer(rental).data
         data["payment"] = PaymentSerializer(payment).data
@@ -135,12 +184,28 @@ class RentalCreateView(generics.GenericAPIView):
 
 
 @RENTAL_LIST_SCHEMA
-class RentalListView(generics.ListAPIView):
+class RentalListView(SparseFieldsetMixin, generics.ListAPIView):
     """
-    List all rentals for owner user.
+    List all rentals for owner user, archived ones included, by id.
     """
     permission_classes = [IsOwner]
     serializer_class = RentalSerializer
 
     def get_queryset(self):
-        return Rental.objects.select_related('car', 'customer__user').all()
+        return defer_car_details(Rental.objects.select_related('car', 'customer__user'), 'car').order_by('pk')
+
+    def list(self, request, *args, **kwargs):
+        if not Rental.objects.reaches_archive():
+            return super().list(request, *args, **kwargs)
+
+        # Pages over the ids of both tables, then loads the rows of the page from each.
+        ids = [pk for pk, in self.paginate_queryset(Rental.objects.history('id').order_by('id'))]
+        live = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        archived = archived_rentals().in_bulk([pk for pk in ids if pk not in live])
+        context = self.get_serializer_context()
+        data = [
+            self.get_serializer(live[pk]).data if pk in live
+            else ArchivedRentalSerializer(archived[pk], context=context).data
+            for pk in ids if pk in live or pk in archived
+        ]
+        return self.get_paginated_response(data)
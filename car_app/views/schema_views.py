@@ -0,0 +1,69 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from car_app.schema import FORMATS, load_schema, schema_settings
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    A view that imports its class on the first request instead of at URL loading.
+
+    :param dotted_path: Import path of a class based view.
+    :type dotted_path: str
+    :param initkwargs: Passed on to ``as_view()``.
+    """
+    view = None
+
+    @csrf_exempt
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class SchemaView(View):
+    """
+    The OpenAPI schema, served from the files written by ``build_schema``.
+
+    ``?format=json`` or a JSON ``Accept`` header selects the JSON document,
+    YAML is the default. When the schema has not been built, or the request
+    asks for a variant that is not precompiled (``lang``, ``version``), the
+    schema is generated by drf-spectacular as before.
+    """
+    dynamic_view = staticmethod(lazy_view("drf_spectacular.views.SpectacularAPIView"))
+
+    def get(self, request, *args, **kwargs):
+        fmt = self.get_format(request)
+        loaded = None
+        if fmt is not None and request.GET.keys() <= {"format"}:
+            loaded = load_schema(fmt)
+        if loaded is None:
+            return self.dynamic_view(request, *args, **kwargs)
+
+        content, etag = loaded
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=FORMATS[fmt])
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=schema_settings()["MAX_AGE"])
+        return response
+
+    @staticmethod
+    def get_format(request):
+        """
+        Picks the precompiled format matching the request, or None if there is none.
+
+        :rtype: str | None
+        """
+        if "format" in request.GET:
+            return request.GET["format"] if request.GET["format"] in FORMATS else None
+        accept = request.headers.get("Accept", "")
+        if "json" in accept and "yaml" not in accept:
+            return "json"
+        return "yaml"
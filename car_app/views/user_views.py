@@ -1,4 +1,3 @@
-from google.oauth2 import id_token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from docs.user_views_docs import *
@@ -9,10 +8,12 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework import generics, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
+from car_app import registration
 from car_app.messages import *
-from google.auth.transport import requests as google_requests
+from car_app.mixins import SparseFieldsetMixin
+from car_app.throttling import EarlyThrottleMixin
 from car_rental.settings import GOOGLE_CLIENT_ID
 
 
@@ -31,15 +32,16 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 
 @LOGIN_SCHEMA
-class MyTokenObtainPairView(TokenObtainPairView):
+class MyTokenObtainPairView(EarlyThrottleMixin, TokenObtainPairView):
     """
     Handles token obtainment for authentication.
     """
     serializer_class = MyTokenObtainPairSerializer
+    throttle_scope = 'login'
 
 
 @USER_LIST_SCHEMA
-class UserListView(generics.ListAPIView):
+class UserListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     Retrieves a list of users.
     """
@@ -70,13 +72,16 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
             self.get_object(), data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data.get("email")
+        if email and registration.email_taken(email, exclude_user=request.user):
+            return Response({"message": EMAIL_ALREADY_REGISTERED}, status=400)
 
         try:
-            self.perform_update(serializer)
-        except IntegrityError as e:
-            if "email" in str(e):
-                return Response({"message": EMAIL_ALREADY_REGISTERED}, status=400)
-            return Response({"message": str(e)}, status=400)
+            with transaction.atomic():
+                self.perform_update(serializer)
+        except IntegrityError:
+            # Another request took the e-mail after the check above.
+            return Response({"message": EMAIL_ALREADY_REGISTERED}, status=400)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -110,7 +115,7 @@ class ChangePasswordView(APIView):
 
 
 @USER_DETAIL_SCHEMA
-class UserDetailView(generics.RetrieveAPIView):
+class UserDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
     """
     Retrieves user details for admin.
     """
@@ -121,33 +126,37 @@ class UserDetailView(generics.RetrieveAPIView):
 
 
 @REGISTER_USER_SCHEMA
-class RegisterUser(APIView):
+class RegisterUser(EarlyThrottleMixin, APIView):
     """
     User
     registration
     view.
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'register'
 
     def post(self, request):
         data = request.data
         is_owner = data.get('is_owner', False)
+        # Checked before create_user() hashes the password.
+        conflict = registration.find_conflict(email=data.get('email'))
+        if conflict:
+            return Response({'message': conflict}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            user = User.objects.create_user(
-                first_name=data.get('first_name', ''),
-                last_name=data.get('last_name', ''),
-                email=data.get('email', ''),
-                password=data.get('password', ''),
-                is_owner=is_owner,
-            )
-        except IntegrityError as e:
-            if 'email' in str(e):
-                return Response(
-                    {'message': EMAIL_ALREADY_REGISTERED},
-                    status=status.HTTP_400_BAD_REQUEST
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    first_name=data.get('first_name', ''),
+                    last_name=data.get('last_name', ''),
+                    email=data.get('email', ''),
+                    password=data.get('password', ''),
+                    is_owner=is_owner,
                 )
+        except IntegrityError:
+            # A concurrent registration won the race for the e-mail, or the
+            # prefilter did not know it yet.
+            conflict = registration.find_conflict(email=data.get('email'), use_prefilter=False)
             return Response(
-                {'message': REGISTRATION_FAILURE},
+                {'message': conflict or REGISTRATION_FAILURE},
                 status=status.HTTP_400_BAD_REQUEST
             )
         except ValidationError as e:
@@ -159,18 +168,45 @@ class RegisterUser(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@AVAILABILITY_SCHEMA
+class AvailabilityView(EarlyThrottleMixin, APIView):
+    """
+    Tells whether an e-mail or phone number can still be registered.
+    """
+    permission_classes = [AllowAny]
+    throttle_scope = 'availability'
+
+    def get(self, request):
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        result = {}
+        if 'email' in query.validated_data:
+            result['email'] = not registration.email_taken(query.validated_data['email'], use_prefilter=False)
+        if 'phone_number' in query.validated_data:
+            result['phone_number'] = not registration.phone_taken(
+                query.validated_data['phone_number'], use_prefilter=False
+            )
+        return Response(result)
+
+
 @GOOGLE_AUTH_SCHEMA
-class GoogleAuthView(APIView):
+class GoogleAuthView(EarlyThrottleMixin, APIView):
     """
     Handles Google OAuth2 authentication.
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'login'
 
     def post(self, request):
         token = request.data.get("id_token")
         if not token:
             return Response({"detail": "id_token is required"}, status=400)
 
+        # google-auth and its transport pull in requests and the crypto
+        # backends; only load them once someone actually logs in with Google.
+        from google.auth.transport import requests as google_requests
+        from google.oauth2 import id_token
+
         try:
             info = id_token.verify_oauth2_token(
                 token,
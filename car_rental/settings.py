@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+from decimal import Decimal
 from django.conf import settings
 from dotenv import load_dotenv
 import os
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'car_app.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,6 +60,17 @@ ROOT_URLCONF = 'car_rental.urls'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'car_app.renderers.FastJSONRenderer',
+        'car_app.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'car_app.parsers.FastJSONParser',
+        'car_app.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -69,15 +82,71 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'car_app.throttling.AnonTokenBucketThrottle',
+        'car_app.throttling.UserTokenBucketThrottle',
+        'car_app.throttling.ScopedTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('THROTTLE_RATE_ANON', '120/min'),
+        'user': os.getenv('THROTTLE_RATE_USER', '600/min'),
+        'catalog': os.getenv('THROTTLE_RATE_CATALOG', '300/min'),
+        'login': os.getenv('THROTTLE_RATE_LOGIN', '10/min'),
+        'register': os.getenv('THROTTLE_RATE_REGISTER', '5/min'),
+        'availability': os.getenv('THROTTLE_RATE_AVAILABILITY', '30/min'),
+    },
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.getenv('NUM_PROXIES') else None,
+}
+
+PRICING = {
+    'WEEKEND_DISCOUNT': Decimal(os.getenv('PRICING_WEEKEND_DISCOUNT', '0')),
+    'LONG_RENTAL_MIN_DAYS': int(os.getenv('PRICING_LONG_RENTAL_MIN_DAYS', '7')),
+    'LONG_RENTAL_DISCOUNT': Decimal(os.getenv('PRICING_LONG_RENTAL_DISCOUNT', '0')),
+}
+
+ROLLUP_WATERMARK_LAG = timedelta(minutes=int(os.getenv('ROLLUP_WATERMARK_LAG_MINUTES', '5')))
+
+TASK_QUEUE = {
+    'RETRY_BACKOFF': int(os.getenv('TASK_RETRY_BACKOFF', '5')),
+    'RETRY_BACKOFF_MAX': int(os.getenv('TASK_RETRY_BACKOFF_MAX', '3600')),
+    'LOCK_TIMEOUT': int(os.getenv('TASK_LOCK_TIMEOUT', '600')),
+    'POLL_INTERVAL': float(os.getenv('TASK_POLL_INTERVAL', '1.0')),
+}
 
+AVAILABILITY = {
+    'WINDOW_DAYS': int(os.getenv('AVAILABILITY_WINDOW_DAYS', '400')),
+    'CACHE_TIMEOUT': int(os.getenv('AVAILABILITY_CACHE_TIMEOUT', '3600')),
 }
 
+CHANGE_FEED = {
+    'PAGE_SIZE': int(os.getenv('CHANGE_FEED_PAGE_SIZE', '500')),
+    'COMPACT_AFTER': timedelta(hours=int(os.getenv('CHANGE_FEED_COMPACT_AFTER_HOURS', '24'))),
+    'TOMBSTONE_TTL': timedelta(days=int(os.getenv('CHANGE_FEED_TOMBSTONE_TTL_DAYS', '30'))),
+}
+
+PENDING_RENTAL_TTL = timedelta(minutes=int(os.getenv('PENDING_RENTAL_TTL_MINUTES', '30')))
+
+RENTAL_ARCHIVE_AFTER = timedelta(days=int(os.getenv('RENTAL_ARCHIVE_AFTER_DAYS', '730')))
+
+PAYMENT_PROVIDER = os.getenv('PAYMENT_PROVIDER', 'car_app.payments.FakePaymentProvider')
+PAYMENT_CLAIM_TIMEOUT = timedelta(minutes=int(os.getenv('PAYMENT_CLAIM_TIMEOUT_MINUTES', '5')))
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24')))
+
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@car-rental.local')
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Car Rental API',
     'DESCRIPTION': 'API for car rental service',
     'VERSION': '1.0.0',
 }
 
+OPENAPI_SCHEMA = {
+    'DIR': os.getenv('OPENAPI_SCHEMA_DIR', BASE_DIR / 'staticfiles' / 'schema'),
+    'MAX_AGE': int(os.getenv('OPENAPI_SCHEMA_MAX_AGE', '3600')),
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -135,6 +204,48 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'car_rental.wsgi.application'
 
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+COMPRESSION = {
+    'MIN_SIZE': int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),
+}
+
+RESPONSE_CACHE = {
+    'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300')),
+}
+
+REGISTRATION = {
+    'PREFILTER': os.getenv('REGISTRATION_PREFILTER', 'False').lower() == 'true',
+    'PREFILTER_MAX_AGE': int(os.getenv('REGISTRATION_PREFILTER_MAX_AGE', '300')),
+}
+
+CUSTOMER_IMPORT = {
+    'BATCH_SIZE': int(os.getenv('CUSTOMER_IMPORT_BATCH_SIZE', '500')),
+    'MAX_ROWS': int(os.getenv('CUSTOMER_IMPORT_MAX_ROWS', '1000')),
+    'MAX_PASSWORDS': int(os.getenv('CUSTOMER_IMPORT_MAX_PASSWORDS', '50')),
+}
+
+EVENTS = {
+    'HISTORY': int(os.getenv('EVENTS_HISTORY', '1000')),
+    'QUEUE_SIZE': int(os.getenv('EVENTS_QUEUE_SIZE', '100')),
+    'HEARTBEAT_SECONDS': int(os.getenv('EVENTS_HEARTBEAT_SECONDS', '15')),
+    'POLL_TIMEOUT': int(os.getenv('EVENTS_POLL_TIMEOUT', '25')),
+}
+if os.getenv('REDIS_URL'):
+    EVENTS.update(BACKEND='car_app.broker.RedisBackend', REDIS_URL=os.environ['REDIS_URL'])
+
 if os.getenv("USE_SQLITE", "False").lower() == "true":
     DATABASES = {
         'default': {
@@ -153,7 +264,11 @@ else:
             'PORT': '5432',
             'OPTIONS': {
                 'sslmode': 'require',
-            }
+            },
+            # Each worker thread keeps its own connection between requests and
+            # checks it before reuse; size the Postgres pool for workers * threads.
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
@@ -1,19 +1,17 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from car_app.views.schema_views import SchemaView, lazy_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema', SpectacularAPIView.as_view(), name='schema'),
-    path('', SpectacularSwaggerView.as_view(), name='docs'),
-    path('api/schema/redoc/', SpectacularRedocView.as_view(), name='redoc'),
+    path('api/schema', SchemaView.as_view(), name='schema'),
+    path('', lazy_view('drf_spectacular.views.SpectacularSwaggerView'), name='docs'),
+    path('api/schema/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView'), name='redoc'),
 
     path('api/users/', include('car_app.urls.user_urls')),
     path('api/cars/', include('car_app.urls.car_urls')),
     path('api/customers/', include('car_app.urls.customer_urls')),
     path('api/rentals/', include('car_app.urls.rental_urls')),
+    path('api/analytics/', include('car_app.urls.analytics_urls')),
+    path('api/changes/', include('car_app.urls.change_urls')),
 ]
@@ -0,0 +1,120 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, PolymorphicProxySerializer
+
+from car_app.serializers import (
+    FleetReportSerializer,
+    CarDailyRollupSerializer,
+    DashboardSerializer,
+    PaymentDailyRollupSerializer,
+    OccupancyRunsSerializer,
+    OccupancyBitmapSerializer,
+)
+
+PERIOD_PARAMETERS = [
+    OpenApiParameter(
+        name="date_from",
+        type=OpenApiTypes.DATE,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="First day of the period, defaults to the start of the month a year ago.",
+    ),
+    OpenApiParameter(
+        name="date_to",
+        type=OpenApiTypes.DATE,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Last day of the period, defaults to today.",
+    ),
+]
+
+FLEET_ANALYTICS_SCHEMA = extend_schema(
+    summary="Fleet analytics",
+    description="Utilization percentage and revenue per car, rented days, booked revenue and "
+                "completed payments per month and the average rental length for a period. "
+                "Cancelled rentals are not counted. Only accessible by owners.",
+    parameters=PERIOD_PARAMETERS,
+    responses={
+        200: FleetReportSerializer,
+        400: OpenApiResponse(description="Invalid period"),
+        403: OpenApiResponse(description="Not owner"),
+    },
+    tags=["Analytics"],
+)
+
+OWNER_DASHBOARD_SCHEMA = extend_schema(
+    summary="Owner dashboard",
+    description="Rentals per status, number and total amount of payments per status, fleet size with the "
+                "cars available and out today, and today's pickups and returns with their car, customer and "
+                "payment status. Computed in a few aggregate queries and cached briefly; any change to a car, "
+                "rental or payment refreshes it. Only accessible by owners.",
+    responses={
+        200: DashboardSerializer,
+        403: OpenApiResponse(description="Not owner"),
+    },
+    tags=["Analytics"],
+)
+
+FLEET_OCCUPANCY_SCHEMA = extend_schema(
+    summary="Fleet occupancy matrix",
+    description="Which car is booked on which day, for every car of the fleet. With `encoding=rle` every car "
+                "lists its booked days as `[offset, length]` runs counted from `date_from`. With "
+                "`encoding=bitmap` the matrix is one base64 string of `row_bytes` bytes per car, in the order "
+                "of `cars`, bit `i` (least significant first) of a row meaning the car is booked on day `i`. "
+                "Only accessible by owners.",
+    parameters=[
+        OpenApiParameter(
+            name="date_from",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="First day, defaults to today.",
+        ),
+        OpenApiParameter(
+            name="days",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Number of days, 1 to 366, defaults to 90.",
+        ),
+        OpenApiParameter(
+            name="encoding",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            enum=["rle", "bitmap"],
+            description="Response encoding, defaults to `rle`.",
+        ),
+    ],
+    responses={
+        200: PolymorphicProxySerializer(
+            component_name="FleetOccupancy",
+            serializers=[OccupancyRunsSerializer, OccupancyBitmapSerializer],
+            resource_type_field_name="encoding",
+        ),
+        400: OpenApiResponse(description="Invalid parameters"),
+        403: OpenApiResponse(description="Not owner"),
+    },
+    tags=["Analytics"],
+)
+
+CAR_ROLLUPS_SCHEMA = extend_schema(
+    summary="Daily car rollups",
+    description="Booked rentals and the prorated revenue per car and day, as maintained by the "
+                "`update_rollups` job. Filter with `car`, `day_from` and `day_to`. Only accessible by owners.",
+    responses={
+        200: CarDailyRollupSerializer(many=True),
+        403: OpenApiResponse(description="Not owner"),
+    },
+    tags=["Analytics"],
+)
+
+PAYMENT_ROLLUPS_SCHEMA = extend_schema(
+    summary="Daily payment rollups",
+    description="Payment count and amount per day and status, as maintained by the `update_rollups` job. "
+                "Filter with `status`, `day_from` and `day_to`. Only accessible by owners.",
+    responses={
+        200: PaymentDailyRollupSerializer(many=True),
+        403: OpenApiResponse(description="Not owner"),
+    },
+    tags=["Analytics"],
+)
@@ -1,17 +1,23 @@
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiExample, OpenApiParameter
 
-from car_app.serializers import CarSerializer
+from car_app.messages import CAR_NOT_FOUND
+from car_app.serializers import CarSerializer, QuoteRequestSerializer, QuoteSerializer, CalendarSerializer
+from docs.common_docs import SPARSE_FIELDSET_PARAMETERS, CONDITIONAL_GET_PARAMETERS, NOT_MODIFIED_RESPONSE
 
 LIST_CARS_SCHEMA = extend_schema(
     summary="List cars",
-    description="List all cars with filter, search and ordering.",
+    description="List all cars with filter, search and ordering. Cars are listed with a short "
+                "`summary` instead of the full description, which the car details return.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     tags=["Car Management"],
 )
 
 CAR_DETAIL_SCHEMA = extend_schema_view(
     get=extend_schema(
         summary="Get car details",
-        responses={200: CarSerializer},
+        parameters=SPARSE_FIELDSET_PARAMETERS + CONDITIONAL_GET_PARAMETERS,
+        responses={200: CarSerializer, 304: NOT_MODIFIED_RESPONSE},
         tags=["Car Management"],
     ),
     put=extend_schema(
@@ -43,3 +49,60 @@ CAR_DETAIL_SCHEMA = extend_schema_view(
         tags=["Car Management"],
     ),
 )
+
+CAR_QUOTE_SCHEMA = extend_schema(
+    summary="Quote rental prices",
+    description="Prices every listed car for the given date range in one call, "
+                "using seasonal rates and the weekend and long-rental discounts.",
+    request=QuoteRequestSerializer,
+    responses={
+        200: QuoteSerializer(many=True),
+        400: OpenApiResponse(
+            description="Validation error or unknown cars",
+            examples=[
+                OpenApiExample("Unknown car", value={"message": CAR_NOT_FOUND, "cars": [42]}),
+            ],
+        ),
+    },
+    tags=["Car Management"],
+)
+
+CAR_CALENDAR_SCHEMA = extend_schema(
+    summary="Availability calendar",
+    description="Booked days of the listed cars as inclusive `[first, last]` ranges, plus the days on which "
+                "all of them (`all_booked`) or any of them (`any_booked`) are booked. The calendar covers a "
+                "rolling window starting on the first day of the current month.",
+    parameters=[
+        OpenApiParameter(
+            name="cars",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            required=True,
+            description="Comma separated car ids, at most 100.",
+        ),
+        OpenApiParameter(
+            name="date_from",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="First day, defaults to the start of the window.",
+        ),
+        OpenApiParameter(
+            name="date_to",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Last day, defaults to the end of the window.",
+        ),
+    ],
+    responses={
+        200: CalendarSerializer,
+        400: OpenApiResponse(
+            description="Validation error or unknown cars",
+            examples=[
+                OpenApiExample("Unknown car", value={"message": CAR_NOT_FOUND, "cars": [42]}),
+            ],
+        ),
+    },
+    tags=["Car Management"],
+)
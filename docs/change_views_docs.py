@@ -0,0 +1,39 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter, OpenApiResponse
+
+from car_app.messages import CHANGE_FEED_RESYNC
+from car_app.serializers import ChangeFeedSerializer
+
+CHANGE_FEED_SCHEMA = extend_schema(
+    summary="Change feed",
+    description="Cars, rentals and payments created, changed or deleted after the `since` cursor, oldest "
+                "first and at most once per object. Upserts carry the object's current state with relations "
+                "as ids, deletes have `data: null`. Pass the returned `cursor` as the next `since` and keep "
+                "going while `has_more` is true. Start with `since=0` for a full initial sync. Owners see "
+                "every change, customers the cars and their own rentals and payments.",
+    parameters=[
+        OpenApiParameter(
+            name="since",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Cursor returned by the previous call, 0 for an initial sync.",
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Maximum number of changes read, 1 to 1000.",
+        ),
+    ],
+    responses={
+        200: ChangeFeedSerializer,
+        400: OpenApiResponse(description="Invalid cursor or limit"),
+        410: OpenApiResponse(
+            description="Deletions after the cursor were already purged; sync again from `since=0`.",
+            examples=[OpenApiExample("Cursor too old", value={"message": CHANGE_FEED_RESYNC})],
+        ),
+    },
+    tags=["Sync"],
+)
@@ -0,0 +1,38 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Comma separated fields to return, nested fields with dots, e.g. `id,car.brand`.",
+    ),
+    OpenApiParameter(
+        name="expand",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description="Comma separated nested relations to render in full; the others are returned as ids.",
+    ),
+]
+
+CONDITIONAL_GET_PARAMETERS = [
+    OpenApiParameter(
+        name="If-None-Match",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.HEADER,
+        required=False,
+        description="ETag of a previous GET response; the response is 304 if it still matches.",
+    ),
+    OpenApiParameter(
+        name="If-Modified-Since",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.HEADER,
+        required=False,
+        description="HTTP date; the response is 304 if nothing changed since. Ignored with If-None-Match.",
+    ),
+]
+
+NOT_MODIFIED_RESPONSE = OpenApiResponse(description="Not modified since the given ETag or date (GET only)")
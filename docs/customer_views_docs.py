@@ -2,7 +2,8 @@ from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiRespo
 from rest_framework import serializers
 from car_app.messages import *
 
-from car_app.serializers import CustomerSerializer
+from car_app.serializers import CustomerImportResultSerializer, CustomerSerializer
+from docs.common_docs import SPARSE_FIELDSET_PARAMETERS
 
 REGISTER_CUSTOMER_SCHEMA = extend_schema(
     tags=["Authentication"],
@@ -36,9 +37,51 @@ REGISTER_CUSTOMER_SCHEMA = extend_schema(
     },
 )
 
+CUSTOMER_IMPORT_SCHEMA = extend_schema(
+    tags=["Customers"],
+    summary="Import customers from a CSV file",
+    description="Creates a user and a customer for every row of the uploaded CSV file. The header row names "
+                "the columns: `email`, `date_of_birth`, `licence_since`, `licence_expiry_date`, `address`, "
+                "`city`, `country`, `citizenship` and `phone_number`, optionally `first_name`, `last_name` and "
+                "`password` (users without one get an unusable password). The file is imported completely or "
+                "not at all: any invalid row, or an e-mail or phone number that is already registered or "
+                "repeated in the file, rejects the whole file. Passwords are hashed within the request, so "
+                "files are limited to `CUSTOMER_IMPORT_MAX_ROWS` rows (1000) and "
+                "`CUSTOMER_IMPORT_MAX_PASSWORDS` passwords (50); import larger files with "
+                "`manage.py import_customers`. Only accessible by owners.",
+    request={
+        "multipart/form-data": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"],
+        }
+    },
+    responses={
+        201: CustomerImportResultSerializer,
+        400: OpenApiResponse(
+            description=CUSTOMER_IMPORT_INVALID,
+            examples=[
+                OpenApiExample("Invalid rows", value={
+                    "message": CUSTOMER_IMPORT_INVALID,
+                    "errors": [{"row": 3, "errors": {"email": [EMAIL_ALREADY_REGISTERED]}}],
+                }),
+                OpenApiExample("Missing file", value={"message": CUSTOMER_IMPORT_NO_FILE}),
+                OpenApiExample("Too many passwords", value={
+                    "message": CUSTOMER_IMPORT_TOO_MANY_PASSWORDS.format(max_passwords=50),
+                }),
+            ],
+        ),
+        403: OpenApiResponse(description="Not owner"),
+        409: OpenApiResponse(description="An e-mail or phone number was registered while importing"),
+    },
+)
+
 LIST_CUSTOMERS_SCHEMA = extend_schema(
     summary="List customers",
-    description="Retrieves a list of all customers. Only accessible by users with Owner role. Supports filtering, searching, and ordering.",
+    description="Retrieves a list of all customers. Only accessible by users with Owner role. Supports filtering, searching, and ordering. "
+                "`search` terms match the start of words in names and e-mails (anywhere in them on "
+                "PostgreSQL), terms with `@` match e-mail prefixes and digit terms match phone number prefixes.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={200: CustomerSerializer(many=True)},
     tags=["Customers"],
 )
@@ -1,11 +1,33 @@
-from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiResponse, OpenApiExample
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiResponse, OpenApiExample, OpenApiParameter
 from rest_framework import serializers
 from car_app.messages import *
 from car_app.serializers import RentalSerializer, PaymentSerializer
+from docs.common_docs import SPARSE_FIELDSET_PARAMETERS, CONDITIONAL_GET_PARAMETERS, NOT_MODIFIED_RESPONSE
 
 LIST_CUSTOMER_RENTALS = extend_schema(
     tags=["Rentals"],
     summary="List of rentals for an authenticated customer.",
+    description=(
+        "Lists live rentals, then the rentals archived after they ended, with their payment inline. "
+        "`date_from` and `date_to` narrow both."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="date_from",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Only rentals ending on or after this day.",
+        ),
+        OpenApiParameter(
+            name="date_to",
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Only rentals starting on or before this day.",
+        ),
+    ],
     responses={
         200: RentalSerializer(many=True),
         404: OpenApiResponse(
@@ -46,10 +68,29 @@ RentalCreateRequest = inline_serializer(
 CREATE_RENTAL_SCHEMA = extend_schema(
     tags=["Rentals"],
     summary="Create a new rental",
-    description="Creates a new rental for the authenticated customer.",
+    description="Creates a new rental for the authenticated customer. The payment is created as pending "
+                "and charged in the background. Retries carrying the same `Idempotency-Key` header get "
+                "the stored response back instead of booking again.",
     request=RentalCreateRequest,
+    parameters=[
+        OpenApiParameter(
+            name="Idempotency-Key",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.HEADER,
+            required=False,
+            description="Client generated key (max 255 characters) that makes retries of this request safe.",
+        ),
+    ],
     responses={
         201: RentalWithPayment,
+        409: OpenApiResponse(
+            description=IDEMPOTENCY_KEY_IN_USE,
+            examples=[OpenApiExample("Key in use", value={"message": IDEMPOTENCY_KEY_IN_USE})],
+        ),
+        422: OpenApiResponse(
+            description=IDEMPOTENCY_KEY_MISMATCH,
+            examples=[OpenApiExample("Key reused", value={"message": IDEMPOTENCY_KEY_MISMATCH})],
+        ),
         400: OpenApiResponse(
             response=inline_serializer(
                 name="RentalCreationError",
@@ -71,9 +112,11 @@ CREATE_RENTAL_SCHEMA = extend_schema(
 RENTAL_DETAIL_SCHEMA = extend_schema(
     tags=["Rentals"],
     summary="Rental detail",
-    description="Returns the details of a specific rental.",
+    description="Returns the details of a specific rental; archived rentals can be retrieved but not updated.",
+    parameters=CONDITIONAL_GET_PARAMETERS,
     responses={
         200: RentalWithPayment,
+        304: NOT_MODIFIED_RESPONSE,
         404: OpenApiResponse(
             response=inline_serializer(
                 name="RentalNotFound",
@@ -95,7 +138,8 @@ RENTAL_DETAIL_SCHEMA = extend_schema(
 RENTAL_LIST_SCHEMA = extend_schema(
     tags=["Rentals"],
     summary="List rentals for the authenticated owner",
-    description="Returns a list of all rentals in the system.",
+    description="Returns a list of all rentals in the system, archived ones included, ordered by id.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={
         200: RentalSerializer(many=True)
     },
@@ -1,6 +1,7 @@
 from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiResponse, extend_schema_view, OpenApiExample
 from rest_framework import serializers
-from car_app.serializers import UserSerializer
+from car_app.serializers import AvailabilityQuerySerializer, AvailabilitySerializer, UserSerializer
+from docs.common_docs import SPARSE_FIELDSET_PARAMETERS
 from car_app.messages import *
 
 LOGIN_SCHEMA = extend_schema(
@@ -28,6 +29,7 @@ LOGIN_SCHEMA = extend_schema(
 USER_LIST_SCHEMA = extend_schema(
     summary="List users",
     description="Retrieves a list of all users. Only accessible by admin users. Supports filtering, searching, and ordering.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={200: UserSerializer(many=True)},
     tags=["User Management"],
 )
@@ -183,6 +185,27 @@ REGISTER_USER_SCHEMA = extend_schema(
 )
 
 
+AVAILABILITY_SCHEMA = extend_schema(
+    tags=["Authentication"],
+    summary="Check e-mail and phone number availability",
+    description="Tells whether an e-mail or a phone number (or both) can still be registered, for validating "
+                "registration forms as the user types. Only the values passed are reported.",
+    parameters=[AvailabilityQuerySerializer],
+    responses={
+        200: AvailabilitySerializer,
+        400: OpenApiResponse(
+            description=AVAILABILITY_NOTHING_TO_CHECK,
+            examples=[
+                OpenApiExample("Nothing to check", value={"non_field_errors": [AVAILABILITY_NOTHING_TO_CHECK]}),
+            ],
+        ),
+    },
+    examples=[
+        OpenApiExample("E-mail taken", value={"email": False, "phone_number": True}, response_only=True),
+    ],
+)
+
+
 class GoogleTokenSerializer(serializers.Serializer):
     id_token = serializers.CharField(
         help_text="ID token returned by Google Sign-In"
@@ -0,0 +1,156 @@
+"""
+Gunicorn settings for the API.
+
+Every value can be overridden from the environment, so the same image is tuned
+per deployment without rebuilding it:
+
+``GUNICORN_APP``
+    Application to serve, ``car_rental.wsgi:application`` by default, or
+    ``car_rental.asgi:application`` with a uvicorn worker class.
+``GUNICORN_BIND``
+    Address to listen on, ``0.0.0.0:8000`` by default.
+``WEB_CONCURRENCY``
+    Number of worker processes, by default ``2 * CPUs + 1`` capped at
+    ``GUNICORN_MAX_WORKERS`` (8), since each worker holds its own database
+    connections. Without ``REDIS_URL`` every worker has its own local memory
+    cache, and cache invalidations (availability, cached responses, rate
+    limits) would not reach the other workers, so the default is then one
+    worker and more are started only with a warning.
+``GUNICORN_THREADS``
+    Threads per worker, 1 by default. More than one switches gunicorn to the
+    ``gthread`` worker; each thread uses its own database connection.
+``GUNICORN_WORKER_CLASS``
+    Worker class, ``sync`` by default. ``uvicorn.workers.UvicornWorker`` serves
+    the ASGI application, which the live event endpoints need: under WSGI they
+    answer 501 rather than tie up a worker per connected client.
+``GUNICORN_PRELOAD``
+    Import the application in the master before forking (default ``true``),
+    so workers share the imported code copy-on-write and start faster.
+``GUNICORN_MAX_REQUESTS`` / ``GUNICORN_MAX_REQUESTS_JITTER``
+    Recycle a worker after this many requests (1000, plus up to 100) to bound
+    slow memory growth; 0 disables recycling.
+``GUNICORN_TIMEOUT``, ``GUNICORN_GRACEFUL_TIMEOUT``, ``GUNICORN_KEEPALIVE``
+    Worker timeouts in seconds.
+``STATSD_HOST``
+    ``host:port`` of a StatsD daemon for gunicorn's request metrics.
+``GUNICORN_STATS_DIR``
+    Directory where every worker keeps a JSON file with its own request
+    count, latency and memory figures (see :func:`post_request`).
+"""
+import json
+import multiprocessing
+import os
+import resource
+import threading
+import time
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_bool(name, default):
+    value = os.getenv(name)
+    return value.lower() in ('1', 'true', 'yes') if value else default
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+shared_cache = bool(os.getenv('REDIS_URL'))
+default_workers = min(multiprocessing.cpu_count() * 2 + 1, env_int('GUNICORN_MAX_WORKERS', 8)) if shared_cache else 1
+workers = env_int('WEB_CONCURRENCY', default_workers)
+threads = env_int('GUNICORN_THREADS', 1)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+asgi = worker_class.startswith('uvicorn.')
+wsgi_app = os.getenv('GUNICORN_APP', 'car_rental.asgi:application' if asgi else 'car_rental.wsgi:application')
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+if os.getenv('STATSD_HOST'):
+    statsd_host = os.environ['STATSD_HOST']
+    statsd_prefix = os.getenv('STATSD_PREFIX', 'car_rental')
+
+stats_dir = os.getenv('GUNICORN_STATS_DIR')
+STATS_EVERY = env_int('GUNICORN_STATS_EVERY', 100)
+
+
+def on_starting(server):
+    if workers > 1 and not shared_cache:
+        server.log.warning("Starting %s workers without REDIS_URL: each worker caches on its own and misses "
+                           "the others' invalidations, serving stale availability and responses. "
+                           "Set REDIS_URL or WEB_CONCURRENCY=1.", workers)
+
+
+def post_fork(server, worker):
+    """
+    Drops anything the master opened while preloading, so workers never share a socket.
+    """
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+    worker.stats_lock = threading.Lock()
+    worker.stats = {
+        'pid': worker.pid,
+        'started': time.time(),
+        'requests': 0,
+        'errors': 0,
+        'busy_seconds': 0.0,
+        'max_seconds': 0.0,
+    }
+
+
+def pre_request(worker, req):
+    req.started = time.perf_counter()
+
+
+def post_request(worker, req, environ, resp):
+    """
+    Updates the worker's request statistics and writes them out every ``STATS_EVERY`` requests.
+    """
+    stats = getattr(worker, 'stats', None)
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - getattr(req, 'started', time.perf_counter())
+    with worker.stats_lock:
+        stats['requests'] += 1
+        stats['busy_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        if resp is not None and resp.status_code and resp.status_code >= 500:
+            stats['errors'] += 1
+        due = stats['requests'] % STATS_EVERY == 0
+    if due:
+        write_stats(worker)
+
+
+def worker_exit(server, worker):
+    if getattr(worker, 'stats', None) is not None:
+        write_stats(worker)
+
+
+def write_stats(worker):
+    """
+    Logs the worker's statistics and saves them to ``GUNICORN_STATS_DIR/<pid>.json``.
+    """
+    with worker.stats_lock:
+        stats = dict(worker.stats)
+    stats['uptime_seconds'] = round(time.time() - stats['started'], 1)
+    stats['mean_ms'] = round(stats['busy_seconds'] * 1000 / stats['requests'], 2) if stats['requests'] else 0.0
+    stats['max_ms'] = round(stats['max_seconds'] * 1000, 2)
+    # ru_maxrss is in kilobytes on Linux.
+    stats['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    worker.log.info("worker %(pid)s: %(requests)s requests, %(errors)s errors, mean %(mean_ms)s ms, "
+                    "max %(max_ms)s ms, max rss %(max_rss_mb)s MB", stats)
+    if stats_dir:
+        os.makedirs(stats_dir, exist_ok=True)
+        path = os.path.join(stats_dir, f"{worker.pid}.json")
+        with open(path + '.tmp', 'w') as file:
+            json.dump(stats, file)
+        os.replace(path + '.tmp', path)
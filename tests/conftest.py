@@ -0,0 +1,70 @@
+import pytest
+from django.core.cache import cache
+from datetime import date
+from decimal import Decimal
+from rest_framework.test import APIRequestFactory
+from car_app.models import User, Customer, Car
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cache entries must not leak between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def factory():
+    return APIRequestFactory()
+
+
+@pytest.fixture
+def owner_user(db):
+    """A user flagged as owner"""
+    return User.objects.create_user(
+        email="owner@example.com",
+        password="password",
+        is_owner=True,
+    )
+
+
+@pytest.fixture
+def customer_user(db):
+    """Regular authenticated user"""
+    return User.objects.create_user(
+        email="customer@example.com",
+        password="password",
+        is_owner=False,
+    )
+
+
+@pytest.fixture
+def customer(db, customer_user):
+    """Customer profile associated with the user"""
+    return Customer.objects.create(
+        user=customer_user,
+        date_of_birth=date(1990, 1, 1),
+        licence_since=date(2010, 1, 1),
+        licence_expiry_date=date(2030, 1, 1),
+        address="Złota 44",
+        city="Warsaw",
+        country="Poland",
+        citizenship="polish",
+        phone_number="+48123456789",
+    )
+
+
+@pytest.fixture
+def car(db):
+    """Car object for testing"""
+    return Car.objects.create(
+        brand="Toyota",
+        model="Corolla",
+        description="Compact sedan",
+        production_year=2020,
+        mileage=10_000,
+        vin="1HGCM82633A004352",
+        daily_rate=Decimal("100.00"),
+        availability=True,
+    )
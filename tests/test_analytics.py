@@ -0,0 +1,105 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from rest_framework.test import force_authenticate
+from car_app.analytics import dashboard, fleet_report, month_series
+from car_app.models import Payment, Rental
+from car_app.payments import transition
+from car_app.views.analytics_views import FleetAnalyticsView, OwnerDashboardView
+
+
+def test_month_series_clips_to_range():
+    assert month_series(date(2024, 1, 15), date(2024, 3, 10)) == [
+        (date(2024, 1, 1), date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+
+
+@pytest.mark.django_db
+def test_fleet_report_clips_rentals_to_periods(customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 1, 30), end_date=date(2024, 2, 3),
+        total_cost=Decimal("500.00"), status="confirmed",
+    )
+    Payment.objects.create(rental=rental, amount=Decimal("500.00"), status="completed")
+    Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 2, 10), end_date=date(2024, 2, 12),
+        total_cost=Decimal("300.00"), status="cancelled",
+    )
+
+    report = fleet_report(date(2024, 1, 1), date(2024, 2, 29))
+
+    assert report["average_rental_days"] == 5
+    assert report["cars"][0]["rented_days"] == 5
+    assert report["cars"][0]["utilization"] == round(5 * 100 / 60, 2)
+    assert [m["rented_days"] for m in report["months"]] == [2, 3]
+    assert [m["booked_revenue"] for m in report["months"]] == [Decimal("500.00"), Decimal("0")]
+
+
+@pytest.mark.django_db
+def test_fleet_analytics_view_is_owner_only(factory, owner_user, customer_user):
+    request = factory.get("/api/analytics/fleet/", {"date_from": "2024-01-01", "date_to": "2024-03-31"})
+    force_authenticate(request, user=customer_user)
+    assert FleetAnalyticsView.as_view()(request).status_code == 403
+
+    request = factory.get("/api/analytics/fleet/", {"date_from": "2024-01-01", "date_to": "2024-03-31"})
+    force_authenticate(request, user=owner_user)
+    response = FleetAnalyticsView.as_view()(request)
+    assert response.status_code == 200
+    assert len(response.data["months"]) == 3
+
+
+@pytest.mark.django_db
+def test_dashboard_counts_in_four_queries(customer, car, django_assert_num_queries):
+    today = date(2024, 5, 10)
+    out = Rental.objects.create(
+        customer=customer, car=car, start_date=today, end_date=today + timedelta(days=2),
+        total_cost=Decimal("300.00"), status="confirmed",
+    )
+    Payment.objects.create(rental=out, amount=Decimal("300.00"), status="completed")
+    Rental.objects.create(
+        customer=customer, car=car, start_date=today - timedelta(days=3), end_date=today,
+        total_cost=Decimal("400.00"), status="pending",
+    )
+    Rental.objects.create(
+        customer=customer, car=car, start_date=today, end_date=today, total_cost=Decimal("100.00"), status="cancelled",
+    )
+
+    with django_assert_num_queries(4):
+        report = dashboard(today)
+
+    assert report["rentals"] == {"pending": 1, "confirmed": 1, "cancelled": 1}
+    assert report["payments"]["completed"] == {"count": 1, "amount": Decimal("300.00")}
+    assert report["payments"]["failed"] == {"count": 0, "amount": Decimal("0")}
+    assert report["fleet"] == {"cars": 1, "available": 1, "out": 1}
+    assert [row["id"] for row in report["pickups_today"]] == [out.pk]
+    assert report["pickups_today"][0]["payment_status"] == "completed"
+    assert [row["status"] for row in report["returns_today"]] == ["pending"]
+
+
+@pytest.mark.django_db
+def test_dashboard_view_is_cached_until_a_payment_changes(factory, owner_user, customer, car,
+                                                          django_assert_num_queries, django_capture_on_commit_callbacks):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date.today(), end_date=date.today(),
+        total_cost=Decimal("100.00"), status="pending",
+    )
+    payment = Payment.objects.create(rental=rental, amount=Decimal("100.00"))
+
+    def get(user=owner_user):
+        request = factory.get("/api/analytics/dashboard/")
+        force_authenticate(request, user=user)
+        return OwnerDashboardView.as_view()(request)
+
+    assert get(customer.user).status_code == 403
+    assert get().data["payments"]["pending"]["count"] == 1
+    with django_assert_num_queries(0):
+        assert get().data["pickups_today"][0]["payment_status"] == "pending"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        transition(payment, "completed")
+
+    response = get()
+    assert response.data["payments"]["completed"]["count"] == 1
+    assert response.data["pickups_today"][0]["payment_status"] == "completed"
@@ -0,0 +1,139 @@
+import pytest
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from django.core.management import call_command
+from rest_framework.test import force_authenticate
+from car_app.archive import archive_rentals
+from django.utils import timezone
+from car_app.analytics import fleet_report
+from car_app.models import ArchivedRental, CarDailyRollup, ChangeLogEntry, Payment, PaymentDailyRollup, Rental
+from car_app.rollups import refresh_car_days, refresh_since
+from car_app.views.rental_views import CustomerRentalListView, RentalDetailView, RentalListView
+
+
+def book(customer, car, start, end, status="confirmed"):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=start, end_date=end, total_cost=Decimal("200.00"), status=status
+    )
+    Payment.objects.create(rental=rental, amount=Decimal("200.00"), status="completed", provider_reference="ref")
+    return rental
+
+
+@pytest.mark.django_db
+def test_archive_moves_only_finished_rentals_with_their_payment(customer, car):
+    old = book(customer, car, date(2020, 1, 1), date(2020, 1, 2))
+    old_pending = book(customer, car, date(2020, 2, 1), date(2020, 2, 2), status="pending")
+    recent = book(customer, car, date(2024, 1, 1), date(2024, 1, 2))
+
+    result = archive_rentals(date(2023, 1, 1), batch_size=1)
+
+    assert (result.rentals, result.batches) == (1, 1)
+    assert set(Rental.objects.values_list("pk", flat=True)) == {old_pending.pk, recent.pk}
+    assert not Payment.objects.filter(rental_id=old.pk).exists()
+    archived = ArchivedRental.objects.get()
+    assert (archived.pk, archived.payment_status, archived.provider_reference) == (old.pk, "completed", "ref")
+
+
+@pytest.mark.django_db
+def test_archive_logs_tombstones_per_batch(customer, car, django_assert_max_num_queries):
+    rentals = [book(customer, car, date(2020, 1, day), date(2020, 1, day + 1)) for day in range(1, 20, 2)]
+    ChangeLogEntry.objects.all().delete()
+
+    with django_assert_max_num_queries(20):
+        archive_rentals(date(2023, 1, 1))
+
+    tombstones = ChangeLogEntry.objects.filter(action="delete")
+    assert set(tombstones.filter(model="rental").values_list("object_id", "customer_id")) == {
+        (rental.pk, customer.pk) for rental in rentals
+    }
+    assert tombstones.filter(model="payment", customer_id=customer.pk).count() == len(rentals)
+    assert ChangeLogEntry.objects.count() == 2 * len(rentals)
+
+
+@pytest.mark.django_db
+def test_history_reaches_archive_only_for_old_periods(customer, car):
+    book(customer, car, date(2020, 1, 1), date(2020, 1, 2))
+    book(customer, car, date(2024, 1, 1), date(2024, 1, 2))
+    call_command("archive_rentals", "--older-than-days", "365")
+
+    recent = Rental.objects.history("start_date", date_from=date(2024, 1, 1), car_id=car.pk)
+    assert list(recent) == [(date(2024, 1, 1),)]
+    everything = Rental.objects.history("start_date", date_from=date(2019, 1, 1), car_id=car.pk)
+    assert sorted(everything) == [(date(2020, 1, 1),), (date(2024, 1, 1),)]
+
+    refresh_car_days(car.pk, date(2020, 1, 1), date(2020, 1, 2))
+    assert CarDailyRollup.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_customer_history_includes_archive_on_request(factory, customer, car):
+    book(customer, car, date(2020, 1, 1), date(2020, 1, 2))
+    book(customer, car, date(2024, 1, 1), date(2024, 1, 2))
+    archive_rentals(date(2023, 1, 1))
+    view = CustomerRentalListView.as_view()
+
+    request = factory.get("/api/rentals/my-rentals/")
+    force_authenticate(request, user=customer.user)
+    rows = view(request).data
+    assert [row["start_date"] for row in rows] == ["2024-01-01", "2020-01-01"]
+    assert rows[1]["payment"]["status"] == "completed"
+
+    request = factory.get("/api/rentals/my-rentals/", {"date_from": "2023-01-01"})
+    force_authenticate(request, user=customer.user)
+    assert [row["start_date"] for row in view(request).data] == ["2024-01-01"]
+
+
+@pytest.mark.django_db
+def test_owner_views_include_archived_rentals(factory, owner_user, customer, car):
+    old = book(customer, car, date(2020, 1, 1), date(2020, 1, 2))
+    recent = book(customer, car, date(2024, 1, 1), date(2024, 1, 2))
+    archive_rentals(date(2023, 1, 1))
+
+    request = factory.get("/api/rentals/")
+    force_authenticate(request, user=owner_user)
+    data = RentalListView.as_view()(request).data
+    assert data["count"] == 2
+    assert [row["id"] for row in data["results"]] == [old.pk, recent.pk]
+    assert data["results"][0]["payment"]["status"] == "completed"
+
+    request = factory.get("/api/rentals/", {"page": 2})
+    force_authenticate(request, user=owner_user)
+    assert RentalListView.as_view()(request).status_code == 404
+
+    request = factory.get(f"/api/rentals/{old.pk}/")
+    force_authenticate(request, user=owner_user)
+    response = RentalDetailView.as_view()(request, pk=old.pk)
+    assert response.status_code == 200
+    assert (response.data["id"], response.data["payment"]["status"]) == (old.pk, "completed")
+
+    request = factory.get("/api/rentals/999/")
+    force_authenticate(request, user=owner_user)
+    assert RentalDetailView.as_view()(request, pk=999).status_code == 404
+
+
+@pytest.mark.django_db
+def test_reports_and_rollup_rebuild_include_archived_rentals(customer, car):
+    old = book(customer, car, date(2020, 1, 1), date(2020, 1, 4))
+    Payment.objects.filter(rental=old).update(payment_date=timezone.make_aware(datetime(2020, 1, 1, 12)))
+    book(customer, car, date(2024, 1, 1), date(2024, 1, 2))
+    refresh_since(None)
+    before = fleet_report(date(2019, 6, 1), date(2020, 6, 1))
+    rollups = (list(CarDailyRollup.objects.order_by("day").values_list("day", "revenue")),
+               list(PaymentDailyRollup.objects.order_by("day").values_list("day", "status", "count", "amount")))
+
+    archive_rentals(date(2023, 1, 1))
+    assert not Rental.objects.filter(pk=old.pk).exists()
+
+    after = fleet_report(date(2019, 6, 1), date(2020, 6, 1))
+    assert after == before
+    assert after["cars"][0]["revenue"] == Decimal("200.00")
+    assert after["cars"][0]["rented_days"] == 4
+    assert after["average_rental_days"] == 4.0
+    january = next(month for month in after["months"] if month["month"] == date(2020, 1, 1))
+    assert (january["booked_revenue"], january["payments"]) == (Decimal("200.00"), Decimal("200.00"))
+
+    refresh_since(None)
+    assert (list(CarDailyRollup.objects.order_by("day").values_list("day", "revenue")),
+            list(PaymentDailyRollup.objects.order_by("day").values_list("day", "status", "count", "amount"))) == rollups
+    assert (date(2020, 1, 1), "completed", 1, Decimal("200.00")) in rollups[1]
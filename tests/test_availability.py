@@ -0,0 +1,102 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from car_app import availability
+from car_app.models import Car, Rental
+from car_app.views.car_views import CarCalendarView
+
+
+def days(n):
+    return availability.window()[0] + timedelta(days=n)
+
+
+def book(customer, car, first, last, status="confirmed"):
+    return Rental.objects.create(
+        customer=customer, car=car, start_date=first, end_date=last, total_cost=Decimal("100.00"), status=status
+    )
+
+
+@pytest.fixture
+def other_car(db):
+    return Car.objects.create(
+        brand="Skoda", model="Octavia", description="Estate", production_year=2021, mileage=5_000,
+        vin="TMBJJ7NE8L0123456", daily_rate=Decimal("90.00"), availability=True,
+    )
+
+
+def test_ranges_finds_runs_of_booked_days():
+    start = date(2024, 1, 1)
+    bits = 0b0111_0010
+    assert availability.ranges(bits, start, start, start + timedelta(days=30)) == [
+        (date(2024, 1, 2), date(2024, 1, 2)),
+        (date(2024, 1, 5), date(2024, 1, 7)),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cached_bitmap_follows_rental_changes(customer, car, django_assert_num_queries):
+    rental = book(customer, car, days(2), days(4))
+    availability.bitmaps([car.pk])
+
+    with django_assert_num_queries(0):
+        assert availability.bitmaps([car.pk]) == {car.pk: 0b11100}
+
+    book(customer, car, days(10), days(10))
+    assert availability.bitmaps([car.pk]) == {car.pk: 0b100_0001_1100}
+
+    rental = Rental.objects.get(pk=rental.pk)
+    rental.start_date, rental.end_date = days(3), days(3)
+    rental.save()
+    assert availability.bitmaps([car.pk]) == {car.pk: 0b100_0000_1000}
+
+    rental.status = "cancelled"
+    rental.save()
+    Rental.objects.filter(start_date=days(10)).delete()
+    assert availability.bitmaps([car.pk]) == {car.pk: 0}
+
+
+@pytest.mark.django_db
+def test_bitmap_built_before_a_booking_is_never_served(customer, car):
+    version = availability.versions([car.pk])[car.pk]
+    stale = availability._to_bytes(0)
+    book(customer, car, days(2), days(2))
+    availability.invalidate(car.pk)
+    # A reader that queried before the booking committed stores its bitmap late.
+    cache.set(availability._cache_key(car.pk, days(0), version), stale)
+
+    assert availability.bitmaps([car.pk]) == {car.pk: 0b100}
+
+
+@pytest.mark.django_db
+def test_evicted_version_does_not_revive_old_bitmaps(customer, car):
+    availability.bitmaps([car.pk])
+    availability.invalidate(car.pk)
+    book(customer, car, days(1), days(1))
+    cache.delete(availability._version_key(car.pk))
+
+    assert availability.bitmaps([car.pk]) == {car.pk: 0b10}
+
+
+@pytest.mark.django_db
+def test_calendar_endpoint_combines_cars(factory, customer, car, other_car):
+    book(customer, car, days(1), days(5))
+    book(customer, other_car, days(4), days(8))
+    book(customer, other_car, days(20), days(21), status="cancelled")
+
+    request = factory.get("/api/cars/calendar/", {"cars": f"{car.pk},{other_car.pk}", "date_to": days(30)})
+    data = CarCalendarView.as_view()(request).data
+
+    assert data["cars"][1]["booked"] == [[days(4).isoformat(), days(8).isoformat()]]
+    assert data["all_booked"] == [[days(4).isoformat(), days(5).isoformat()]]
+    assert data["any_booked"] == [[days(1).isoformat(), days(8).isoformat()]]
+    version = availability.versions([car.pk])[car.pk]
+    assert cache.get(f"availability:{car.pk}:{days(0).isoformat()}:{version}") is not None
+
+
+@pytest.mark.django_db
+def test_calendar_endpoint_rejects_unknown_cars_and_dates_outside_window(factory, car):
+    view = CarCalendarView.as_view()
+    assert view(factory.get("/api/cars/calendar/", {"cars": "999"})).status_code == 400
+    request = factory.get("/api/cars/calendar/", {"cars": str(car.pk), "date_from": days(-1)})
+    assert view(request).status_code == 400
@@ -0,0 +1,103 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+from car_app import changefeed
+from car_app.models import ChangeLogEntry, Payment, Rental
+from car_app.payments import process_payment
+from car_app.views.change_views import ChangeFeedView
+
+
+def feed(factory, user, **params):
+    request = factory.get("/api/changes/", params)
+    force_authenticate(request, user=user)
+    return ChangeFeedView.as_view()(request)
+
+
+@pytest.mark.django_db
+def test_feed_returns_latest_state_once_per_object(factory, owner_user, customer, car,
+                                                   django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        rental = Rental.objects.create(
+            customer=customer, car=car, start_date=date(2024, 1, 1), end_date=date(2024, 1, 2),
+            total_cost=Decimal("200.00"),
+        )
+        payment = Payment.objects.create(rental=rental, amount=Decimal("200.00"))
+        process_payment(payment.pk)
+
+    data = feed(factory, owner_user).data
+    assert [(c["model"], c["action"]) for c in data["changes"]] == [("car", "upsert"), ("payment", "upsert"),
+                                                                    ("rental", "upsert")]
+    assert data["changes"][2]["data"]["status"] == "confirmed"
+    assert data["changes"][2]["data"]["car"] == car.pk
+
+    cursor = data["cursor"]
+    assert feed(factory, owner_user, since=cursor).data["changes"] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        car.delete()
+    changes = feed(factory, owner_user, since=cursor).data["changes"]
+    assert {(c["model"], c["action"], c["data"]) for c in changes} == {
+        ("car", "delete", None), ("rental", "delete", None), ("payment", "delete", None),
+    }
+
+
+@pytest.mark.django_db
+def test_customers_only_see_their_own_rentals(factory, owner_user, customer, car,
+                                              django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Rental.objects.create(
+            customer=customer, car=car, start_date=date(2024, 1, 1), end_date=date(2024, 1, 2),
+            total_cost=Decimal("200.00"),
+        )
+    assert [c["model"] for c in feed(factory, customer.user).data["changes"]] == ["car", "rental"]
+    assert [c["model"] for c in feed(factory, owner_user).data["changes"]] == ["car", "rental"]
+
+    other_user = type(owner_user).objects.create_user(email="other@example.com", password="password")
+    assert [c["model"] for c in feed(factory, other_user).data["changes"]] == ["car"]
+
+
+@pytest.mark.django_db
+def test_compaction_keeps_latest_entry_and_expires_old_cursors(factory, owner_user, car):
+    for mileage in range(3):
+        car.mileage = mileage
+        car.save()
+    car.delete()
+    ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=60))
+    changefeed.sequence()
+    cursor = ChangeLogEntry.objects.order_by("position").first().position
+
+    assert changefeed.compact() == (4, 1)
+    assert not ChangeLogEntry.objects.exists()
+    assert feed(factory, owner_user, since=cursor).status_code == 410
+    assert feed(factory, owner_user, since=0).status_code == 200
+
+
+@pytest.mark.django_db
+def test_entry_committed_late_is_served_after_the_cursor(factory, owner_user, car):
+    car.mileage = 1
+    car.save()
+    changefeed.sequence()
+    cursor = feed(factory, owner_user).data["cursor"]
+    # An entry numbered by the database before the others but committed after the client read the feed.
+    late = ChangeLogEntry.objects.order_by("pk").first()
+    ChangeLogEntry.objects.filter(pk=late.pk).update(position=None)
+    changefeed.sequence()
+
+    changes = feed(factory, owner_user, since=cursor).data["changes"]
+    assert [(c["model"], c["id"]) for c in changes] == [("car", car.pk)]
+    assert changes[0]["seq"] > cursor
+
+
+@pytest.mark.django_db
+def test_reading_the_feed_only_serves_sequenced_entries_and_writes_nothing(factory, owner_user, car):
+    with CaptureQueriesContext(connection) as queries:
+        assert feed(factory, owner_user).data["changes"] == []
+    assert all(query["sql"].startswith("SELECT") for query in queries.captured_queries)
+    assert not ChangeLogEntry.objects.filter(position__isnull=False).exists()
+
+    changefeed.sequence()
+    assert [c["model"] for c in feed(factory, owner_user).data["changes"]] == ["car"]
@@ -0,0 +1,140 @@
+import gzip
+import pytest
+from decimal import Decimal
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from car_app import compression, response_cache
+from car_app.middleware import CompressionMiddleware
+from car_app.models import Car
+from car_app.views.car_views import CarListView
+
+BODY = b'{"description": "' + b"Well maintained compact sedan. " * 100 + b'"}'
+
+
+def respond(response, accept_encoding="gzip"):
+    request = RequestFactory().get("/api/cars/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def json_response(body=BODY, **headers):
+    return HttpResponse(body, content_type="application/json", headers=headers)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "zstd"),
+    ("identity", None),
+    ("gzip;q=0", None),
+])
+def test_negotiate_honours_quality_values(header, expected, settings):
+    settings.COMPRESSION = {"ENCODINGS": ["zstd", "br", "gzip"]}
+    if expected not in (None, *compression.available_encodings()):
+        pytest.skip(f"{expected} is not installed")
+
+    assert compression.negotiate(header) == expected
+
+
+def test_middleware_compresses_large_bodies_only():
+    response = respond(json_response())
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content) < len(BODY)
+    assert gzip.decompress(response.content) == BODY
+
+    assert not respond(json_response(b'{"id": 1}')).has_header("Content-Encoding")
+    assert not respond(json_response(), accept_encoding="").has_header("Content-Encoding")
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_middleware_uses_optional_encodings(encoding):
+    if encoding not in compression.available_encodings():
+        pytest.skip(f"{encoding} is not installed")
+    decompress = {"br": lambda data: compression.brotli.decompress(data),
+                  "zstd": lambda data: compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)}
+
+    response = respond(json_response(), accept_encoding=encoding)
+
+    assert response["Content-Encoding"] == encoding
+    assert decompress[encoding](response.content) == BODY
+
+
+def test_middleware_weakens_etags():
+    response = respond(json_response(ETag='"abc"'))
+
+    assert response["ETag"] == 'W/"abc"'
+
+
+def test_middleware_compresses_streams_but_not_event_streams():
+    chunks = [b"car;%d;Toyota;Corolla\n" % i for i in range(1000)]
+
+    response = respond(StreamingHttpResponse(iter(chunks), content_type="text/csv"))
+
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)) == b"".join(chunks)
+
+    events = respond(StreamingHttpResponse(iter(chunks), content_type="text/event-stream"))
+    assert not events.has_header("Content-Encoding")
+
+
+def test_middleware_serves_precompressed_variants(monkeypatch):
+    response = json_response()
+    response.precompressed = {"gzip": gzip.compress(BODY)}
+    monkeypatch.setattr(compression, "compress", lambda data, encoding: pytest.fail("compressed again"))
+
+    response = respond(response)
+
+    assert gzip.decompress(response.content) == BODY
+
+
+@pytest.mark.django_db
+def test_car_list_hits_are_served_from_the_catalog_cache(factory, car, django_assert_num_queries, monkeypatch,
+                                                         settings):
+    settings.COMPRESSION = {"MIN_SIZE": 100}
+    view = CarListView.as_view()
+    first = view(factory.get("/api/cars/", {"ordering": "daily_rate"}))
+    first.render()
+
+    monkeypatch.setattr(compression, "compress", lambda data, encoding: pytest.fail("compressed again"))
+    with django_assert_num_queries(0):
+        hit = view(factory.get("/api/cars/", {"ordering": "daily_rate"}))
+        hit.render()
+
+    assert hit.content == first.content
+    assert hit["Content-Type"] == first["Content-Type"]
+    assert hit.data == first.data
+    assert "gzip" in hit.precompressed
+
+    monkeypatch.undo()
+    msgpack = view(factory.get("/api/cars/", {"ordering": "daily_rate"}, HTTP_ACCEPT="application/msgpack"))
+    assert msgpack["Content-Type"] == "application/msgpack"
+
+
+@pytest.mark.django_db
+def test_car_changes_invalidate_the_catalog_cache(factory, car, django_capture_on_commit_callbacks):
+    view = CarListView.as_view()
+    assert view(factory.get("/api/cars/")).data["count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Car.objects.create(
+            brand="Skoda", model="Octavia", description="Estate", production_year=2021, mileage=5_000,
+            vin="TMBJJ7NE8L0000001", daily_rate=Decimal("80.00"),
+        )
+
+    assert view(factory.get("/api/cars/")).data["count"] == 2
+
+
+@pytest.mark.django_db
+def test_evicted_version_does_not_revive_old_responses(factory, car):
+    view = CarListView.as_view()
+    assert view(factory.get("/api/cars/")).data["count"] == 1
+    Car.objects.create(
+        brand="Skoda", model="Octavia", description="Estate", production_year=2021, mileage=5_000,
+        vin="TMBJJ7NE8L0000001", daily_rate=Decimal("80.00"),
+    )
+    cache.delete(response_cache._version_key("catalog"))
+
+    assert view(factory.get("/api/cars/")).data["count"] == 2
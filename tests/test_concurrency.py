@@ -0,0 +1,116 @@
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection, connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from car_app.models import Car, Rental
+from car_app.views.car_views import CarCalendarView, CarDetailView, CarListView
+from car_app.views.rental_views import RentalCreateView
+
+THREADS = 8
+ROUNDS = 25
+
+BRANDS = ["Toyota", "Skoda", "Ford", "Audi"]
+
+
+def hammer(func, jobs):
+    """
+    Runs ``func(job)`` for every job on a pool of threads, each with its own database connection.
+    """
+    barrier = threading.Barrier(THREADS)
+
+    def run(chunk):
+        barrier.wait()
+        try:
+            return [func(job) for job in chunk]
+        finally:
+            connections.close_all()
+
+    chunks = [jobs[i::THREADS] for i in range(THREADS)]
+    with ThreadPoolExecutor(THREADS) as pool:
+        return [result for chunk in pool.map(run, chunks) for result in chunk]
+
+
+@pytest.fixture
+def fleet(db):
+    return [
+        Car.objects.create(
+            brand=brand, model=f"Model {i}", description="Car", production_year=2020, mileage=1_000,
+            vin=f"VIN{i:014d}", daily_rate=Decimal("50.00"), availability=True,
+        )
+        for i, brand in enumerate(BRANDS * 2)
+    ]
+
+
+@pytest.fixture
+def no_throttles(monkeypatch):
+    monkeypatch.setattr(APIView, "get_throttles", lambda self: [])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_brand_filter_does_not_leak_between_threads(fleet, no_throttles):
+    factory = APIRequestFactory()
+
+    def list_brand(brand):
+        response = CarListView.as_view()(factory.get("/api/cars/", {"brand": brand}))
+        return brand, response.status_code, {car["brand"] for car in response.data["results"]}
+
+    results = hammer(list_brand, BRANDS * (THREADS * ROUNDS // len(BRANDS)))
+
+    assert len(results) == THREADS * ROUNDS
+    for brand, status, seen in results:
+        assert status == 200
+        assert seen == {brand}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_brand_choices_follow_the_fleet(fleet, no_throttles):
+    factory = APIRequestFactory()
+    assert CarListView.as_view()(factory.get("/api/cars/", {"brand": "Volvo"})).status_code == 400
+
+    Car.objects.create(
+        brand="Volvo", model="V60", description="Car", production_year=2020, mileage=1_000,
+        vin="VIN99999999999999", daily_rate=Decimal("50.00"),
+    )
+    response = CarListView.as_view()(factory.get("/api/cars/", {"brand": "Volvo"}))
+    assert response.status_code == 200
+    assert [car["model"] for car in response.data["results"]] == ["V60"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_endpoints_under_concurrent_load(fleet, no_throttles):
+    factory = APIRequestFactory()
+    car_ids = [car.pk for car in fleet]
+    calls = [
+        lambda i: CarListView.as_view()(factory.get("/api/cars/", {"ordering": "daily_rate"})),
+        lambda i: CarDetailView.as_view()(factory.get("/api/cars/car/"), pk=car_ids[i % len(car_ids)]),
+        lambda i: CarCalendarView.as_view()(factory.get("/api/cars/calendar/", {"cars": ",".join(map(str, car_ids))})),
+    ]
+
+    statuses = hammer(lambda i: calls[i % len(calls)](i).status_code, list(range(THREADS * ROUNDS)))
+
+    assert statuses == [200] * (THREADS * ROUNDS)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="SQLite ignores SELECT ... FOR UPDATE")
+def test_concurrent_bookings_of_one_car_book_it_once(customer, car):
+    factory = APIRequestFactory()
+    start = date.today() + timedelta(days=30)
+
+    def book(i):
+        request = factory.post("/api/rentals/create/", {
+            "car": car.pk,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=2 + i % 3)).isoformat(),
+        }, format="json")
+        force_authenticate(request, user=customer.user)
+        return RentalCreateView.as_view()(request).status_code
+
+    statuses = hammer(book, list(range(THREADS)))
+
+    assert statuses.count(201) == 1
+    assert Rental.objects.filter(car=car).count() == 1
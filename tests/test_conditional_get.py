@@ -0,0 +1,59 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework.test import force_authenticate
+from car_app.models import Payment, Rental
+from car_app.payments import transition
+from car_app.views.car_views import CarDetailView
+from car_app.views.rental_views import RentalDetailView
+
+
+@pytest.mark.django_db
+def test_car_detail_answers_if_none_match_without_loading_the_car(factory, car, django_assert_num_queries):
+    view = CarDetailView.as_view()
+    response = view(factory.get(f"/api/cars/car/{car.pk}/"), pk=car.pk)
+    etag = response["ETag"]
+    assert response.status_code == 200 and response["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        response = view(factory.get(f"/api/cars/car/{car.pk}/", HTTP_IF_NONE_MATCH=etag), pk=car.pk)
+    assert response.status_code == 304
+
+    response = view(factory.get(f"/api/cars/car/{car.pk}/", {"fields": "id"}, HTTP_IF_NONE_MATCH=etag), pk=car.pk)
+    assert response.status_code == 200
+
+    car.mileage += 1
+    car.save()
+    response = view(factory.get(f"/api/cars/car/{car.pk}/", HTTP_IF_NONE_MATCH=etag), pk=car.pk)
+    assert response.status_code == 200 and response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_rental_detail_changes_with_its_payment(factory, owner_user, customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 1, 1), end_date=date(2024, 1, 2),
+        total_cost=Decimal("200.00"),
+    )
+    payment = Payment.objects.create(rental=rental, amount=Decimal("200.00"))
+    view = RentalDetailView.as_view()
+
+    def get(**headers):
+        request = factory.get(f"/api/rentals/{rental.pk}/", **headers)
+        force_authenticate(request, user=owner_user)
+        return view(request, pk=rental.pk)
+
+    first = get()
+    assert get(HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 304
+
+    transition(payment, "completed")
+    assert get(HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_car_detail_accepts_the_weakened_etag_of_a_compressed_response(factory, car):
+    view = CarDetailView.as_view()
+    etag = view(factory.get(f"/api/cars/car/{car.pk}/"), pk=car.pk)["ETag"]
+
+    response = view(factory.get(f"/api/cars/car/{car.pk}/", HTTP_IF_NONE_MATCH=f"W/{etag}"), pk=car.pk)
+
+    assert response.status_code == 304
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory
+from car_app import broker as broker_module
+from car_app.broker import Broker, LocalBackend
+from car_app.models import Car, Rental
+from car_app.views.event_views import CarEventPollView, CarEventStreamView
+
+
+@pytest.fixture
+def events(settings):
+    settings.EVENTS = {"POLL_TIMEOUT": 0.2, "HEARTBEAT_SECONDS": 0.05}
+    broker = Broker(history=3, queue_size=2)
+    broker.backend = LocalBackend(broker)
+    previous, broker_module._broker = broker_module._broker, broker
+    yield broker
+    broker_module._broker = previous
+
+
+def poll(**params):
+    request = AsyncRequestFactory().get("/api/cars/events/poll/", params)
+    response = async_to_sync(CarEventPollView.as_view())(request)
+    return response.status_code, json.loads(response.content)
+
+
+def test_history_replays_and_reports_evicted_events(events):
+    for event_id in range(1, 6):
+        events.dispatch({"id": event_id, "type": "booking", "data": {"car": event_id}})
+
+    assert events.last_id == 5
+    assert [event["id"] for event in events.since(2)] == [3, 4, 5]
+    assert events.since(1) is None
+
+
+def test_gap_in_ids_asks_older_cursors_to_resync(events):
+    events.publish("booking", car=1)
+    events.publish("booking", car=2)
+    first, second = [event["id"] for event in events.since(0)]
+    assert second == first + 1
+
+    events.dispatch({"id": second + 3, "type": "booking", "data": {"car": 3}})
+    assert events.since(second) is None
+    assert [event["id"] for event in events.since(second + 2)] == [second + 3]
+
+
+def test_slow_subscriber_overflows_without_blocking_others(events):
+    async def scenario():
+        slow, fast = events.subscribe(), events.subscribe()
+        for car_id in range(3):
+            events.publish("booking", car=car_id)
+            await fast.get(1)
+        await asyncio.sleep(0)
+        return slow.overflowed, fast.overflowed
+
+    assert async_to_sync(scenario)() == (True, False)
+
+
+def test_poll_returns_cursor_then_waits_for_matching_events(events):
+    status, body = poll()
+    assert status == 200 and body == {"events": [], "cursor": 0}
+
+    events.publish("booking", car=1, booked=True)
+    events.publish("booking", car=2, booked=True)
+    status, body = poll(since=0, cars="2")
+    assert [event["data"]["car"] for event in body["events"]] == [2]
+
+    status, body = poll(since=body["cursor"], cars="2")
+    assert status == 200 and body["events"] == [] and body["cursor"] == events.last_id
+
+    assert poll(since="x")[0] == 400
+
+
+def test_poll_is_woken_by_a_publish(events):
+    async def scenario():
+        async def publish_later():
+            await asyncio.sleep(0.02)
+            events.publish("car", car=7, available=False)
+
+        request = AsyncRequestFactory().get("/api/cars/events/poll/", {"since": 0})
+        response, _ = await asyncio.gather(CarEventPollView.as_view()(request), publish_later())
+        return json.loads(response.content)
+
+    body = async_to_sync(scenario)()
+    assert body["events"][0]["type"] == "car"
+    assert body["events"][0]["data"] == {"car": 7, "available": False}
+
+
+def test_poll_asks_stale_cursors_to_resync(events):
+    for car_id in range(5):
+        events.publish("booking", car=car_id)
+    assert poll(since=1)[0] == 410
+
+
+def test_stream_replays_from_last_event_id_and_sends_heartbeats(events):
+    events.publish("booking", car=1)
+    first = events.last_id
+    events.publish("booking", car=2)
+
+    async def scenario():
+        request = AsyncRequestFactory().get("/api/cars/events/", headers={"Last-Event-ID": str(first)})
+        response = await CarEventStreamView.as_view()(request)
+        chunks = []
+        async for chunk in response:
+            chunks.append(chunk.decode())
+            if len(chunks) == 3:
+                break
+        return response, chunks
+
+    response, chunks = async_to_sync(scenario)()
+    assert response["Content-Type"] == "text/event-stream"
+    assert chunks[0].startswith("retry:")
+    assert chunks[1] == f'id: {events.last_id}\nevent: booking\ndata: {{"car": 2}}\n\n'
+    assert chunks[2] == ": heartbeat\n\n"
+
+
+@pytest.mark.parametrize("view, path", [(CarEventStreamView, "/api/cars/events/"),
+                                        (CarEventPollView, "/api/cars/events/poll/")])
+def test_event_endpoints_refuse_wsgi_requests(events, view, path):
+    request = RequestFactory().get(path, {"since": 0})
+    response = async_to_sync(view.as_view())(request)
+    assert response.status_code == 501
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_and_car_changes_are_published(events, customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2030, 1, 2), end_date=date(2030, 1, 4),
+        total_cost=Decimal("300.00"), status="pending",
+    )
+    rental.status = "cancelled"
+    rental.save()
+    car = Car.objects.get(pk=car.pk)
+    car.availability = False
+    car.save()
+    car.save()
+
+    assert [(event["type"], event["data"]) for event in events.since(0)] == [
+        ("booking", {"car": car.pk, "date_from": "2030-01-02", "date_to": "2030-01-04", "booked": True}),
+        ("booking", {"car": car.pk, "date_from": "2030-01-02", "date_to": "2030-01-04", "booked": False}),
+        ("car", {"car": car.pk, "available": False}),
+    ]
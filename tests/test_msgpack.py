@@ -0,0 +1,115 @@
+import io
+import pytest
+import struct
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from car_app import msgpack_codec
+from car_app.parsers import MessagePackParser
+from car_app.renderers import MessagePackRenderer
+from car_app.views.car_views import CarListView
+from car_app.views.rental_views import RentalCreateView
+from car_app.views.user_views import RegisterUser
+
+NATIVE = {
+    "revenue": Decimal("120.50"),
+    "day": date(1969, 12, 31),
+    "opens": time(8, 30),
+    "updated": datetime(2025, 1, 1, 8, 0, 0, 250000, tzinfo=timezone.utc),
+    "sizes": [0, -1, 255, -129, 70000, 2 ** 40, 1.5, None, True],
+    "note": "Złota " * 10,
+}
+
+
+@pytest.fixture(params=["c", "pure"])
+def codec(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(msgpack_codec, "msgpack", None)
+    elif msgpack_codec.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    return msgpack_codec
+
+
+def test_native_values_round_trip(codec):
+    assert codec.unpackb(codec.packb(NATIVE)) == NATIVE
+
+
+def test_pure_codec_matches_the_c_extension(monkeypatch):
+    if msgpack_codec.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    packed = msgpack_codec.packb(NATIVE)
+    monkeypatch.setattr(msgpack_codec, "msgpack", None)
+
+    assert msgpack_codec.packb(NATIVE) == packed
+    assert msgpack_codec.unpackb(packed) == NATIVE
+
+
+def test_extension_types_use_documented_codes(codec):
+    assert codec.packb(Decimal("1.5")) == b"\xc7\x03\x01" + b"1.5"
+    assert codec.packb(date(1970, 1, 2)) == b"\xd6\x02\x00\x00\x00\x01"
+    assert codec.packb(datetime(1970, 1, 1, 0, 0, 1, tzinfo=timezone.utc)) == b"\xd6\xff\x00\x00\x00\x01"
+
+
+def test_parser_rejects_invalid_data(codec):
+    assert MessagePackParser().parse(io.BytesIO(codec.packb({"car": 1}))) == {"car": 1}
+    with pytest.raises(ParseError):
+        MessagePackParser().parse(io.BytesIO(b"\x92\x01"))
+
+
+MALFORMED = [
+    b"",
+    b"\x81\x90\x01",  # a list as map key
+    b"\xd5\x01ab",  # a decimal extension that is no number
+    b"\xd6\x02" + struct.pack(">i", 2 ** 31 - 1),  # a date beyond year 9999
+    b"\xd4\x02\x00",  # a date extension of the wrong size
+    b"\xd7\xff" + b"\xff" * 8,  # a timestamp with more than a second of nanoseconds
+    b"\x91" * 100000,  # nesting too deep to decode
+]
+
+
+@pytest.mark.parametrize("data", MALFORMED)
+def test_malformed_data_raises_pack_error(codec, data):
+    with pytest.raises(codec.PackError):
+        codec.unpackb(data)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("data", MALFORMED[1:4])
+def test_register_answers_malformed_msgpack_with_400(codec, data):
+    request = APIRequestFactory().post("/api/users/register/", data, content_type="application/msgpack")
+
+    response = RegisterUser.as_view()(request)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_car_list_negotiates_msgpack(car):
+    factory = APIRequestFactory()
+
+    response = CarListView.as_view()(factory.get("/api/cars/", HTTP_ACCEPT="application/msgpack"))
+    response.render()
+
+    assert response["Content-Type"] == "application/msgpack"
+    body = msgpack_codec.unpackb(response.content)
+    assert body["count"] == 1
+    assert body["results"][0]["vin"] == car.vin
+
+    response = CarListView.as_view()(factory.get("/api/cars/"))
+    assert response.accepted_renderer.format == "json"
+
+
+@pytest.mark.django_db
+def test_rental_create_accepts_msgpack_body(customer, car):
+    factory = APIRequestFactory()
+    request = factory.post(
+        "/api/rentals/create/",
+        MessagePackRenderer().render({"car": car.pk, "start_date": "2030-01-10", "end_date": "2030-01-12"}),
+        content_type="application/msgpack",
+    )
+    force_authenticate(request, user=customer.user)
+
+    response = RentalCreateView.as_view()(request)
+
+    assert response.status_code == 201, response.data
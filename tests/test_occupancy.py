@@ -0,0 +1,58 @@
+import base64
+import random
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework.test import force_authenticate
+from car_app.models import Rental
+from car_app.occupancy import build_matrix
+from car_app.views.analytics_views import FleetOccupancyView
+
+INTERVALS = [(1, 0, 2), (1, 1, 4), (3, 6, 6), (4, 0, 0)]
+
+
+def test_build_matrix_merges_overlapping_intervals():
+    assert build_matrix([1, 2, 3], INTERVALS, 7, use_numpy=False) == [0b11111, 0, 0b1000000]
+
+
+def test_numpy_matrix_matches_python_fallback():
+    assert build_matrix([1, 2, 3], INTERVALS, 7, use_numpy=True) == build_matrix([1, 2, 3], INTERVALS, 7, use_numpy=False)
+
+    rng = random.Random(7)
+    intervals = []
+    for _ in range(500):
+        start = rng.randrange(400)
+        intervals.append((rng.randrange(1, 30), start, min(start + rng.randrange(15), 399)))
+    car_ids = list(range(1, 30))
+    assert build_matrix(car_ids, intervals, 400, use_numpy=True) == build_matrix(car_ids, intervals, 400,
+                                                                                 use_numpy=False)
+
+
+@pytest.mark.django_db
+def test_occupancy_endpoint_encodings(factory, owner_user, customer, car):
+    Rental.objects.create(
+        customer=customer, car=car, start_date=date(2023, 12, 30), end_date=date(2024, 1, 2),
+        total_cost=Decimal("400.00"), status="confirmed",
+    )
+    Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 1, 5), end_date=date(2024, 1, 6),
+        total_cost=Decimal("200.00"), status="cancelled",
+    )
+    view = FleetOccupancyView.as_view()
+
+    request = factory.get("/api/analytics/occupancy/", {"date_from": "2024-01-01", "days": 10})
+    force_authenticate(request, user=owner_user)
+    assert view(request).data["cars"] == [{"car": car.pk, "booked": [[0, 2]]}]
+
+    request = factory.get("/api/analytics/occupancy/", {"date_from": "2024-01-01", "days": 10, "encoding": "bitmap"})
+    force_authenticate(request, user=owner_user)
+    data = view(request).data
+    assert (data["cars"], data["row_bytes"]) == ([car.pk], 2)
+    assert base64.b64decode(data["bitmap"]) == bytes([0b11, 0])
+
+
+@pytest.mark.django_db
+def test_occupancy_is_owner_only(factory, customer_user):
+    request = factory.get("/api/analytics/occupancy/")
+    force_authenticate(request, user=customer_user)
+    assert FleetOccupancyView.as_view()(request).status_code == 403
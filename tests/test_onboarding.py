@@ -0,0 +1,151 @@
+import csv
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from rest_framework.test import force_authenticate
+from car_app import onboarding
+from car_app.hashing import hash_passwords
+from car_app.messages import (
+    CUSTOMER_IMPORT_INVALID,
+    CUSTOMER_IMPORT_MALFORMED,
+    CUSTOMER_IMPORT_NOT_UTF8,
+    DUPLICATE_IN_FILE,
+    EMAIL_ALREADY_REGISTERED,
+    PHONE_ALREADY_REGISTERED,
+)
+from car_app.models import Customer, User
+from car_app.onboarding import CustomerImportError, import_customers, read_csv
+from car_app.search import search_customers
+from car_app.views.customer_views import CustomerImportView
+
+HEADER = ("email,first_name,last_name,password,date_of_birth,licence_since,licence_expiry_date,"
+          "address,city,country,citizenship,phone_number\n")
+
+
+def row(email, phone_number, password="Secret123!", first_name="Jan", last_name="Nowak"):
+    return (f"{email},{first_name},{last_name},{password},1990-01-01,2010-01-01,2030-01-01,"
+            f"Street 1,Warsaw,Poland,polish,{phone_number}\n")
+
+
+def csv_file(*rows):
+    return SimpleUploadedFile("customers.csv", ("﻿" + HEADER + "".join(rows)).encode(), "text/csv")
+
+
+def upload(factory, user, file):
+    request = factory.post("/api/customers/import/", {"file": file}, format="multipart")
+    force_authenticate(request, user=user)
+    return CustomerImportView.as_view()(request)
+
+
+def test_import_creates_users_and_customers(db):
+    rows = read_csv(csv_file(row("Jan@Example.com", "+48600100200"), row("ola@example.com", "+48600100201", "", "Ola", "Lis")))
+
+    assert import_customers(rows, batch_size=1) == 2
+
+    jan = User.objects.get(email="Jan@example.com")
+    assert jan.check_password("Secret123!")
+    assert not jan.is_owner
+    assert str(jan.customer.phone_number) == "+48600100200"
+    assert not User.objects.get(email="ola@example.com").has_usable_password()
+    assert list(search_customers(Customer.objects.all(), ["nowak", "jan"])) == [jan.customer]
+
+
+def test_import_rejects_whole_file_on_duplicates(customer):
+    rows = read_csv(csv_file(
+        row("new@example.com", "+48600100200"),
+        row("customer@example.com", "+48123456789"),
+        row("new@example.com", "+48600100200"),
+    ))
+
+    with pytest.raises(CustomerImportError) as error:
+        import_customers(rows)
+
+    assert error.value.message == CUSTOMER_IMPORT_INVALID
+    assert error.value.errors == [
+        {"row": 3, "errors": {"email": [EMAIL_ALREADY_REGISTERED], "phone_number": [PHONE_ALREADY_REGISTERED]}},
+        {"row": 4, "errors": {"email": [DUPLICATE_IN_FILE], "phone_number": [DUPLICATE_IN_FILE]}},
+    ]
+    assert Customer.objects.count() == 1
+
+
+def test_read_csv_requires_columns():
+    file = SimpleUploadedFile("customers.csv", b"email,city\na@example.com,Warsaw\n")
+
+    with pytest.raises(CustomerImportError, match="phone_number"):
+        read_csv(file)
+
+
+def test_read_csv_rejects_malformed_files():
+    file = SimpleUploadedFile("customers.csv", (HEADER + "a" * (csv.field_size_limit() + 1) + "\n").encode())
+
+    with pytest.raises(CustomerImportError) as error:
+        read_csv(file)
+    assert error.value.message.startswith(CUSTOMER_IMPORT_MALFORMED.format(error=""))
+
+
+def test_hash_passwords_in_pool_matches_serial():
+    passwords = ["first", "", "second", None, "third"]
+
+    encoded = hash_passwords(passwords, processes=2, min_pool_size=1)
+
+    hasher = User(password=encoded[0])
+    assert hasher.check_password("first")
+    assert [User(password=value).has_usable_password() for value in encoded] == [True, False, True, False, True]
+    assert User(password=encoded[4]).check_password("third")
+
+
+def test_import_endpoint(factory, owner_user, customer_user):
+    assert upload(factory, customer_user, csv_file(row("a@example.com", "+48600100200"))).status_code == 403
+
+    response = upload(factory, owner_user, csv_file(row("a@example.com", "+48600100200")))
+    assert response.status_code == 201
+    assert response.data == {"created": 1}
+
+    response = upload(factory, owner_user, csv_file(row("a@example.com", "+48600100201")))
+    assert response.status_code == 400
+    assert response.data["errors"] == [{"row": 2, "errors": {"email": [EMAIL_ALREADY_REGISTERED]}}]
+
+    latin1 = SimpleUploadedFile("customers.csv", (HEADER + row("b@example.com", "+48600100202", first_name="Józef"))
+                                .encode("latin-1"), "text/csv")
+    response = upload(factory, owner_user, latin1)
+    assert response.status_code == 400
+    assert response.data["message"] == CUSTOMER_IMPORT_NOT_UTF8
+    assert not User.objects.filter(email="b@example.com").exists()
+
+
+def test_import_endpoint_limits_rows(factory, owner_user, settings):
+    settings.CUSTOMER_IMPORT = {"MAX_ROWS": 1}
+
+    response = upload(factory, owner_user, csv_file(row("a@example.com", "+48600100200"),
+                                                    row("b@example.com", "+48600100201")))
+
+    assert response.status_code == 400
+    assert not User.objects.filter(email="a@example.com").exists()
+
+
+def test_import_endpoint_limits_passwords_and_hashes_without_pool(factory, owner_user, settings, monkeypatch):
+    settings.CUSTOMER_IMPORT = {"MAX_PASSWORDS": 1}
+    pools = []
+    monkeypatch.setattr(onboarding, "hash_passwords",
+                        lambda passwords, processes: pools.append(processes) or hash_passwords(passwords, processes))
+
+    response = upload(factory, owner_user, csv_file(row("a@example.com", "+48600100200"),
+                                                    row("b@example.com", "+48600100201")))
+    assert response.status_code == 400
+    assert not User.objects.filter(email="a@example.com").exists()
+
+    response = upload(factory, owner_user, csv_file(row("a@example.com", "+48600100200"),
+                                                    row("b@example.com", "+48600100201", password="")))
+    assert response.status_code == 201
+    assert pools == [1]
+
+
+def test_import_command(db, tmp_path):
+    path = tmp_path / "customers.csv"
+    path.write_text(HEADER + row("a@example.com", "+48600100200"))
+
+    call_command("import_customers", str(path), "--batch-size", "10")
+    assert Customer.objects.filter(user__email="a@example.com").exists()
+
+    with pytest.raises(CommandError):
+        call_command("import_customers", str(path))
@@ -0,0 +1,136 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+from car_app.models import Payment, Rental
+from car_app.payments import ChargeResult, FakePaymentProvider, PaymentProviderError, process_payment
+from car_app.views.rental_views import RentalCreateView
+
+
+class DecliningProvider(FakePaymentProvider):
+    def charge(self, payment):
+        return ChargeResult(success=False, reference="ref-1", error="Card declined")
+
+
+class UnavailableProvider(FakePaymentProvider):
+    def charge(self, payment):
+        raise PaymentProviderError("timeout")
+
+
+class RecordingProvider(FakePaymentProvider):
+    charges = []
+    refunds = []
+    during_charge = None
+
+    def charge(self, payment):
+        self.charges.append(payment.pk)
+        if type(self).during_charge:
+            type(self).during_charge(payment)
+        return super().charge(payment)
+
+    def refund(self, payment, reference):
+        self.refunds.append(reference)
+
+
+@pytest.fixture
+def recording_provider(settings):
+    settings.PAYMENT_PROVIDER = "tests.test_payments.RecordingProvider"
+    RecordingProvider.charges, RecordingProvider.refunds, RecordingProvider.during_charge = [], [], None
+    yield RecordingProvider
+    RecordingProvider.during_charge = None
+
+
+@pytest.fixture
+def pending_payment(customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 6, 1), end_date=date(2024, 6, 2),
+        total_cost=Decimal("200.00"),
+    )
+    return Payment.objects.create(rental=rental, amount=Decimal("200.00"))
+
+
+@pytest.mark.django_db
+def test_process_payment_completes_and_confirms_rental(pending_payment):
+    assert process_payment(pending_payment.pk) == "completed"
+    assert process_payment(pending_payment.pk) == "completed"
+
+    pending_payment.refresh_from_db()
+    assert pending_payment.provider_reference == f"fake-{pending_payment.pk}"
+    assert pending_payment.rental.status == "confirmed"
+
+
+@pytest.mark.django_db
+def test_declined_payment_fails_and_cancels_rental(pending_payment, settings):
+    settings.PAYMENT_PROVIDER = "tests.test_payments.DecliningProvider"
+
+    assert process_payment(pending_payment.pk) == "failed"
+
+    pending_payment.refresh_from_db()
+    assert pending_payment.failure_reason == "Card declined"
+    assert pending_payment.rental.status == "cancelled"
+
+
+@pytest.mark.django_db
+def test_unavailable_provider_leaves_payment_pending(pending_payment, settings):
+    settings.PAYMENT_PROVIDER = "tests.test_payments.UnavailableProvider"
+
+    with pytest.raises(PaymentProviderError):
+        process_payment(pending_payment.pk)
+
+    pending_payment.refresh_from_db()
+    assert pending_payment.status == "pending"
+
+
+@pytest.mark.django_db
+def test_claimed_payment_is_charged_once(pending_payment, recording_provider):
+    second_worker = []
+    recording_provider.during_charge = lambda payment: second_worker.append(process_payment(payment.pk))
+
+    assert process_payment(pending_payment.pk) == "completed"
+
+    assert second_worker == ["processing"]
+    assert recording_provider.charges == [pending_payment.pk]
+
+
+@pytest.mark.django_db
+def test_stale_claim_is_taken_over(pending_payment, recording_provider):
+    Payment.objects.filter(pk=pending_payment.pk).update(
+        status="processing", updated_at=timezone.now() - timedelta(hours=1)
+    )
+
+    assert process_payment(pending_payment.pk) == "completed"
+    assert recording_provider.charges == [pending_payment.pk]
+
+
+@pytest.mark.django_db
+def test_charge_for_payment_failed_meanwhile_is_refunded(pending_payment, recording_provider):
+    recording_provider.during_charge = lambda payment: Payment.objects.filter(pk=payment.pk).update(
+        status="failed", updated_at=timezone.now()
+    )
+
+    assert process_payment(pending_payment.pk) == "failed"
+    assert recording_provider.refunds == [f"fake-{pending_payment.pk}"]
+
+
+@pytest.mark.django_db
+def test_create_rental_replays_response_for_same_idempotency_key(factory, customer_user, customer, car):
+    data = {"car": car.id, "start_date": "2024-02-01", "end_date": "2024-02-02"}
+
+    responses = []
+    for _ in range(2):
+        request = factory.post("/rentals/create/", data, format="json", HTTP_IDEMPOTENCY_KEY="booking-1")
+        force_authenticate(request, user=customer_user)
+        responses.append(RentalCreateView.as_view()(request))
+
+    assert [r.status_code for r in responses] == [201, 201]
+    assert responses[1]["Idempotent-Replayed"] == "true"
+    assert responses[1].data["id"] == responses[0].data["id"]
+    assert responses[0].data["payment"]["status"] == "pending"
+    assert Rental.objects.count() == 1
+
+    request = factory.post(
+        "/rentals/create/", {**data, "end_date": "2024-02-05"}, format="json", HTTP_IDEMPOTENCY_KEY="booking-1"
+    )
+    force_authenticate(request, user=customer_user)
+    assert RentalCreateView.as_view()(request).status_code == 422
@@ -0,0 +1,65 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from car_app.models import SeasonalRate
+from car_app.pricing import quote, weekend_days
+from car_app.views.car_views import CarQuoteView
+
+
+def test_weekend_days_matches_day_by_day_count():
+    first = date(2024, 1, 1)
+    for offset in range(7):
+        for length in range(20):
+            start = first + timedelta(days=offset)
+            end = start + timedelta(days=length)
+            expected = sum(
+                1 for i in range(length + 1) if (start + timedelta(days=i)).weekday() >= 5
+            )
+            assert weekend_days(start, end) == expected
+
+
+@pytest.mark.django_db
+def test_quote_applies_car_rate_over_brand_rate_and_discounts(car, settings):
+    settings.PRICING = {
+        "WEEKEND_DISCOUNT": Decimal("0.50"),
+        "LONG_RENTAL_MIN_DAYS": 7,
+        "LONG_RENTAL_DISCOUNT": Decimal("0.10"),
+    }
+    SeasonalRate.objects.create(
+        brand="Toyota", start_date=date(2024, 7, 1), end_date=date(2024, 7, 31), daily_rate=Decimal("150.00")
+    )
+    SeasonalRate.objects.create(
+        car=car, start_date=date(2024, 7, 6), end_date=date(2024, 7, 7), daily_rate=Decimal("200.00")
+    )
+
+    # 28-30.06 at the base rate 100, 01-05.07 at the brand rate 150 and
+    # the weekend of 06-07.07 at the car rate 200.
+    result = quote(car, date(2024, 6, 28), date(2024, 7, 7))
+
+    assert result.days == 10
+    assert result.weekend_days == 4
+    assert result.base_cost == Decimal("1450.00")
+    # Half off 2 x 100 and 2 x 200 weekend days, then 10% off the remaining 1150.
+    assert result.discount == Decimal("415.00")
+    assert result.total_cost == Decimal("1035.00")
+
+
+@pytest.mark.django_db
+def test_quote_view_prices_page_of_cars(factory, car):
+    request = factory.post(
+        "/api/cars/quote/",
+        {"cars": [car.id], "start_date": "2024-02-01", "end_date": "2024-02-03"},
+        format="json",
+    )
+    response = CarQuoteView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.data[0]["car"] == car.id
+    assert response.data[0]["total_cost"] == "300.00"
+
+    request = factory.post(
+        "/api/cars/quote/",
+        {"cars": [car.id, 999], "start_date": "2024-02-01", "end_date": "2024-02-03"},
+        format="json",
+    )
+    assert CarQuoteView.as_view()(request).status_code == 400
@@ -0,0 +1,152 @@
+import pytest
+from rest_framework.test import force_authenticate
+from car_app import registration
+from car_app.bloom import BloomFilter
+from car_app.messages import EMAIL_ALREADY_REGISTERED, PHONE_ALREADY_REGISTERED, REGISTRATION_FAILURE
+from car_app.models import User
+from car_app.views.customer_views import RegisterCustomer
+from car_app.views.user_views import AvailabilityView, RegisterUser, UserProfileView
+
+CUSTOMER_DATA = {
+    "first_name": "Jan", "last_name": "Nowak", "password": "Secret123!", "date_of_birth": "1990-01-01",
+    "licence_since": "2010-01-01", "licence_expiry_date": "2030-01-01", "address": "Street 1", "city": "Warsaw",
+    "country": "Poland", "citizenship": "polish",
+}
+
+
+@pytest.fixture
+def prefilter(settings):
+    settings.REGISTRATION = {"PREFILTER": True}
+    registration.EMAILS.reset()
+    registration.PHONES.reset()
+    yield
+    registration.EMAILS.reset()
+    registration.PHONES.reset()
+
+
+@pytest.fixture
+def no_hashing(monkeypatch):
+    def fail(self, raw_password):
+        raise AssertionError("the password was hashed")
+    monkeypatch.setattr(User, "set_password", fail)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    bloom.update(f"user{i}@example.com" for i in range(1000))
+
+    assert all(f"user{i}@example.com" in bloom for i in range(1000))
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_register_user_rejects_taken_email_before_hashing(factory, customer_user, no_hashing):
+    request = factory.post("/api/users/register/", {"email": "customer@example.com", "password": "x"})
+
+    response = RegisterUser.as_view()(request)
+
+    assert response.status_code == 400
+    assert response.data == {"message": EMAIL_ALREADY_REGISTERED}
+
+
+def test_register_customer_rejects_taken_phone_before_hashing(factory, customer, no_hashing):
+    request = factory.post("/api/customers/register/",
+                           {**CUSTOMER_DATA, "email": "new@example.com", "phone_number": "+48123456789"})
+
+    response = RegisterCustomer.as_view()(request)
+
+    assert response.status_code == 400
+    assert response.data == {"message": PHONE_ALREADY_REGISTERED}
+    assert not User.objects.filter(email="new@example.com").exists()
+
+
+def test_register_customer_falls_back_to_constraint_on_race(factory, customer, monkeypatch):
+    checks = iter([None])
+    find_conflict = registration.find_conflict
+    monkeypatch.setattr(registration, "find_conflict", lambda *args, **kwargs: next(checks, None) or
+                        find_conflict(*args, **kwargs))
+    request = factory.post("/api/customers/register/",
+                           {**CUSTOMER_DATA, "email": "new@example.com", "phone_number": "+48123456789"})
+
+    response = RegisterCustomer.as_view()(request)
+
+    assert response.status_code == 400
+    assert response.data == {"message": PHONE_ALREADY_REGISTERED}
+
+
+def test_register_user_race_without_conflict_reports_failure(factory, db, monkeypatch):
+    monkeypatch.setattr(registration, "email_taken", lambda *args, **kwargs: False)
+    User.objects.create_user(email="taken@example.com", password=None)
+
+    response = RegisterUser.as_view()(factory.post("/api/users/register/", {"email": "taken@example.com"}))
+
+    assert response.status_code == 400
+    assert response.data == {"message": REGISTRATION_FAILURE}
+
+
+def test_profile_update_checks_other_users_only(factory, owner_user, customer_user):
+    def update(email):
+        request = factory.patch("/api/users/profile/", {"email": email})
+        force_authenticate(request, user=customer_user)
+        return UserProfileView.as_view()(request)
+
+    response = update("owner@example.com")
+    assert response.status_code == 400
+    assert response.data == {"message": EMAIL_ALREADY_REGISTERED}
+
+    assert update("customer@example.com").status_code == 200
+    assert update("renamed@example.com").status_code == 200
+
+
+def test_availability_endpoint(factory, customer):
+    def check(**params):
+        return AvailabilityView.as_view()(factory.get("/api/users/availability/", params))
+
+    response = check(email="customer@example.com", phone_number="+48123456789")
+    assert response.status_code == 200
+    assert response.data == {"email": False, "phone_number": False}
+
+    assert check(email="free@example.com").data == {"email": True}
+    assert check(phone_number="(415) 555-1212").data == {"phone_number": True}
+    assert check().status_code == 400
+    assert check(email="not-an-email").status_code == 400
+
+
+def test_phone_numbers_are_compared_as_stored(customer):
+    customer.phone_number = "(415) 555-1212"
+    customer.save()
+
+    assert registration.phone_taken("415-555-1212")
+    assert registration.taken_phones(["415.555.1212", "+48 000"]) == {"415.555.1212"}
+
+
+def test_prefilter_skips_lookups_for_unseen_values(db, customer, prefilter, django_assert_num_queries):
+    assert registration.email_taken("customer@example.com")
+
+    with django_assert_num_queries(0):
+        assert not registration.email_taken("nobody@example.com")
+
+    User.objects.create_user(email="later@example.com", password=None)
+    with django_assert_num_queries(1):
+        assert registration.email_taken("later@example.com")
+
+
+def test_prefilter_is_rebuilt_when_old(db, prefilter, settings):
+    settings.REGISTRATION = {"PREFILTER": True, "PREFILTER_MAX_AGE": -1}
+    bloom = registration.EMAILS.get()
+
+    assert registration.EMAILS.get() is not bloom
+
+
+def test_exact_answers_skip_a_stale_prefilter(factory, db, prefilter):
+    registration.EMAILS.get()
+    # Registered by another process: this process's filter has not seen it.
+    User.objects.bulk_create([User(email="elsewhere@example.com")])
+    assert not registration.email_taken("elsewhere@example.com")
+
+    assert registration.email_taken("elsewhere@example.com", use_prefilter=False)
+    response = AvailabilityView.as_view()(factory.get("/api/users/availability/", {"email": "elsewhere@example.com"}))
+    assert response.data == {"email": False}
+    response = RegisterUser.as_view()(factory.post("/api/users/register/", {"email": "elsewhere@example.com"}))
+    assert response.status_code == 400
+    assert response.data == {"message": EMAIL_ALREADY_REGISTERED}
@@ -0,0 +1,31 @@
+import io
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from car_app import renderers
+from car_app.parsers import FastJSONParser
+from car_app.renderers import FastJSONRenderer
+
+
+def test_fast_renderer_matches_stdlib_output():
+    data = {"total_cost": Decimal("300.50"), "start_date": date(2024, 1, 1), "note": "Złota "}
+
+    fast = FastJSONRenderer().render(data)
+
+    assert json.loads(fast) == json.loads(JSONRenderer().render(data))
+    assert b"\\u2028" in fast
+
+
+def test_fast_renderer_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+
+    assert FastJSONRenderer().render({"a": 1}) == JSONRenderer().render({"a": 1})
+
+
+def test_fast_parser_rejects_invalid_json():
+    assert FastJSONParser().parse(io.BytesIO(b'{"car": 1}')) == {"car": 1}
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b"{car: 1}"))
@@ -0,0 +1,89 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from rest_framework.test import force_authenticate
+from car_app.models import CarDailyRollup, Payment, PaymentDailyRollup, Rental, Watermark
+from car_app.rollups import refresh_car_days, refresh_since
+from car_app.task_queue import claim_next, run_task
+from car_app.views.analytics_views import CarDailyRollupListView
+
+
+@pytest.mark.django_db
+def test_update_rollups_is_incremental_and_idempotent(customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 1, 1), end_date=date(2024, 1, 3),
+        total_cost=Decimal("100.00"), status="confirmed",
+    )
+    Payment.objects.create(rental=rental, amount=Decimal("100.00"), status="completed")
+
+    call_command("update_rollups")
+    call_command("update_rollups")
+
+    rows = list(CarDailyRollup.objects.order_by("day").values_list("day", "rentals", "revenue"))
+    assert rows == [
+        (date(2024, 1, 1), 1, Decimal("33.33")),
+        (date(2024, 1, 2), 1, Decimal("33.33")),
+        (date(2024, 1, 3), 1, Decimal("33.34")),
+    ]
+    assert PaymentDailyRollup.objects.get().amount == Decimal("100.00")
+    assert Watermark.objects.filter(name="daily_rollups").exists()
+
+
+@pytest.mark.django_db
+def test_refresh_car_days_drops_cancelled_rentals(customer, car):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2024, 1, 1), end_date=date(2024, 1, 2),
+        total_cost=Decimal("200.00"), status="pending",
+    )
+    refresh_car_days(car.id, date(2024, 1, 1), date(2024, 1, 2))
+    assert CarDailyRollup.objects.count() == 2
+
+    rental.status = "cancelled"
+    rental.save()
+    refresh_car_days(car.id, date(2024, 1, 1), date(2024, 1, 2))
+    assert CarDailyRollup.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_car_rollup_list_filters_by_day(factory, owner_user, car):
+    CarDailyRollup.objects.create(car=car, day=date(2024, 1, 1), rentals=1, revenue=Decimal("10.00"))
+    CarDailyRollup.objects.create(car=car, day=date(2024, 2, 1), rentals=1, revenue=Decimal("10.00"))
+
+    request = factory.get("/api/analytics/rollups/cars/", {"day_from": "2024-01-15"})
+    force_authenticate(request, user=owner_user)
+    response = CarDailyRollupListView.as_view()(request)
+
+    assert response.status_code == 200
+    assert [row["day"] for row in response.data["results"]] == ["2024-02-01"]
+
+
+def run_queued_tasks():
+    while (task_row := claim_next()) is not None:
+        assert run_task(task_row)
+
+
+@pytest.mark.django_db
+def test_moved_and_deleted_rentals_leave_no_rollups_behind(customer, car, django_capture_on_commit_callbacks):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=date(2025, 3, 1), end_date=date(2025, 3, 3),
+        total_cost=Decimal("300.00"), status="confirmed",
+    )
+    refresh_since(None)
+    assert CarDailyRollup.objects.count() == 3
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rental = Rental.objects.get(pk=rental.pk)
+        rental.start_date, rental.end_date = date(2025, 6, 1), date(2025, 6, 2)
+        rental.save()
+    refresh_since(rental.updated_at - timedelta(seconds=1))
+    run_queued_tasks()
+    assert list(CarDailyRollup.objects.order_by("day").values_list("day", "revenue")) == [
+        (date(2025, 6, 1), Decimal("150.00")),
+        (date(2025, 6, 2), Decimal("150.00")),
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rental.delete()
+    run_queued_tasks()
+    assert not CarDailyRollup.objects.exists()
@@ -0,0 +1,76 @@
+import pytest
+from datetime import date
+from rest_framework.test import force_authenticate
+from car_app.models import Customer, User
+from car_app.search import normalize, phone_digits, search_customers
+from car_app.views.customer_views import CustomerListView
+
+
+def make_customer(email, first_name, last_name, phone_number):
+    user = User.objects.create_user(email=email, password=None, first_name=first_name, last_name=last_name)
+    return Customer.objects.create(
+        user=user, date_of_birth=date(1990, 1, 1), licence_since=date(2010, 1, 1),
+        licence_expiry_date=date(2030, 1, 1), address="Street 1", city="Warsaw", country="Poland",
+        citizenship="polish", phone_number=phone_number,
+    )
+
+
+@pytest.fixture
+def customers(db):
+    return [
+        make_customer("jan.kowalski@example.com", "Jan", "Kowalski", "+48 600 100 200"),
+        make_customer("anna@zolw.pl", "Anna", "Żółwińska", "+48 601 300 400"),
+        make_customer("john@example.org", "John", "Smith", "+1 555 0100"),
+    ]
+
+
+def search(owner_user, factory, term):
+    request = factory.get("/api/customers/", {"search": term})
+    force_authenticate(request, user=owner_user)
+    response = CustomerListView.as_view()(request)
+    assert response.status_code == 200
+    return sorted(customer["phone_number"] for customer in response.data["results"])
+
+
+def test_normalize_folds_case_and_diacritics():
+    assert normalize("  Żółwińska  ŁUKASZ ") == "zolwinska lukasz"
+    assert phone_digits("+48 (600) 100-200") == "48600100200"
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("kowal", ["+48 600 100 200"]),
+    ("zolw", ["+48 601 300 400"]),
+    ("ŻÓŁW", ["+48 601 300 400"]),
+    ("jan kowalski", ["+48 600 100 200"]),
+    ("jan smith", []),
+    ("JOHN@", ["+1 555 0100"]),
+    ("anna@zo", ["+48 601 300 400"]),
+    ("+48 60", ["+48 600 100 200", "+48 601 300 400"]),
+    ("+48 601", ["+48 601 300 400"]),
+    ("1555", ["+1 555 0100"]),
+    ("example", ["+1 555 0100", "+48 600 100 200"]),
+])
+def test_customer_search(owner_user, factory, customers, term, expected):
+    assert search(owner_user, factory, term) == expected
+
+
+def test_search_follows_user_and_customer_changes(owner_user, factory, customers):
+    jan, anna, _ = customers
+
+    jan.user.last_name = "Nowak"
+    jan.user.save()
+    anna.phone_number = "+48 700 000 000"
+    anna.save(update_fields=["phone_number"])
+    Customer.objects.filter(pk=customers[2].pk).delete()
+
+    assert search(owner_user, factory, "nowak") == ["+48 600 100 200"]
+    assert search(owner_user, factory, "kowalski") == ["+48 600 100 200"]  # still in the e-mail
+    assert search(owner_user, factory, "4870") == ["+48 700 000 000"]
+    assert search(owner_user, factory, "john") == []
+
+
+def test_customer_search_reads_users_in_the_same_query(customers, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        names = [str(customer) for customer in search_customers(CustomerListView.queryset, ["example"])]
+
+    assert sorted(names) == ["Jan Kowalski", "John Smith"]
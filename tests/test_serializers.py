@@ -0,0 +1,81 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from car_app.models import SUMMARY_LENGTH, Rental, summarize
+from car_app.serializers import parse_fieldset
+from car_app.views.car_views import CarListView
+from car_app.views.rental_views import RentalListView
+
+
+def test_parse_fieldset_builds_nested_tree():
+    assert parse_fieldset("id, car.brand,car.model") == {"id": {}, "car": {"brand": {}, "model": {}}}
+    assert parse_fieldset("") is None
+
+
+@pytest.mark.django_db
+def test_car_list_sparse_fields_skip_description_column(factory, car):
+    request = factory.get("/api/cars/", {"fields": "id,brand"})
+    with CaptureQueriesContext(connection) as queries:
+        response = CarListView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.data["results"] == [{"id": car.id, "brand": "Toyota"}]
+    assert all('"description"' not in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_rental_list_expand_collapses_other_relations(factory, owner_user, customer, car):
+    Rental.objects.create(
+        customer=customer,
+        car=car,
+        start_date=date(2024, 5, 1),
+        end_date=date(2024, 5, 2),
+        total_cost=Decimal("200.00"),
+    )
+    request = factory.get("/api/rentals/", {"fields": "id,customer,car.brand", "expand": "car"})
+    force_authenticate(request, user=owner_user)
+    response = RentalListView.as_view()(request)
+
+    assert response.status_code == 200
+    row = response.data["results"][0]
+    assert row["customer"] == customer.id
+    assert row["car"] == {"brand": "Toyota"}
+
+
+def test_summarize_cuts_at_a_word_boundary():
+    assert summarize("Compact   sedan\nwith AC") == "Compact sedan with AC"
+    assert summarize("Spacious family estate, great for trips", length=24) == "Spacious family estate…"
+
+
+@pytest.mark.django_db
+def test_car_summary_follows_description(car):
+    car.description = "Long " * 100
+    car.save(update_fields=["description"])
+
+    car.refresh_from_db()
+    assert len(car.summary) <= SUMMARY_LENGTH
+    assert car.summary.endswith("…")
+
+
+@pytest.mark.django_db
+def test_lists_send_summary_and_skip_description_column(factory, owner_user, customer, car):
+    Rental.objects.create(
+        customer=customer,
+        car=car,
+        start_date=date(2024, 5, 1),
+        end_date=date(2024, 5, 2),
+        total_cost=Decimal("200.00"),
+    )
+    with CaptureQueriesContext(connection) as queries:
+        cars = CarListView.as_view()(factory.get("/api/cars/"))
+        request = factory.get("/api/rentals/")
+        force_authenticate(request, user=owner_user)
+        rentals = RentalListView.as_view()(request)
+
+    assert cars.data["results"][0]["summary"] == "Compact sedan"
+    assert "description" not in cars.data["results"][0]
+    assert rentals.data["results"][0]["car"]["summary"] == "Compact sedan"
+    assert all('"description"' not in query["sql"] for query in queries.captured_queries)
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import pytest
+from car_app import schema
+from car_app.views.schema_views import SchemaView
+
+LAZY_MODULES = ["google.oauth2", "google.auth.transport.requests", "drf_spectacular.generators"]
+
+
+def test_url_loading_does_not_import_lazy_dependencies():
+    code = (
+        "import sys, django; django.setup(); import car_rental.urls; "
+        f"print([name for name in {LAZY_MODULES!r} if name in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+    assert "car_rental.urls" in result.stderr
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    settings.OPENAPI_SCHEMA = {"DIR": tmp_path, "MAX_AGE": 600}
+    schema._loaded.clear()
+    yield tmp_path
+    schema._loaded.clear()
+
+
+def test_schema_is_generated_until_it_is_built(factory, schema_dir, monkeypatch):
+    response = SchemaView.as_view()(factory.get("/api/schema"))
+    response.render()
+    assert response.status_code == 200
+    assert "ETag" not in response
+
+    paths = schema.build_schema()
+    assert sorted(path.name for path in paths) == ["openapi.json", "openapi.yaml"]
+
+    monkeypatch.setattr(SchemaView, "dynamic_view", staticmethod(lambda request: pytest.fail("schema regenerated")))
+    response = SchemaView.as_view()(factory.get("/api/schema"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("application/vnd.oai.openapi")
+    assert response["Cache-Control"] == "public, max-age=600"
+    assert response.content == (schema_dir / "openapi.yaml").read_bytes()
+
+    json_response = SchemaView.as_view()(factory.get("/api/schema", HTTP_ACCEPT="application/json"))
+    assert json_response.content.startswith(b"{")
+
+    cached = SchemaView.as_view()(factory.get("/api/schema", HTTP_IF_NONE_MATCH=response["ETag"]))
+    assert cached.status_code == 304
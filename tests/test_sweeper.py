@@ -0,0 +1,92 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.utils import timezone
+from car_app import sweeper
+from car_app.models import ChangeLogEntry, IdempotencyKey, Payment, Rental, Task
+from car_app.sweeper import expire_pending_rentals, purge_idempotency_keys
+
+
+def make_rental(customer, car, day, status="pending", age=timedelta(hours=2)):
+    rental = Rental.objects.create(
+        customer=customer, car=car, start_date=day, end_date=day, total_cost=Decimal("100.00"), status=status
+    )
+    Rental.objects.filter(pk=rental.pk).update(created_at=timezone.now() - age)
+    Payment.objects.create(rental=rental, amount=Decimal("100.00"))
+    return rental
+
+
+@pytest.mark.django_db
+def test_expire_pending_rentals_cancels_only_stale_pending(customer, car, django_capture_on_commit_callbacks):
+    stale = [make_rental(customer, car, date(2024, 1, day)) for day in range(1, 6)]
+    fresh = make_rental(customer, car, date(2024, 2, 1), age=timedelta(minutes=1))
+    confirmed = make_rental(customer, car, date(2024, 3, 1), status="confirmed")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        result = expire_pending_rentals(timedelta(minutes=30), batch_size=2)
+
+    assert (result.rentals, result.payments, result.batches) == (5, 5, 3)
+    assert set(Rental.objects.filter(status="cancelled").values_list("pk", flat=True)) == {r.pk for r in stale}
+    assert Rental.objects.get(pk=fresh.pk).status == "pending"
+    assert Rental.objects.get(pk=confirmed.pk).status == "confirmed"
+    assert Payment.objects.filter(status="failed").count() == 5
+    assert Task.objects.filter(name="car_app.tasks.refresh_car_rollups").count() == 3
+
+
+@pytest.mark.django_db
+def test_expired_rental_no_longer_blocks_the_car(customer, car, capsys):
+    make_rental(customer, car, date(2024, 1, 1))
+
+    call_command("expire_pending_rentals", "--ttl-minutes", "30")
+
+    assert "Cancelled 1 rental(s)" in capsys.readouterr().out
+    assert not Rental.objects.exclude(status="cancelled").exists()
+
+
+@pytest.mark.django_db
+def test_sweeper_skips_rentals_whose_payment_is_being_charged(customer, car):
+    claimed = make_rental(customer, car, date(2024, 1, 1))
+    Payment.objects.filter(rental=claimed).update(status="processing")
+    stale = make_rental(customer, car, date(2024, 1, 2))
+
+    result = expire_pending_rentals(timedelta(minutes=30), batch_size=1)
+
+    assert (result.rentals, result.payments) == (1, 1)
+    assert Rental.objects.get(pk=claimed.pk).status == "pending"
+    assert Payment.objects.get(rental=claimed).status == "processing"
+    assert Rental.objects.get(pk=stale.pk).status == "cancelled"
+
+
+@pytest.mark.django_db
+def test_change_feed_logs_only_rentals_the_sweep_cancelled(customer, car, monkeypatch):
+    claimed = make_rental(customer, car, date(2024, 1, 1))
+    stale = make_rental(customer, car, date(2024, 1, 2))
+    ChangeLogEntry.objects.all().delete()
+    real_now, calls = timezone.now, []
+
+    def now():
+        calls.append(None)
+        if len(calls) == 2:
+            # A worker claims the payment after the sweep selected its rental.
+            Payment.objects.filter(rental=claimed).update(status="processing")
+        return real_now()
+
+    monkeypatch.setattr(sweeper.timezone, "now", now)
+    result = expire_pending_rentals(timedelta(minutes=30))
+    monkeypatch.undo()
+
+    assert (result.rentals, result.payments) == (1, 1)
+    assert Rental.objects.get(pk=claimed.pk).status == "pending"
+    logged = set(ChangeLogEntry.objects.values_list("model", "object_id"))
+    assert logged == {("rental", stale.pk), ("payment", stale.payment.pk)}
+
+
+@pytest.mark.django_db
+def test_purge_idempotency_keys_deletes_expired_records(customer_user):
+    old = IdempotencyKey.objects.create(user=customer_user, key="old", request_hash="x")
+    IdempotencyKey.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+    IdempotencyKey.objects.create(user=customer_user, key="new", request_hash="x")
+
+    assert purge_idempotency_keys(timedelta(hours=24), batch_size=1) == 1
+    assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["new"]
@@ -0,0 +1,65 @@
+import pytest
+from django.core import mail
+from rest_framework.test import force_authenticate
+from car_app.models import CarDailyRollup, Payment, Task
+from car_app.task_queue import claim_next, enqueue, run_task, task
+from car_app.views.rental_views import RentalCreateView
+
+calls = []
+
+
+@task(name="tests.flaky", max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    raise RuntimeError("provider unavailable")
+
+
+@pytest.mark.django_db
+def test_booking_queues_side_effects_on_commit(factory, customer_user, customer, car, django_capture_on_commit_callbacks):
+    request = factory.post(
+        "/rentals/create/", {"car": car.id, "start_date": "2024-02-01", "end_date": "2024-02-02"}, format="json"
+    )
+    force_authenticate(request, user=customer_user)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = RentalCreateView.as_view()(request)
+
+    assert response.status_code == 201
+    assert Task.objects.filter(status="queued").count() == 3
+
+    while (task_row := claim_next()) is not None:
+        assert run_task(task_row)
+
+    assert Payment.objects.get().status == "completed"
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["customer@example.com"]
+    assert CarDailyRollup.objects.filter(car=car).count() == 2
+
+
+@pytest.mark.django_db
+def test_failing_task_is_retried_with_backoff_then_failed(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        flaky.delay(value=1)
+
+    task_row = claim_next()
+    assert not run_task(task_row)
+    task_row.refresh_from_db()
+    assert task_row.status == "queued"
+    assert task_row.attempts == 1
+    assert task_row.run_at > task_row.created_at
+    assert claim_next() is None
+
+    Task.objects.filter(pk=task_row.pk).update(run_at=task_row.created_at)
+    assert not run_task(claim_next())
+    task_row.refresh_from_db()
+    assert task_row.status == "failed"
+    assert "provider unavailable" in task_row.last_error
+    assert calls == [1, 1]
+
+
+@pytest.mark.django_db
+def test_enqueue_waits_for_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        enqueue("tests.flaky", value=2)
+
+    assert len(callbacks) == 1
+    assert not Task.objects.exists()
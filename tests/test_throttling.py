@@ -0,0 +1,56 @@
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+from car_app.throttling import TokenBucketThrottle
+from car_app.views.car_views import CarListView
+from car_app.views.user_views import RegisterUser
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(TokenBucketThrottle, "timer", staticmethod(lambda: now[0]))
+    return now
+
+
+def register(factory, email):
+    return RegisterUser.as_view()(factory.post("/api/users/register/", {"email": email, "password": "password"}))
+
+
+@pytest.mark.django_db
+def test_register_bucket_refills_over_time(monkeypatch, factory, clock):
+    monkeypatch.setitem(TokenBucketThrottle.THROTTLE_RATES, "register", "2/min")
+
+    assert register(factory, "a@example.com").status_code == 201
+    assert register(factory, "b@example.com").status_code == 201
+    response = register(factory, "c@example.com")
+    assert response.status_code == 429
+    assert response["Retry-After"] == "30"
+
+    clock[0] += 30
+    assert register(factory, "c@example.com").status_code == 201
+    assert register(factory, "d@example.com").status_code == 429
+
+
+@pytest.mark.django_db
+def test_throttled_request_is_rejected_before_database_work(monkeypatch, factory, clock, django_assert_num_queries):
+    monkeypatch.setitem(TokenBucketThrottle.THROTTLE_RATES, "register", "1/min")
+    register(factory, "a@example.com")
+
+    with django_assert_num_queries(0):
+        assert register(factory, "b@example.com").status_code == 429
+
+
+@pytest.mark.django_db
+def test_users_have_separate_buckets_keyed_by_token(monkeypatch, factory, clock, owner_user, customer_user,
+                                                    django_assert_num_queries):
+    monkeypatch.setitem(TokenBucketThrottle.THROTTLE_RATES, "catalog", "1/min")
+    view = CarListView.as_view()
+
+    def get(user):
+        token = AccessToken.for_user(user)
+        return view(factory.get("/api/cars/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+
+    assert get(owner_user).status_code == 200
+    assert get(customer_user).status_code == 200
+    with django_assert_num_queries(0):
+        assert get(owner_user).status_code == 429